@@ -1,10 +1,12 @@
 # Main operator settings (change all parameters here and only change the ones that are marked as ===CHANGE THESE===)
+import os
 from pathlib import Path
 
 # Project paths
 PROJECT_ROOT = Path(__file__).resolve().parent
 
 DATA_DIR    = PROJECT_ROOT / "data"
+CACHE_DIR   = DATA_DIR / "cache"
 SCRIPTS_DIR = PROJECT_ROOT / "scripts"
 
 RESULTS_DIR = PROJECT_ROOT / "results"
@@ -14,18 +16,61 @@ EVENTS_DIR  = RESULTS_DIR / "events"
 XAI_DIR     = RESULTS_DIR / "xai"
 COMPARE_DIR = RESULTS_DIR / "compare"
 REPORT_DIR = RESULTS_DIR / "report"
+SWEEP_DIR   = RESULTS_DIR / "sweep"
+SIZING_DIR  = RESULTS_DIR / "sizing"
+RESCORE_DIR = RESULTS_DIR / "rescore"
+BENCH_DIR   = RESULTS_DIR / "benchmarks"
+PROFILE_DIR = RESULTS_DIR / "profile"
+RUN_PROFILE_JSON = RESULTS_DIR / "run_profile.json"
+SUMMARY_STORE = RESULTS_DIR / "summary_store.parquet"
+RESULTS_DATASET = RESULTS_DIR / "dataset"
+FLEET_DIR   = RESULTS_DIR / "fleet"
+TELEMETRY_DIR = RESULTS_DIR / "telemetry"
+HIGHRES_DIR = RESULTS_DIR / "highres"
 
 FIG_DIR     = PROJECT_ROOT / "figures"
 QUICKLOOKS_DIR = FIG_DIR / "quicklooks"
 
+# Figures on/off (run_pipeline.py --no-plots turns them off for one run) (===CHANGE THESE===)
+MAKE_PLOTS = True
+
+# Compact result frames in memory: float32 values, bool flags, categorical labels - about half the memory,
+# values rounded to float32 (run_pipeline.py --compact turns it on for one run) (===CHANGE THESE===)
+COMPACT_RESULTS = False
+
+# Time-series plot decimation: "minmax" (min/max per pixel column), "lttb" or "none" (===CHANGE THESE===)
+PLOT_DECIMATION = "minmax"
+
 # Input files (===CHANGE THESE===)
 LOAD_CSV = DATA_DIR / "processed" / "load_15min_kw_scaled.csv"
 PV_CSV   = DATA_DIR / "processed" / "pv_15min_kw.csv"
 
-# Time base (===CHANGE THESE===)
+# Processed input format written by preprocessing: "csv" or "parquet" (===CHANGE THESE===)
+PROCESSED_FORMAT = "csv"
+
+# Binary input cache (data/cache/): rebuilt when the source changes, detected by "mtime" or "hash" (===CHANGE THESE===)
+USE_INPUT_CACHE = True
+CACHE_VALIDATION = "mtime"
+CACHE_VALUE_DTYPE = "float64"
+
+# Raw data downloads (run_all.py): parallel downloads, timeout per request (s), attempts per source,
+# content-addressed download cache and the checksum manifest pinned on first download (===CHANGE THESE===)
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_TIMEOUT_S = 60
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_CACHE_DIR = CACHE_DIR / "downloads"
+DOWNLOAD_MANIFEST = DATA_DIR / "raw" / "downloads.json"
+# Mirrors tried before the original URLs: local folders or http(s) base URLs that hold the raw files by name,
+# for offline / air-gapped runs (SC_DOWNLOAD_MIRROR adds comma-separated mirrors for one run) (===CHANGE THESE===)
+DOWNLOAD_MIRRORS = [m.strip() for m in os.environ.get("SC_DOWNLOAD_MIRROR", "").split(",") if m.strip()]
+
+# Time base - inputs are resampled to it at load time (===CHANGE THESE===)
 DT_MIN = 15
 DT_H   = DT_MIN / 60.0
 
+# Gap handling when aligning load/pv on the DT_MIN grid: "interpolate", "ffill", "zero" or "drop" (===CHANGE THESE===)
+ALIGN_FILL_POLICY = "interpolate"
+
 # Forecast horizon (===CHANGE THESE===)
 H_STEPS = 8
 H_HOURS = H_STEPS * DT_H
@@ -42,7 +87,75 @@ SOC0      = 0.50
 ETA_CH    = 0.95
 ETA_DIS   = 0.95
 
+# Battery cycle life (Woehler curve): N(DoD) = CYCLE_LIFE_N_REF * (DoD / CYCLE_LIFE_DOD_REF) ** -CYCLE_LIFE_EXPONENT (===CHANGE THESE===)
+CYCLE_LIFE_N_REF = 6000.0
+CYCLE_LIFE_DOD_REF = 0.8
+CYCLE_LIFE_EXPONENT = 1.6
+
+# Years the BESS has to serve: replacements within this period count in the "lifecycle" sizing objective (===CHANGE THESE===)
+PROJECT_YEARS = 15.0
+
+# BESS dispatch policy: "reactive" (cover the net deficit now) or "lookahead" (rolling-horizon LP over H_STEPS) (===CHANGE THESE===)
+DISPATCH_POLICY = "reactive"
+
+# Look-ahead controller: net forecast ("persistence" or "perfect"), cost of the horizon peak unserved power (kWh per kW),
+# value of energy left in the battery at the horizon end (per kWh, keep < 1) (===CHANGE THESE===)
+LOOKAHEAD_FORECAST = "persistence"
+LOOKAHEAD_PEAK_WEIGHT = 0.5
+LOOKAHEAD_TERMINAL_WEIGHT = 0.1
+
+# Long single simulations: save the reactive dispatch state every CHECKPOINT_CHUNK_STEPS steps to
+# results/sim/sim_checkpoint.npz and resume from it after an interruption (===CHANGE THESE===)
+SIM_CHECKPOINT = False
+CHECKPOINT_CHUNK_STEPS = 100_000
+
+# Keep every pipeline run's results in the partitioned dataset results/dataset/ (site=/scenario=/year=),
+# queryable across runs with runners/run_query.py; sweeps and fleets add theirs with --dataset (===CHANGE THESE===)
+WRITE_RESULTS_DATASET = True
+
+# Multi-asset site: CSV with one row per asset (name, kind = battery/genset/pv, e_kwh, p_max_kw, soc_min, soc_max, soc0,
+# eta_ch, eta_dis, priority, pv_scale, fuel_l_per_kwh); None = the single battery above (===CHANGE THESE===)
+ASSETS_CSV = None
+# How a deficit / surplus is split over the assets: "priority" (lowest priority value first, ties share by available power)
+# or "proportional" (all batteries share by available power, gensets cover the rest) (===CHANGE THESE===)
+ASSET_ALLOCATION = "priority"
+
+# Fleet mode: site table (site, load_csv, pv_csv + optional per-site parameters) and worker processes (None = all cores) (===CHANGE THESE===)
+FLEET_SITES_CSV = DATA_DIR / "fleet_sites.csv"
+FLEET_WORKERS = None
+# Per-site summary cube (sites/<site>/sim/summary_cube.parquet), merged into fleet_cube.parquet for fleet comparisons (===CHANGE THESE===)
+FLEET_SUMMARY_CUBE = True
+
+# Live telemetry service: measurement inputs (UNIX socket, local TCP port), port for subscribers (JSON lines) (===CHANGE THESE===)
+TELEMETRY_SOCKET = "/tmp/microgrid_telemetry.sock"
+TELEMETRY_PORT = 8765
+TELEMETRY_PUB_PORT = 8766
+# Update batches buffered per subscriber; a full queue either drops the oldest batch ("drop_oldest") or stalls ingestion ("block")
+TELEMETRY_QUEUE_SIZE = 256
+TELEMETRY_BACKPRESSURE = "drop_oldest"
+
+# BESS cost used by the sizing optimizer (per kWh of energy, per kW of power) (===CHANGE THESE===)
+COST_PER_KWH = 300.0
+COST_PER_KW  = 150.0
+
+# Sizing target: the metric (total_unserved_kwh, pct_unserved_steps, max_unserved_kw, pct_risk_steps, max_risk_index) must be <= SIZING_TARGET (===CHANGE THESE===)
+SIZING_TARGET_METRIC = "total_unserved_kwh"
+SIZING_TARGET = 1000.0
+# Sizing objective: "capex" (purchase cost) or "lifecycle" (purchase cost incl. replacements from cycle wear over PROJECT_YEARS)
+SIZING_OBJECTIVE = "capex"
+
 # Risk proxy weights = ALPHA - unserved power weight (kW); BETA - reserve deficit power weight (kW); GAMMA - reserve deficit energy weight (kWh) (===CHANGE THESE===)
 ALPHA = 1.0
 BETA  = 1.0
-GAMMA = 1.0
\ No newline at end of file
+GAMMA = 1.0
+
+# High-resolution mode (runners/run_highres.py): time step in seconds (60 = 1 min, 1 = 1 s) and steps per chunk
+# (memory stays ~ chunk size, not series length). Coarser inputs are interpolated to it chunk by chunk; 1-min / 1-s
+# load and pv files are used as they are (===CHANGE THESE===)
+HIGHRES_DT_S = 60
+HIGHRES_CHUNK_STEPS = 500_000
+# Ramp risk: net-load ramp limit (kW per minute), time a ramp has to be covered by spare BESS discharge power (min),
+# DELTA - weight of the uncovered ramp power (kW) in the high-resolution risk index (===CHANGE THESE===)
+RAMP_LIMIT_KW_PER_MIN = 0.1 * PV_KWP
+RAMP_WINDOW_MIN = 1.0
+DELTA = 1.0
\ No newline at end of file
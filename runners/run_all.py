@@ -2,9 +2,13 @@ import argparse
 import subprocess
 import sys
 from pathlib import Path
-from urllib.request import urlretrieve
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import DOWNLOAD_MIRRORS, DOWNLOAD_WORKERS
+from scripts.preprocessing.download import download_all, read_download_list
+
 DATA_RAW_DIR = ROOT / "data" / "raw"
 
 LOAD_RAW_FILE = DATA_RAW_DIR / "resstock_building.parquet"
@@ -40,14 +44,12 @@ def run_cmd(cmd, title: str) -> None:
 def ensure_dirs() -> None:
     DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-def download_file(url: str, out_path: Path, force: bool = False) -> None:
-    if out_path.exists() and not force:
-        print(f"already exists: {out_path}")
-        return
-    print(f"download {url}")
-    print(f"         -> {out_path}")
-    urlretrieve(url, out_path)
-    print(f"completed download: {out_path}")
+def raw_downloads() -> list:
+    # sha256 of each file is pinned in data/raw/downloads.json by the first download
+    return [
+        {"name": LOAD_RAW_FILE.name, "url": LOAD_URL, "dest": LOAD_RAW_FILE},
+        {"name": PV_RAW_FILE.name, "url": PV_URL, "dest": PV_RAW_FILE},
+    ]
 
 def install_requirements() -> None:
     req = ROOT / "requirements.txt"
@@ -78,6 +80,28 @@ def main() -> None:
         action="store_true",
         help="Re-download raw datasets even if files already exist",
     )
+    parser.add_argument(
+        "--download-list",
+        type=Path,
+        help="CSV of extra raw files (name, url, optional sha256), saved to data/raw/<name>",
+    )
+    parser.add_argument(
+        "--mirror",
+        action="append",
+        default=[],
+        help="Local folder or http(s) base URL holding the raw files by name, tried before the original URLs (repeatable)",
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=DOWNLOAD_WORKERS,
+        help="Parallel downloads",
+    )
+    parser.add_argument(
+        "--download-only",
+        action="store_true",
+        help="Stop after the downloads",
+    )
     parser.add_argument(
         "--skip-preprocessing",
         action="store_true",
@@ -102,10 +126,16 @@ def main() -> None:
         print("dependency installation skipped (--skip-install)")
 
     if not args.skip_download:
-        download_file(LOAD_URL, LOAD_RAW_FILE, force=args.force_download)
-        download_file(PV_URL, PV_RAW_FILE, force=args.force_download)
+        items = raw_downloads()
+        if args.download_list:
+            items += read_download_list(args.download_list, DATA_RAW_DIR)
+        download_all(items, workers=args.download_workers, mirrors=args.mirror + DOWNLOAD_MIRRORS,
+                     force=args.force_download)
     else:
         print("data download skipped (--skip-download)")
+    if args.download_only:
+        print("done (--download-only)")
+        return
 
     if not args.skip_preprocessing:
         run_cmd([sys.executable, str(ROOT / "runners" / "run_preprocessing.py")], "Running preprocessing")
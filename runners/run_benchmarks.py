@@ -0,0 +1,82 @@
+# Run the offline benchmark suite (synthetic data) and store results as JSON
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import BENCH_DIR
+from scripts.benchmarks.import_time import run_import_bench
+from scripts.benchmarks.suite import CASES, compare, run_suite, save_results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic data")
+    parser.add_argument("--years", type=float, nargs="+", default=[0.5, 1.0, 2.0], help="Dataset sizes in years")
+    parser.add_argument("--dt-min", type=float, default=15, help="Time step of the synthetic data (minutes)")
+    parser.add_argument("--cases", nargs="+", choices=[n for n, _ in CASES], help="Only run these cases")
+    parser.add_argument("--repeat", type=int, default=1, help="Timing repeats per case (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory run")
+    parser.add_argument("--imports", action="store_true", help="Also measure entry-point import time (-X importtime)")
+    parser.add_argument("--forest", action="store_true",
+                        help="Also time early-warning forest scoring (sklearn vs flat arrays) and check parity")
+    parser.add_argument("--highres", action="store_true",
+                        help="Also time the chunked high-resolution simulation (runtime / memory vs steps)")
+    parser.add_argument("--highres-dt", type=float, nargs="+", help="High-resolution time steps (s) to run")
+    parser.add_argument("--dispatch-parity", type=int, nargs="?", const=500, metavar="CASES",
+                        help="Also check the reactive dispatch fast path against stepping on randomized cases (default 500)")
+    parser.add_argument("--compare", type=Path, help="Earlier results JSON to compare against")
+    parser.add_argument("--out-dir", type=Path, default=BENCH_DIR)
+    args = parser.parse_args()
+
+    # read the baseline first: it may be latest.json, which this run overwrites
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+
+    data = run_suite(args.years, args.dt_min, args.cases, args.repeat, memory=not args.no_memory)
+    if args.imports:
+        print("\nimport time (fresh interpreter per entry point)")
+        data["imports"] = run_import_bench()
+    if args.forest:
+        from scripts.benchmarks.forest_bench import run_forest_bench
+
+        print("\nearly-warning forest scoring (best of repeats)")
+        fb = run_forest_bench(repeat=max(5, args.repeat))
+        print(f"{fb['trees']} trees, {fb['nodes']} nodes, depth {fb['depth']}, "
+              f"parity max |p - sklearn| = {fb['parity_max_abs_err']:.1e}")
+        for r in fb["batches"]:
+            print(f"batch {r['batch']:>5}: sklearn {r['sklearn_ms']:8.2f} ms  flat {r['flat_ms']:8.3f} ms  "
+                  f"x{r['speedup']:.1f}  ({r['flat_us_per_row']:.1f} us/row)")
+        data["forest"] = fb
+    if args.highres:
+        from scripts.benchmarks.highres_bench import DT_S_LEVELS, run_highres_bench
+
+        print("\nhigh-resolution simulation (1 synthetic year, chunked)")
+        hb = run_highres_bench(args.highres_dt or DT_S_LEVELS, memory=not args.no_memory)
+        for r in hb["sizes"]:
+            peak = f"{r['peak_mb']:7.1f} MB" if r["peak_mb"] is not None else "      - MB"
+            print(f"dt {r['dt_s']:>5g} s: {r['steps']:>9} steps  {r['wall_s']:7.2f}s  "
+                  f"{r['ns_per_step']:6.0f} ns/step  peak {peak}")
+        print(f"ns/step spread across sizes: x{hb['ns_per_step_spread']:.2f} (1.0 = linear)")
+        data["highres"] = hb
+    if args.dispatch_parity:
+        from scripts.benchmarks.dispatch_parity import run_dispatch_parity
+
+        print("\nreactive dispatch fast path vs stepwise reference (bitwise)")
+        dp = run_dispatch_parity(args.dispatch_parity)
+        print(f"{dp['cases']} random cases in {dp['seconds']:.1f}s ({dp['fast_forward_pct']:.0f}% of steps fast-forwarded): "
+              f"{len(dp['single_mismatches'])} single / {len(dp['batch_mismatches'])} batch mismatches")
+        data["dispatch_parity"] = dp
+    path = save_results(data, args.out_dir)
+    print(f"Saved: {path}")
+    if args.dispatch_parity and (dp["single_mismatches"] or dp["batch_mismatches"]):
+        raise SystemExit(f"dispatch fast path differs from stepping (seed {dp['seed']}, cases "
+                         f"{sorted(set(dp['single_mismatches'] + dp['batch_mismatches']))[:10]})")
+
+    if baseline is not None:
+        print(f"\ncompared with {args.compare.name} (commit {baseline['meta'].get('commit')})")
+        for case, years, b, c, ratio, flag in compare(data, baseline):
+            print(f"{case:<20} {years:>6g}y  {b:8.3f}s -> {c:8.3f}s  x{ratio:5.2f}  {flag}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Simulate a fleet of sites from a site table in parallel worker processes
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import FLEET_DIR, FLEET_SITES_CSV, FLEET_WORKERS, FLEET_SUMMARY_CUBE, SUMMARY_STORE, RESULTS_DATASET
+from scripts.pipeline.checkpoint import RunCheckpoint, file_stamp
+from scripts.pipeline.fleet import (
+    FLEET_CUBE, PATH_COLUMNS, fleet_summary_text, read_site_table, run_fleet, synthetic_fleet,
+)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate many microgrid sites from a site table")
+    parser.add_argument("--sites", type=Path, default=FLEET_SITES_CSV,
+                        help="Site table CSV: site, load_csv, pv_csv + optional per-site parameters")
+    parser.add_argument("--workers", type=int, default=FLEET_WORKERS, help="Worker processes (default: all cores)")
+    parser.add_argument("--plots", action="store_true", help="Per-site quicklooks, risk curves, event and warning plots")
+    parser.add_argument("--pdf", action="store_true", help="Per-site operator PDF (implies --plots)")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="Generate N synthetic sites (data/synthetic/fleet) and run them instead of --sites")
+    parser.add_argument("--years", type=float, default=1.0, help="Length of the synthetic sites (years)")
+    parser.add_argument("--out-dir", type=Path, default=FLEET_DIR)
+    parser.add_argument("--no-store", action="store_true", help="Do not add the sites to the summary store")
+    parser.add_argument("--dataset", action="store_true",
+                        help="Also write every site's time series to the partitioned results dataset")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run: sites already in the checkpoint are not run again")
+    args = parser.parse_args()
+
+    table = args.sites
+    if args.synthetic:
+        table = synthetic_fleet(args.synthetic, ROOT / "data" / "synthetic" / "fleet", args.years)
+        print(f"synthetic fleet: {args.synthetic} sites -> {table}")
+
+    sites = read_site_table(table)
+    print(f"fleet: {len(sites)} sites from {table}")
+
+    # a site is the same work unit only while its parameters and input files are unchanged
+    units = {s["site"]: dict(s, **{f"{k}_stamp": file_stamp(s[k]) for k in PATH_COLUMNS if k in s}) for s in sites}
+    ckpt = RunCheckpoint(args.out_dir / "checkpoint", "fleet", units, resume=args.resume)
+    print(f"checkpoint: {ckpt.status()}")
+
+    t0 = time.perf_counter()
+    df = run_fleet(sites, args.out_dir, args.workers, plots=args.plots, pdf=args.pdf,
+                   store=None if args.no_store else SUMMARY_STORE, checkpoint=ckpt,
+                   dataset=RESULTS_DATASET if args.dataset else None)
+    wall = time.perf_counter() - t0
+
+    out_csv = args.out_dir / "fleet_summary.csv"
+    df.to_csv(out_csv, index=False)
+    cube_path = args.out_dir / FLEET_CUBE
+    fleet_cube = pd.read_parquet(cube_path) if FLEET_SUMMARY_CUBE and cube_path.exists() else None
+    text = fleet_summary_text(df, wall, cube=fleet_cube)
+    (args.out_dir / "fleet_summary.txt").write_text(text, encoding="utf-8")
+    print(text)
+    print(f"Saved: {out_csv}")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,94 @@
 # Run the full microgrid risk pipeline in the correct order by executing this script
 import argparse
+import json
 import shutil
 import subprocess
 import sys
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
 
-def run_module(module: str):
+from config import PROFILE_DIR, RUN_PROFILE_JSON
+from scripts.pipeline.profiling import children_cpu_s, peak_rss_mb
+
+STAGES = [
+    "scripts.pipeline.simulate_microgrid",
+    "scripts.pipeline.risk_curves",
+    "scripts.pipeline.event_examples",
+    "scripts.pipeline.shap_explain",
+    "scripts.pipeline.predictive_vs_reactive",
+    "scripts.pipeline.make_report",
+]
+
+def run_module(module: str, cprofile: bool = False, overrides: dict = None) -> dict:
+    """
+    Run one stage in its own interpreter; overrides: config constants changed for this run
+    only (set by scripts.pipeline.run_stage before the stage imports config)
+    """
     print(f"\n=== Running: {module} ===")
-    subprocess.run(
-        [sys.executable, "-m", module],
-        cwd=str(ROOT),
-        check=True
-    )
+    stage = module.rsplit(".", 1)[-1]
+
+    cmd = ["-m", module]
+    if overrides:
+        cmd = ["-m", "scripts.pipeline.run_stage", module, json.dumps(overrides)]
+    if cprofile:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        cmd = ["-m", "cProfile", "-o", str(PROFILE_DIR / f"{stage}.prof")] + cmd
+    cmd = [sys.executable] + cmd
+
+    # the stage writes its own phase timings; drop a stale file from an earlier run
+    stage_json = PROFILE_DIR / f"{stage}.json"
+    if stage_json.exists():
+        stage_json.unlink()
+
+    c0 = children_cpu_s()
+    w0 = time.perf_counter()
+    subprocess.run(cmd, cwd=str(ROOT), check=True)
+    wall = time.perf_counter() - w0
+    c1 = children_cpu_s()
+
+    entry = {
+        "stage": stage,
+        "module": module,
+        "wall_s": wall,
+        "cpu_s": (c1 - c0) if c0 is not None else None,
+        "peak_rss_mb": None,
+        "phases": [],
+    }
+    if stage_json.exists():
+        inner = json.loads(stage_json.read_text(encoding="utf-8"))
+        entry["peak_rss_mb"] = inner.get("peak_rss_mb")
+        entry["phases"] = inner.get("phases", [])
+    if entry["peak_rss_mb"] is None:
+        # largest child so far; an upper bound for this stage
+        entry["peak_rss_mb"] = peak_rss_mb(children=True)
+
+    print(f"=== Finished: {module} in {wall:.1f}s ===")
+    return entry
+
+def write_run_profile(stages: list, t_start: float, cprofile: bool):
+    RUN_PROFILE_JSON.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "created_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": sys.version.split()[0],
+        "cprofile": cprofile,
+        "total_wall_s": time.perf_counter() - t_start,
+        "stages": stages,
+    }
+    RUN_PROFILE_JSON.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+def print_profile_table(stages: list):
+    print("\nRun performance")
+    print(f"{'stage / phase':<34}{'wall (s)':>10}{'cpu (s)':>10}{'peak RSS (MB)':>15}")
+    for st in stages:
+        rows = [(st["stage"], st)] + [(f"  {ph['phase']}", ph) for ph in st["phases"]]
+        for name, r in rows:
+            cpu = f"{r['cpu_s']:.1f}" if r.get("cpu_s") is not None else "-"
+            rss = f"{r['peak_rss_mb']:.0f}" if r.get("peak_rss_mb") is not None else "-"
+            print(f"{name:<34}{r['wall_s']:>10.1f}{cpu:>10}{rss:>15}")
 
 def clean_outputs():
     targets = [
@@ -21,6 +96,7 @@ def clean_outputs():
         ROOT / "results" / "risk_curves",
         ROOT / "results" / "events",
         ROOT / "results" / "xai",
+        PROFILE_DIR,
         ROOT / "figures",
     ]
     for t in targets:
@@ -35,6 +111,21 @@ def main():
         action="store_true",
         help="Delete existing outputs (results/ and figures/) before running"
     )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Also run every stage under cProfile and dump results/profile/<stage>.prof"
+    )
+    parser.add_argument(
+        "--no-plots",
+        action="store_true",
+        help="Skip all figures (MAKE_PLOTS = False for this run); matplotlib is then never imported"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Compact result frames (float32 values, bool flags; COMPACT_RESULTS = True for this run)"
+    )
     args = parser.parse_args()
 
     if not (ROOT / "config.py").exists():
@@ -53,12 +144,26 @@ def main():
     if args.clean:
         clean_outputs()
 
-    run_module("scripts.pipeline.simulate_microgrid")
-    run_module("scripts.pipeline.risk_curves")
-    run_module("scripts.pipeline.event_examples")
-    run_module("scripts.pipeline.shap_explain")
-    run_module("scripts.pipeline.predictive_vs_reactive")
-    run_module("scripts.pipeline.make_report")
+    overrides = {}
+    if args.no_plots:
+        overrides["MAKE_PLOTS"] = False
+        print("plots disabled for this run")
+    if args.compact:
+        overrides["COMPACT_RESULTS"] = True
+        print("compact result frames for this run")
+
+    t_start = time.perf_counter()
+    stages = []
+    # written after every stage, so make_report already sees the earlier ones
+    write_run_profile(stages, t_start, args.cprofile)
+    for module in STAGES:
+        stages.append(run_module(module, args.cprofile, overrides))
+        write_run_profile(stages, t_start, args.cprofile)
+
+    print_profile_table(stages)
+    print(f"Saved run profile: {RUN_PROFILE_JSON}")
+    if args.cprofile:
+        print(f"cProfile dumps in {PROFILE_DIR} (inspect with: python -m pstats results/profile/<stage>.prof)")
 
     print("Pipeline finished successfully")
     print("Check outputs in:")
@@ -68,4 +173,4 @@ def main():
     print(" - results/xai/")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
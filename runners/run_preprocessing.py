@@ -1,34 +1,76 @@
-import subprocess
+# Run all preprocessing steps as one in-memory pipeline (load and pv branches in parallel)
+import argparse
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-SCRIPT_ORDER = [
-    "convert_resstock.py",
-    "prepare_load.py",
-    "prepare_pv.py",
-    "scale_load.py",
-]
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
 
-def run_step(script_path: Path) -> None:
-    print(f"Running: {script_path.name}")
-    subprocess.run([sys.executable, str(script_path)], check=True)
-    print(f"Completed: {script_path.name}")
+from config import PROCESSED_FORMAT
+from scripts.pipeline.inputs import write_processed
+from scripts.preprocessing import convert_resstock, prepare_load, prepare_pv, scale_load
+
+def load_branch(debug: bool):
+    t0 = time.perf_counter()
+    df = convert_resstock.convert_resstock(convert_resstock.read_raw())
+    if debug:
+        df.to_csv(convert_resstock.out, index=False)
+        print(f"debug: wrote {convert_resstock.out}")
+
+    df = prepare_load.to_power(df)
+    if debug:
+        df.to_csv(prepare_load.out, index=False)
+        print(f"debug: wrote {prepare_load.out}")
+
+    df = scale_load.scale_to_peak(df, verbose=True)
+    print(f"load branch: {len(df)} rows in {time.perf_counter() - t0:.2f}s")
+    return df
+
+def pv_branch(debug: bool):
+    t0 = time.perf_counter()
+    raw = prepare_pv.read_pvgis()
+    if debug:
+        dbg = prepare_pv.OUT.with_name("pv_hourly_raw.csv")
+        raw.to_csv(dbg, index=False)
+        print(f"debug: wrote {dbg}")
+
+    df = prepare_pv.to_pv_kw(raw)
+    print(f"pv branch: {len(df)} rows in {time.perf_counter() - t0:.2f}s")
+    return df
 
 def main() -> None:
-    project_root = Path(__file__).resolve().parents[1]
-    preprocessing_dir = project_root / "scripts" / "preprocessing"
+    parser = argparse.ArgumentParser(description="Run preprocessing (raw data -> processed load/pv inputs)")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default=PROCESSED_FORMAT,
+        help="File format of the final processed inputs (default: PROCESSED_FORMAT in config.py)",
+    )
+    parser.add_argument(
+        "--debug-intermediates",
+        action="store_true",
+        help="Also write the intermediate CSV files of every preprocessing step",
+    )
+    args = parser.parse_args()
+
+    if args.format != PROCESSED_FORMAT:
+        print(f"note: writing {args.format} but config.py PROCESSED_FORMAT is {PROCESSED_FORMAT!r}")
 
-    if not preprocessing_dir.exists():
-        raise FileNotFoundError(f"Preprocessing folder not found: {preprocessing_dir}")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        f_load = pool.submit(load_branch, args.debug_intermediates)
+        f_pv = pool.submit(pv_branch, args.debug_intermediates)
+        load_df = f_load.result()
+        pv_df = f_pv.result()
 
-    for script_name in SCRIPT_ORDER:
-        script_path = preprocessing_dir / script_name
-        if not script_path.exists():
-            raise FileNotFoundError(f"Missing preprocessing script: {script_path}")
-        run_step(script_path)
+    load_out = write_processed(load_df, scale_load.out, args.format)
+    pv_out = write_processed(pv_df, prepare_pv.OUT, args.format)
+    print(f"Wrote: {load_out}")
+    print(f"Wrote: {pv_out}")
 
     print("All preprocessing steps finished!")
-    print(f"Processed outputs are now in: {project_root / 'data' / 'processed'}")
+    print(f"Processed outputs are now in: {ROOT / 'data' / 'processed'}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,52 @@
+# Query the partitioned results dataset across runs (sites / scenarios / years) without scanning unrelated files
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import RESULTS_DATASET
+from scripts.pipeline.results_dataset import parse_where, query_results, scan_stats
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Pull rows from the results dataset, e.g. all outage steps in January of scenarios with E < 400 kWh",
+        epilog="example: python3 runners/run_query.py --where 'e_kwh<400' --month 1 --outages --out jan_outages.csv",
+    )
+    parser.add_argument("--where", nargs="+", default=[],
+                        help="Scenario conditions on parameters / metrics (e_kwh<400, policy=reactive, ...)")
+    parser.add_argument("--site", nargs="+", help="Only these sites")
+    parser.add_argument("--scenario", nargs="+", help="Only these scenario ids")
+    parser.add_argument("--year", type=int, nargs="+", help="Only these years")
+    parser.add_argument("--month", type=int, nargs="+", help="Only these months (1-12)")
+    parser.add_argument("--start", help="From this timestamp (inclusive)")
+    parser.add_argument("--end", help="Up to this timestamp (exclusive)")
+    parser.add_argument("--outages", action="store_true", help="Only steps with unserved load")
+    parser.add_argument("--columns", nargs="+", help="Result columns to return (default: all)")
+    parser.add_argument("--dataset", type=Path, default=RESULTS_DATASET)
+    parser.add_argument("--out", type=Path, help="Write the rows to this CSV (default: print a summary)")
+    args = parser.parse_args()
+
+    where = dict(parse_where(w) for w in args.where)
+    opened, total = scan_stats(where, args.site, args.scenario, args.year, args.dataset)
+
+    t0 = time.perf_counter()
+    df = query_results(where, args.site, args.scenario, args.year, args.start, args.end, args.month,
+                       args.outages, args.columns, args.dataset)
+    wall = time.perf_counter() - t0
+    print(f"{len(df)} rows from {opened} of {total} files in {wall:.2f}s")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(args.out, index=False)
+        print(f"Saved: {args.out}")
+    elif not df.empty:
+        agg = {"rows": ("timestamp", "size"), "first": ("timestamp", "min"), "last": ("timestamp", "max")}
+        if "unserved_kw" in df.columns:
+            agg["max_unserved_kw"] = ("unserved_kw", "max")
+        print(df.groupby(["site", "scenario"], observed=True).agg(**agg).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Re-score risk for other weights (alpha, beta, gamma) from the last simulation, without re-simulating
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from config import ALPHA, BETA, GAMMA, DT_H, MAKE_PLOTS, RESCORE_DIR, SUMMARY_STORE
+from scripts.pipeline.rescore import (
+    SIM_CSV, load_components, parse_weights, plot_exceedance_by_weight, rescore, rescore_all, weight_grid,
+)
+from scripts.pipeline.risk_curves import make_risk_curves
+from scripts.pipeline.summary_store import METRIC_KEYS, input_fingerprint, make_row, scenario_params, upsert
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute risk index, curves, top events and metrics for new risk weights")
+    parser.add_argument("--weights", nargs="+", metavar="A,B,G", help="Weight vectors alpha,beta,gamma (e.g. 1,1,1 2,1,0.5)")
+    parser.add_argument("--alpha", type=float, nargs="+", default=[ALPHA], help="Grid of alpha values (used without --weights)")
+    parser.add_argument("--beta", type=float, nargs="+", default=[BETA], help="Grid of beta values (used without --weights)")
+    parser.add_argument("--gamma", type=float, nargs="+", default=[GAMMA], help="Grid of gamma values (used without --weights)")
+    parser.add_argument("--top", type=int, default=5, help="Top risk events kept per weight vector")
+    parser.add_argument("--in-csv", type=Path, default=SIM_CSV)
+    parser.add_argument("--out-dir", type=Path, default=RESCORE_DIR)
+    parser.add_argument("--no-store", action="store_true", help="Do not add the re-scored scenarios to the summary store")
+    args = parser.parse_args()
+
+    if not args.in_csv.exists():
+        raise FileNotFoundError(f"missing {args.in_csv} - run simulation first")
+
+    weights = parse_weights(args.weights) if args.weights else weight_grid(args.alpha, args.beta, args.gamma)
+
+    t0 = time.perf_counter()
+    ts, comp = load_components(args.in_csv)
+    t_load = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    metrics, curves, events = rescore_all(ts, comp, weights, DT_H, args.top)
+    t_score = time.perf_counter() - t0
+    print(f"re-scored {len(weights)} weight vectors over {len(ts)} steps "
+          f"(load {t_load:.2f}s, score {t_score:.2f}s)")
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    metrics.to_csv(args.out_dir / "rescore_metrics.csv", index=False)
+    curves.to_csv(args.out_dir / "risk_exceedance_by_weight.csv", index=False)
+    events.to_csv(args.out_dir / "top_risk_events_by_weight.csv", index=False)
+    print(f"Saved: {args.out_dir / 'rescore_metrics.csv'}")
+    print(f"Saved: {args.out_dir / 'risk_exceedance_by_weight.csv'}")
+    print(f"Saved: {args.out_dir / 'top_risk_events_by_weight.csv'}")
+
+    if MAKE_PLOTS:
+        plot_exceedance_by_weight(curves, args.out_dir / "risk_exceedance_by_weight.png")
+        print(f"Saved: {args.out_dir / 'risk_exceedance_by_weight.png'}")
+        if len(weights) == 1:
+            # the usual risk curves for the single new weight vector
+            df = pd.DataFrame({"risk_index": rescore(comp, weights)[:, 0], "unserved_kw": comp[:, 0]})
+            make_risk_curves(df, args.out_dir / "risk_curves")
+            print(f"Saved risk curves in: {args.out_dir / 'risk_curves'}")
+
+    if not args.no_store:
+        # the other scenario parameters are those of the current config; the own site tag keeps a re-score
+        # from replacing the simulated scenario's row (which also has the degradation metrics), and the
+        # input fingerprint of the re-scored file keeps re-scores of other files apart
+        site = f"rescore-{args.in_csv.stem}"
+        inputs = input_fingerprint(args.in_csv)
+        rows = [
+            make_row(scenario_params(site=site, alpha=r.alpha, beta=r.beta, gamma=r.gamma, inputs=inputs),
+                     {k: getattr(r, k) for k in METRIC_KEYS}, "rescore", steps=len(ts),
+                     in_csv=str(args.in_csv.resolve()))
+            for r in metrics.itertuples(index=False)
+        ]
+        upsert(rows, SUMMARY_STORE)
+        print(f"Saved {len(rows)} scenarios to summary store: {SUMMARY_STORE} (site {site})")
+
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        print(metrics.sort_values("max_risk_index").head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Find the cheapest BESS (energy, power) that meets an unserved-energy / risk target
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    ALIGN_FILL_POLICY, DT_MIN, H_HOURS, MAKE_PLOTS, SIZING_DIR, SUMMARY_STORE,
+    COST_PER_KWH, COST_PER_KW, PROJECT_YEARS, SIZING_TARGET_METRIC, SIZING_TARGET, SIZING_OBJECTIVE,
+)
+from scripts.pipeline.resample import load_inputs
+from scripts.pipeline.sizing import OBJECTIVES, best_size, lifecycle_frontier, min_energy_frontier, plot_frontier
+from scripts.pipeline.summary_store import DEGRADATION_KEYS, METRIC_KEYS, make_row, scenario_params, upsert
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BESS sizing: minimum-cost energy / power pair meeting a target")
+    parser.add_argument("--metric", default=SIZING_TARGET_METRIC, choices=list(METRIC_KEYS), help="Target metric")
+    parser.add_argument("--target", type=float, default=SIZING_TARGET, help="Metric must be <= target")
+    parser.add_argument("--objective", default=SIZING_OBJECTIVE, choices=list(OBJECTIVES),
+                        help="capex, or lifecycle (incl. replacements from cycle wear over PROJECT_YEARS)")
+    parser.add_argument("--p-min", type=float, default=50.0, help="Smallest BESS power (kW)")
+    parser.add_argument("--p-max", type=float, default=1000.0, help="Largest BESS power (kW)")
+    parser.add_argument("--p-steps", type=int, default=20, help="Power grid points")
+    parser.add_argument("--e-max", type=float, default=10000.0, help="Largest BESS energy searched (kWh)")
+    parser.add_argument("--tol", type=float, default=5.0, help="Energy resolution of the frontier (kWh)")
+    parser.add_argument("--per-iter", type=int, default=4, help="Energies tried per power and round")
+    parser.add_argument("--dt-min", type=float, default=DT_MIN, help="Time base (minutes)")
+    parser.add_argument("--out-dir", type=Path, default=SIZING_DIR)
+    parser.add_argument("--no-store", action="store_true", help="Do not add frontier points to the summary store")
+    args = parser.parse_args()
+
+    ts, load_kw, pv_kw, _ = load_inputs(args.dt_min, ALIGN_FILL_POLICY)
+    p_grid = np.linspace(args.p_min, args.p_max, args.p_steps)
+    print(f"sizing: {args.metric} <= {args.target:g}, P {args.p_min:g}-{args.p_max:g} kW ({args.p_steps} points), "
+          f"E up to {args.e_max:g} kWh, {len(ts)} steps")
+
+    t0 = time.perf_counter()
+    frontier, n_eval = min_energy_frontier(
+        load_kw, pv_kw, p_grid, args.e_max,
+        target=args.target, metric=args.metric,
+        tol_kwh=args.tol, per_iter=args.per_iter, dt_min=args.dt_min,
+    )
+    chosen = frontier
+    if args.objective == "lifecycle":
+        # a larger E than the minimum can be cheaper over the project (fewer replacements)
+        chosen, n_life = lifecycle_frontier(load_kw, pv_kw, frontier, args.e_max, tol_kwh=args.tol,
+                                            per_iter=args.per_iter, dt_min=args.dt_min)
+        n_eval += n_life
+    elapsed = time.perf_counter() - t0
+    best = best_size(chosen, args.objective)
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    out_csv = args.out_dir / "sizing_frontier.csv"
+    frontier.to_csv(out_csv, index=False)
+    print(f"Saved: {out_csv} ({n_eval} simulated candidates in {elapsed:.1f}s)")
+    if chosen is not frontier:
+        chosen.to_csv(args.out_dir / "sizing_lifecycle.csv", index=False)
+        print(f"Saved: {args.out_dir / 'sizing_lifecycle.csv'}")
+
+    out_txt = args.out_dir / "sizing_summary.txt"
+    with open(out_txt, "w") as f:
+        f.write("=== BESS sizing ===\n")
+        f.write(f"Target: {args.metric} <= {args.target:g}\n")
+        f.write(f"Cost: {COST_PER_KWH:g} per kWh + {COST_PER_KW:g} per kW\n")
+        f.write(f"Objective: {args.objective} (project {PROJECT_YEARS:g} years)\n")
+        f.write(f"Feasible power points: {int(frontier['feasible'].sum())} of {len(frontier)}\n")
+        if best is None:
+            f.write(f"No feasible size up to E={args.e_max:g} kWh / P={args.p_max:g} kW\n")
+        else:
+            f.write(f"Minimum-cost BESS_E_kWh: {best['e_kwh']:.1f} (minimum E meeting the target: {best['e_min_kwh']:.1f})\n")
+            f.write(f"Minimum-cost BESS_Pmax_kW: {best['p_max_kw']:.1f}\n")
+            f.write(f"Cost: {best['cost']:.0f} (lifecycle {best['lifecycle_cost']:.0f})\n")
+            f.write(f"Equivalent full cycles per year: {best['efc_per_year']:.1f}\n")
+            f.write(f"Estimated cycle life (years): {best['life_years']:.1f}\n")
+            f.write(f"{args.metric} at that size: {best[args.metric]:.2f}\n")
+        f.write(f"Simulated candidates: {n_eval}\n")
+    print(open(out_txt).read().strip())
+
+    if MAKE_PLOTS:
+        out_png = args.out_dir / "sizing_frontier.png"
+        plot_frontier(frontier, best, args.metric, args.target, out_png)
+        print(f"Saved: {out_png}")
+
+    if not args.no_store:
+        h_steps = max(1, int(round(H_HOURS * 60.0 / args.dt_min)))
+        f = frontier[frontier["feasible"]]
+        if chosen is not frontier:
+            f = pd.concat([f, chosen], ignore_index=True)
+        rows = [
+            make_row(scenario_params(dt_min=args.dt_min, h_steps=h_steps, e_kwh=r.e_kwh, p_max_kw=r.p_max_kw,
+                                     policy="reactive"),
+                     {k: getattr(r, k) for k in METRIC_KEYS + DEGRADATION_KEYS}, "sizing", steps=len(ts))
+            for r in f.itertuples(index=False)
+        ]
+        if rows:
+            upsert(rows, SUMMARY_STORE)
+            print(f"Saved {len(rows)} sizing scenarios to summary store: {SUMMARY_STORE}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Run a parameter sweep (time base / BESS size) on the simulation core without re-preprocessing
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import (DT_MIN, E_KWH, P_MAX_KW, SWEEP_DIR, SUMMARY_STORE, DISPATCH_POLICY,
+                    LOAD_CSV, PV_CSV, ALIGN_FILL_POLICY, RESULTS_DATASET)
+from scripts.pipeline.checkpoint import RunCheckpoint, file_stamp
+from scripts.pipeline.inputs import processed_path
+from scripts.pipeline.sim_core import DISPATCH_POLICIES
+from scripts.pipeline.sweep import point_key, run_sweep, sweep_points
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep time base and BESS size over the simulation core")
+    parser.add_argument("--dt-min", type=float, nargs="+", default=[DT_MIN], help="Time bases in minutes (e.g. 5 15 60)")
+    parser.add_argument("--e-kwh", type=float, nargs="+", default=[E_KWH], help="BESS energy capacities (kWh)")
+    parser.add_argument("--p-max-kw", type=float, nargs="+", default=[P_MAX_KW], help="BESS power limits (kW)")
+    parser.add_argument("--policy", nargs="+", default=[DISPATCH_POLICY], choices=list(DISPATCH_POLICIES),
+                        help="Dispatch policies to compare (reactive / lookahead)")
+    parser.add_argument("--out", type=Path, default=SWEEP_DIR / "sweep_summary.csv", help="Output CSV")
+    parser.add_argument("--no-store", action="store_true", help="Do not add the scenarios to the summary store")
+    parser.add_argument("--dataset", action="store_true",
+                        help="Also write every point's time series to the partitioned results dataset")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted sweep: points already in the checkpoint are not run again")
+    parser.add_argument("--checkpoint-dir", type=Path, help="Checkpoint folder (default: checkpoint/ next to --out)")
+    args = parser.parse_args()
+
+    points = sweep_points(args.dt_min, args.e_kwh, args.p_max_kw, args.policy)
+    print(f"sweep: {len(points)} points")
+
+    ckpt = RunCheckpoint(
+        args.checkpoint_dir or args.out.parent / "checkpoint", "sweep",
+        {point_key(p): p for p in points},
+        # stamps of the processed files the sweep actually reads (.parquet with PROCESSED_FORMAT = "parquet")
+        context={"load_csv": file_stamp(processed_path(LOAD_CSV)), "pv_csv": file_stamp(processed_path(PV_CSV)),
+                 "fill_policy": ALIGN_FILL_POLICY},
+        resume=args.resume,
+    )
+    print(f"checkpoint: {ckpt.status()}")
+
+    df = run_sweep(points, store=None if args.no_store else SUMMARY_STORE, checkpoint=ckpt,
+                   dataset=RESULTS_DATASET if args.dataset else None)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(args.out, index=False)
+    print(f"Saved: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Live telemetry service: ingest measurements, publish risk index and early warnings (or run its replay benchmark)
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config import TELEMETRY_DIR, TELEMETRY_SOCKET, TELEMETRY_PORT, TELEMETRY_PUB_PORT, BENCH_DIR
+from scripts.pipeline.forest import FOREST_NPZ
+
+def load_forest(path):
+    from scripts.pipeline.forest import FlatForest
+
+    forest = FlatForest.load(path)
+    print(f"scoring with the early-warning forest {path} ({forest.n_trees} trees)")
+    return forest
+
+async def serve(args) -> None:
+    from scripts.pipeline.telemetry import TelemetryService, log_warnings, serve_ingest, serve_subscribers, tail_csv
+
+    site_params = {}
+    if args.sites:
+        from scripts.pipeline.fleet import read_site_table, site_params as fleet_site_params
+
+        site_params = {s["site"]: fleet_site_params(s) for s in read_site_table(args.sites)}
+
+    forest = load_forest(args.forest) if args.forest else None
+    service = TelemetryService(site_params, forest=forest)
+    TELEMETRY_DIR.mkdir(parents=True, exist_ok=True)
+    tasks = [asyncio.create_task(log_warnings(service.hub.subscribe(warnings_only=True), TELEMETRY_DIR / "warnings.jsonl"))]
+
+    servers = await serve_ingest(service, unix_path=None if args.no_unix else args.unix,
+                                 port=None if args.no_tcp else args.port)
+    servers.append(await serve_subscribers(service.hub, port=args.pub_port))
+    for path in args.tail:
+        tasks.append(asyncio.create_task(service.run_source(tail_csv(path, service))))
+
+    print(f"telemetry service: unix={None if args.no_unix else args.unix} tcp={None if args.no_tcp else args.port} "
+          f"tail={[str(p) for p in args.tail]} subscribers on port {args.pub_port}")
+    print("measurement line format: site,timestamp,load_kw,pv_kw")
+    try:
+        await asyncio.gather(*tasks, *(s.serve_forever() for s in servers))
+    finally:
+        print(f"stopped: {service.stats['records']} records from {len(service.states)} sites "
+              f"({service.stats['stale']} stale, {service.stats['bad_lines']} bad lines)")
+
+def bench(args) -> None:
+    from scripts.benchmarks.telemetry_bench import run_telemetry_bench, save_telemetry_results
+
+    forest = load_forest(args.forest) if args.forest else None
+    rows = []
+    for transport in args.transport:
+        for n_sites in args.bench_sites:
+            r = run_telemetry_bench(n_sites, args.bench_steps, args.speedup, transport,
+                                    args.slow_consumer_ms / 1000.0, args.queue_size, forest)
+            rows.append(r)
+            p99 = r["latency_ms_p99"]
+            print(f"{transport:<7} {r['sites']:>5} sites x {r['steps']} steps: {r['wall_s']:7.2f}s  "
+                  f"{r['throughput_per_s']:10.0f} updates/s  x{r['realtime_factor']:.0f} real time  "
+                  f"p99 latency {p99:.2f} ms  keeps up: {r['keeps_up']}  "
+                  f"slow subscriber dropped {r['slow_subscriber_dropped']}  parity err {r['parity_max_abs_err']:.1e}")
+    path = save_telemetry_results(rows, args.out_dir)
+    print(f"Saved: {path}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Live risk / early-warning service for load and PV telemetry")
+    parser.add_argument("--tail", type=Path, nargs="*", default=[],
+                        help="CSV files to follow (timestamp, load_kw, pv_kw[, site]); site defaults to the file name")
+    parser.add_argument("--unix", default=TELEMETRY_SOCKET, help="UNIX socket for measurement lines")
+    parser.add_argument("--no-unix", action="store_true")
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT, help="Local TCP port for measurement lines")
+    parser.add_argument("--no-tcp", action="store_true")
+    parser.add_argument("--pub-port", type=int, default=TELEMETRY_PUB_PORT, help="Subscribers connect here (JSON lines)")
+    parser.add_argument("--sites", type=Path, help="Site table with per-site parameters (as for run_fleet.py)")
+    parser.add_argument("--forest", type=Path, nargs="?", const=FOREST_NPZ,
+                        help="Add the early-warning model probability (flat forest written by shap_explain)")
+
+    parser.add_argument("--bench", action="store_true", help="Run the replay benchmark instead of the service")
+    parser.add_argument("--bench-sites", type=int, nargs="+", default=[10, 100, 500], help="Concurrent sites to replay")
+    parser.add_argument("--bench-steps", type=int, help="Steps per site (default: the whole year)")
+    parser.add_argument("--speedup", type=float, help="Replay speed (simulated s per wall s); default as fast as possible")
+    parser.add_argument("--transport", nargs="+", default=["inproc"], choices=["inproc", "tcp", "unix"])
+    parser.add_argument("--slow-consumer-ms", type=float, default=0.0,
+                        help="Add a subscriber that needs this long per batch (shows drop_oldest backpressure)")
+    parser.add_argument("--queue-size", type=int, default=64, help="Subscriber queue size in the benchmark")
+    parser.add_argument("--out-dir", type=Path, default=BENCH_DIR)
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args)
+        return
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
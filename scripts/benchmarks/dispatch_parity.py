@@ -0,0 +1,109 @@
+# Self-check of the reactive dispatch fast path: bit-identical to stepping through every step
+import time
+
+import numpy as np
+
+def dispatch_reactive_stepwise(net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis):
+    """
+    Reference: the reactive dispatch loop without the fast-forward of saturated segments
+    """
+    n = len(net)
+    soc_pre_out = np.empty(n)
+    soc_out = np.empty(n)
+    batt_out = np.empty(n)
+    unserved_out = np.zeros(n)
+
+    soc = float(soc0)
+    for i, net_kw in enumerate(np.asarray(net, dtype=float).tolist()):
+        soc_pre_out[i] = soc
+
+        e_avail_dis = max(0.0, (soc - soc_min) * e_kwh)
+        e_avail_chg = max(0.0, (soc_max - soc) * e_kwh)
+        p_dis_feasible = min(p_max_kw, e_avail_dis / dt_h)
+        p_chg_feasible = min(p_max_kw, e_avail_chg / dt_h)
+
+        batt_p = 0.0
+        if net_kw > 0.0:
+            batt_p = min(net_kw, p_dis_feasible)
+            soc -= (batt_p * dt_h) / (eta_dis * e_kwh)
+            unserved_out[i] = max(0.0, net_kw - batt_p)
+        elif net_kw < 0.0:
+            batt_p = -min(-net_kw, p_chg_feasible)
+            soc += (-batt_p * dt_h * eta_ch) / e_kwh
+
+        soc = min(soc_max, max(soc_min, soc))
+        soc_out[i] = soc
+        batt_out[i] = batt_p
+
+    return soc_pre_out, soc_out, batt_out, unserved_out
+
+def random_net(rng, n: int) -> np.ndarray:
+    """
+    Net load with long one-signed stretches (saturates the battery), exact zeros and NaN gaps
+    """
+    runs = []
+    while sum(len(r) for r in runs) < n:
+        m = int(rng.integers(1, max(2, n // 4)))
+        kind = rng.integers(5)
+        if kind == 0:
+            r = rng.normal(0.0, 100.0, m)
+        elif kind == 1:
+            r = np.abs(rng.normal(50.0, 80.0, m))
+        elif kind == 2:
+            r = -np.abs(rng.normal(50.0, 80.0, m))
+        elif kind == 3:
+            r = np.zeros(m)
+        else:
+            r = rng.choice([-300.0, 0.0, 300.0], m)
+        runs.append(r)
+    net = np.concatenate(runs)[:n]
+    net[rng.random(n) < 0.002] = np.nan
+    return net
+
+def _same(a, b) -> bool:
+    # bitwise: tells -0.0 from 0.0 and compares NaN like any other value
+    return a.shape == b.shape and np.ascontiguousarray(a).tobytes() == np.ascontiguousarray(b).tobytes()
+
+def run_dispatch_parity(cases: int = 500, max_steps: int = 5000, batch: int = 4, seed: int = 0) -> dict:
+    """
+    dispatch_reactive and dispatch_reactive_batch vs the stepwise reference on `cases`
+    randomized nets and battery parameters (SoC0 often exactly at a limit)
+    -> counts of mismatching cases and the share of fast-forwarded steps.
+    """
+    from scripts.pipeline.sim_core import dispatch_reactive, dispatch_reactive_batch
+
+    rng = np.random.default_rng(seed)
+    single_bad, batch_bad, steps, fast = [], [], 0, 0
+    t0 = time.perf_counter()
+    for c in range(cases):
+        n = int(rng.integers(1, max_steps + 1))
+        net = random_net(rng, n)
+        soc_min = float(rng.choice([0.0, 0.1, 0.2]))
+        soc_max = float(rng.choice([0.8, 0.9, 1.0]))
+        soc0 = float(rng.choice([soc_min, soc_max, rng.uniform(soc_min, soc_max)]))
+        dt_h = float(rng.choice([1 / 60, 0.25, 1.0]))
+        eta_ch, eta_dis = rng.uniform(0.8, 1.0, 2)
+        e_kwh = rng.uniform(10.0, 2000.0, batch)
+        p_max_kw = rng.uniform(5.0, 500.0, batch)
+
+        refs = [dispatch_reactive_stepwise(net, dt_h, e_kwh[k], p_max_kw[k], soc_min, soc_max, soc0, eta_ch, eta_dis)
+                for k in range(batch)]
+        st = {}
+        out = dispatch_reactive(net, dt_h, e_kwh[0], p_max_kw[0], soc_min, soc_max, soc0, eta_ch, eta_dis, st)
+        if not all(_same(a, b) for a, b in zip(out, refs[0])):
+            single_bad.append(c)
+        steps += st["steps"]
+        fast += st["fast_forward_steps"]
+
+        out = dispatch_reactive_batch(net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis)
+        if not all(_same(a[:, k], b) for k in range(batch) for a, b in zip(out, refs[k])):
+            batch_bad.append(c)
+
+    return {
+        "cases": int(cases),
+        "seed": int(seed),
+        "single_mismatches": single_bad,
+        "batch_mismatches": batch_bad,
+        "fast_forward_pct": 100.0 * fast / max(1, steps),
+        "seconds": time.perf_counter() - t0,
+    }
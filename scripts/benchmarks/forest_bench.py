@@ -0,0 +1,79 @@
+# Latency of the early-warning forest: sklearn predict_proba vs the flat-array traversal (forest.py)
+import time
+
+import numpy as np
+
+from config import DT_MIN, H_HOURS
+
+BATCH_SIZES = (1, 10, 100, 500, 5000)
+
+def _best_ms(fn, repeat: int, budget_s: float = 2.0) -> float:
+    # best of `repeat` calls, fewer when one call is slow
+    fn()
+    best = float("inf")
+    t_end = time.perf_counter() + budget_s
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+        if time.perf_counter() > t_end:
+            break
+    return best * 1e3
+
+def training_data(years: float = 1.0, dt_min: float = DT_MIN, seed: int = 0):
+    """
+    Early-warning dataset of a synthetic site (same features and labels as shap_explain)
+    """
+    from scripts.pipeline.shap_explain import build_dataset
+    from scripts.pipeline.sim_core import simulate
+    from scripts.pipeline.simulate_microgrid import build_results_frame
+    from scripts.preprocessing.synthetic_data import generate_site
+
+    site = generate_site(years, dt_min, seed=seed)
+    h_steps = max(1, int(round(H_HOURS * 60.0 / dt_min)))
+    res = simulate(site["load_kw"].to_numpy(), site["pv_kw"].to_numpy(), dt_h=dt_min / 60.0, h_steps=h_steps)
+    df = build_results_frame(site["timestamp"].to_numpy(), site["load_kw"].to_numpy(), site["pv_kw"].to_numpy(), res)
+    return build_dataset(df, h_steps)
+
+def run_forest_bench(batch_sizes=BATCH_SIZES, repeat: int = 20, seed: int = 0) -> dict:
+    """
+    Fit the forest on synthetic data, export it and time both scoring paths per batch size
+    """
+    from scripts.pipeline.forest import export_forest, parity_error
+    from scripts.pipeline.shap_explain import train_model
+
+    X_train, X_test, y_train, _ = training_data(seed=seed)
+    t0 = time.perf_counter()
+    clf = train_model(X_train, y_train)
+    fit_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    flat = export_forest(clf)
+    export_s = time.perf_counter() - t0
+
+    X_all = X_test.to_numpy()
+    rows = []
+    for b in batch_sizes:
+        idx = np.arange(b) % len(X_all)
+        Xb_df = X_test.iloc[idx]
+        Xb = X_all[idx]
+        x1 = Xb[0] if b == 1 else Xb
+        sk = _best_ms(lambda: clf.predict_proba(Xb_df), repeat)
+        fl = _best_ms(lambda: flat.predict_proba1(x1), repeat)
+        rows.append({
+            "batch": int(b),
+            "sklearn_ms": sk,
+            "flat_ms": fl,
+            "speedup": sk / fl if fl > 0 else None,
+            "flat_us_per_row": 1e3 * fl / b,
+        })
+
+    return {
+        "trees": flat.n_trees,
+        "nodes": int(len(flat.feature)),
+        "depth": flat.depth,
+        "fit_s": fit_s,
+        "export_s": export_s,
+        "parity_max_abs_err": parity_error(clf, flat, X_test),
+        "batches": rows,
+    }
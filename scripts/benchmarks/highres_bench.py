@@ -0,0 +1,56 @@
+# Scaling of the chunked high-resolution simulation: runtime and peak memory vs number of steps
+import time
+import tracemalloc
+
+from config import HIGHRES_CHUNK_STEPS
+
+# one year at 5 min, 1 min, 20 s and 5 s: 105k to 6.3M steps (--highres-dt 1 adds 31.5M)
+DT_S_LEVELS = (300, 60, 20, 5)
+
+def run_highres_bench(dt_s_levels=DT_S_LEVELS, years: float = 1.0, chunk_steps: int = HIGHRES_CHUNK_STEPS,
+                      memory: bool = True, seed: int = 0) -> dict:
+    """
+    Simulate one synthetic site at every time step in dt_s_levels -> wall time, ns per step and
+    peak traced memory per size. Linear scaling shows as a flat ns/step; the chunked core
+    keeps the peak memory flat once the series is longer than one chunk.
+    """
+    from scripts.pipeline.highres import simulate_highres
+    from scripts.preprocessing.synthetic_data import generate_site
+
+    site = generate_site(years, 15, seed=seed)
+    ts = site["timestamp"].to_numpy("datetime64[ns]").view("int64")
+    load, pv = site["load_kw"].to_numpy(), site["pv_kw"].to_numpy()
+
+    def run():
+        return simulate_highres(ts, load, pv, dt_s=dt_s, chunk_steps=chunk_steps)
+
+    rows = []
+    for dt_s in sorted(dt_s_levels, reverse=True):
+        t0 = time.perf_counter()
+        res = run()
+        wall = time.perf_counter() - t0
+        peak_mb = None
+        if memory:
+            tracemalloc.start()
+            run()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+        n = res["steps"]
+        rows.append({
+            "dt_s": float(dt_s),
+            "steps": int(n),
+            "wall_s": wall,
+            "ns_per_step": 1e9 * wall / n,
+            "peak_mb": peak_mb,
+            "fast_forward_pct": 100.0 * res["dispatch_stats"]["fast_forward_steps"] / n,
+            **{k: v for k, v in res["timings"].items()},
+        })
+
+    per_step = [r["ns_per_step"] for r in rows]
+    return {
+        "years": years,
+        "chunk_steps": int(chunk_steps),
+        "sizes": rows,
+        # 1.0 = perfectly linear; the smallest run also pays the fixed per-call costs
+        "ns_per_step_spread": max(per_step) / min(per_step),
+    }
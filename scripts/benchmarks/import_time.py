@@ -0,0 +1,73 @@
+# Startup cost of the pipeline entry points, measured with python -X importtime
+import subprocess
+import sys
+
+from config import PROJECT_ROOT
+
+ENTRY_POINTS = [
+    "scripts.pipeline.simulate_microgrid",
+    "scripts.pipeline.risk_curves",
+    "scripts.pipeline.event_examples",
+    "scripts.pipeline.shap_explain",
+    "scripts.pipeline.predictive_vs_reactive",
+    "scripts.pipeline.make_report",
+    "scripts.pipeline.sweep",
+    "runners.run_preprocessing",
+    "runners.run_sweep",
+]
+
+# packages that should only be loaded when a stage actually plots / fits / explains
+HEAVY = ("matplotlib", "shap", "sklearn", "scipy", "reportlab")
+
+def parse_importtime(stderr: str) -> list:
+    """
+    (module, self_us, cumulative_us, depth) for every line of -X importtime output
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows
+
+def measure_import(module: str, top: int = 5) -> dict:
+    """
+    Import one module in a fresh interpreter and summarise where the time went
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    proc = subprocess.run(cmd, cwd=str(PROJECT_ROOT), capture_output=True, text=True)
+    if proc.returncode != 0:
+        err = proc.stderr.strip().splitlines()
+        return {"module": module, "error": err[-1] if err else "import failed"}
+
+    rows = parse_importtime(proc.stderr)
+    # least-indented lines are the direct imports of the entry point
+    min_depth = min((r[3] for r in rows), default=0)
+    tops = [r for r in rows if r[3] == min_depth]
+    total_us = sum(r[2] for r in tops)
+    loaded = {r[0].split(".")[0] for r in rows}
+
+    heaviest = sorted(tops, key=lambda r: r[2], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": total_us / 1000.0,
+        "heaviest": [{"package": r[0], "cumulative_ms": r[2] / 1000.0} for r in heaviest],
+        "heavy_loaded": sorted(p for p in HEAVY if p in loaded),
+    }
+
+def run_import_bench(modules=ENTRY_POINTS) -> list:
+    results = []
+    for m in modules:
+        r = measure_import(m)
+        results.append(r)
+        if "error" in r:
+            print(f"{m:<42} error: {r['error']}")
+            continue
+        heavy = ",".join(r["heavy_loaded"]) or "-"
+        print(f"{m:<42} {r['total_ms']:8.1f} ms  heavy: {heavy}")
+    return results
@@ -0,0 +1,269 @@
+# Offline benchmark suite: every pipeline stage on synthetic data of several sizes
+import contextlib
+import importlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")
+
+from config import PROJECT_ROOT, BENCH_DIR, H_HOURS
+from scripts.preprocessing.synthetic_data import generate_site
+
+def measure(fn, ctx: dict, repeat: int = 1, memory: bool = True) -> dict:
+    """
+    Wall / CPU time (best of `repeat`) and, in a separate run, peak traced allocation
+    """
+    wall, cpu = [], []
+    for _ in range(max(1, repeat)):
+        w0, c0 = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(ctx)
+        wall.append(time.perf_counter() - w0)
+        cpu.append(time.process_time() - c0)
+
+    out = {"wall_s": min(wall), "cpu_s": min(cpu), "peak_mb": None}
+    if memory:
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn(ctx)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        out["peak_mb"] = peak / 1e6
+    return out
+
+def _frame_mb(df: pd.DataFrame) -> float:
+    return float(df.memory_usage(deep=True).sum()) / 1e6
+
+# Cases (each reads what earlier cases left in ctx)
+def _case_simulate(ctx):
+    from scripts.pipeline.sim_core import simulate
+    from scripts.pipeline.simulate_microgrid import build_results_frame
+
+    res = simulate(ctx["load_kw"], ctx["pv_kw"], dt_h=ctx["dt_h"], h_steps=ctx["h_steps"])
+    ctx["df"] = build_results_frame(ctx["ts"], ctx["load_kw"], ctx["pv_kw"], res, compact=False)
+    ctx["frame_mb"] = _frame_mb(ctx["df"])
+    st = res["dispatch_stats"]
+    ctx["fast_forward_pct"] = 100.0 * st["fast_forward_steps"] / max(1, st["steps"])
+
+def _case_simulate_compact(ctx):
+    from scripts.pipeline.sim_core import simulate
+    from scripts.pipeline.simulate_microgrid import build_results_frame
+
+    res = simulate(ctx["load_kw"], ctx["pv_kw"], dt_h=ctx["dt_h"], h_steps=ctx["h_steps"])
+    df = build_results_frame(ctx["ts"], ctx["load_kw"], ctx["pv_kw"], res, compact=True)
+    ctx["frame_mb"] = _frame_mb(df)
+
+def _case_write_results(ctx):
+    ctx["results_csv"] = ctx["dirs"]["sim"] / "sim_results.csv"
+    ctx["df"].to_csv(ctx["results_csv"], index=False)
+
+def _case_reload(ctx):
+    from scripts.pipeline.results_io import read_results
+    ctx["frame_mb"] = _frame_mb(read_results(ctx["results_csv"], compact=False))
+
+def _case_reload_compact(ctx):
+    from scripts.pipeline.results_io import read_results
+    ctx["frame_mb"] = _frame_mb(read_results(ctx["results_csv"], compact=True))
+
+def _case_summary_cube(ctx):
+    from scripts.pipeline.summary_cube import CUBE_PARQUET, build_cube, write_cube
+    ctx["cube"] = build_cube(ctx["df"], ctx["dt_h"])
+    write_cube(ctx["cube"], ctx["dirs"]["sim"] / CUBE_PARQUET.name)
+
+def _case_quicklooks(ctx):
+    from scripts.pipeline.simulate_microgrid import write_quicklooks
+    write_quicklooks(ctx["df"], ctx["dirs"]["sim"] / "quicklooks", ctx.get("cube"))
+
+def _case_risk_curves(ctx):
+    from scripts.pipeline.risk_curves import make_risk_curves
+    make_risk_curves(ctx["df"], ctx["dirs"]["risk"])
+
+def _case_label_future_event(ctx):
+    from scripts.pipeline.predictive_vs_reactive import compute_future_event
+    compute_future_event((ctx["df"]["unserved_kw"].to_numpy() > 0.0).astype(int), ctx["h_steps"])
+
+def _case_label_risk_next_h(ctx):
+    from scripts.pipeline.shap_explain import label_risk_next_h
+    label_risk_next_h(ctx["df"]["risk_event"].astype(int).to_numpy(), ctx["h_steps"])
+
+def _case_warning_eval(ctx):
+    from scripts.pipeline.predictive_vs_reactive import evaluate, write_plots, write_summaries
+    ev = evaluate(ctx["df"], ctx["h_steps"], ctx["dt_min"])
+    out = ctx["dirs"]["compare"]
+    write_summaries(ev, out / "predictive_vs_reactive_summary.txt", out / "predictive_vs_reactive_operator.txt")
+    write_plots(ev, ctx["df"], out)
+
+def _case_event_extraction(ctx):
+    from scripts.pipeline.event_examples import make_event_examples
+    make_event_examples(ctx["df"], ctx["dirs"]["events"])
+
+def _case_rf_fit(ctx):
+    from scripts.pipeline.shap_explain import build_dataset, train_model
+    X_train, X_test, y_train, _ = build_dataset(ctx["df"], ctx["h_steps"])
+    ctx["clf"] = train_model(X_train, y_train)
+    ctx["X_test"] = X_test
+
+def _case_shap(ctx):
+    from scripts.pipeline.shap_explain import N_EXPLAIN, explain, write_shap_outputs
+    X_explain = ctx["X_test"].iloc[:N_EXPLAIN]
+    sv = explain(ctx["clf"], X_explain)
+    write_shap_outputs(sv, X_explain, ctx["dirs"]["xai"])
+
+def _case_report(ctx):
+    from scripts.pipeline.make_report import build_report, report_inputs
+    d = ctx["dirs"]
+    inputs = report_inputs(d["sim"], d["risk"], d["events"], d["xai"], d["compare"])
+    build_report(d["report"] / "microgrid_stability_report.pdf", inputs)
+
+CASES = [
+    ("simulate", _case_simulate),
+    ("simulate_compact", _case_simulate_compact),
+    ("write_results", _case_write_results),
+    ("reload", _case_reload),
+    ("reload_compact", _case_reload_compact),
+    ("summary_cube", _case_summary_cube),
+    ("quicklooks", _case_quicklooks),
+    ("risk_curves", _case_risk_curves),
+    ("label_future_event", _case_label_future_event),
+    ("label_risk_next_h", _case_label_risk_next_h),
+    ("warning_eval", _case_warning_eval),
+    ("event_extraction", _case_event_extraction),
+    ("rf_fit", _case_rf_fit),
+    ("shap", _case_shap),
+    ("report", _case_report),
+]
+
+CASE_MODULES = {
+    "simulate": "scripts.pipeline.simulate_microgrid",
+    "simulate_compact": "scripts.pipeline.simulate_microgrid",
+    "write_results": "scripts.pipeline.simulate_microgrid",
+    "reload": "scripts.pipeline.results_io",
+    "reload_compact": "scripts.pipeline.results_io",
+    "summary_cube": "scripts.pipeline.summary_cube",
+    "quicklooks": "scripts.pipeline.simulate_microgrid",
+    "risk_curves": "scripts.pipeline.risk_curves",
+    "label_future_event": "scripts.pipeline.predictive_vs_reactive",
+    "label_risk_next_h": "scripts.pipeline.shap_explain",
+    "warning_eval": "scripts.pipeline.predictive_vs_reactive",
+    "event_extraction": "scripts.pipeline.event_examples",
+    "rf_fit": "scripts.pipeline.shap_explain",
+    "shap": "scripts.pipeline.shap_explain",
+    "report": "scripts.pipeline.make_report",
+}
+
+def _requires(name: str):
+    # import the stage module up front: import time is not part of the case, and a
+    # missing optional dependency (shap, reportlab) turns into a skip
+    importlib.import_module(CASE_MODULES[name])
+
+def make_context(years: float, dt_min: float, seed: int, work_dir: Path) -> dict:
+    df = generate_site(years, dt_min, seed=seed)
+    dirs = {k: work_dir / k for k in ("sim", "risk", "events", "xai", "compare", "report")}
+    for d in dirs.values():
+        d.mkdir(parents=True, exist_ok=True)
+
+    return {
+        "ts": df["timestamp"].to_numpy(),
+        "load_kw": df["load_kw"].to_numpy(),
+        "pv_kw": df["pv_kw"].to_numpy(),
+        "dt_min": dt_min,
+        "dt_h": dt_min / 60.0,
+        "h_steps": max(1, int(round(H_HOURS * 60.0 / dt_min))),
+        "dirs": dirs,
+    }
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=str(PROJECT_ROOT), capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run_suite(sizes_years, dt_min: float = 15, cases=None, repeat: int = 1, memory: bool = True, seed: int = 0) -> dict:
+    selected = [(n, f) for n, f in CASES if cases is None or n in cases]
+    results = []
+
+    for years in sizes_years:
+        with tempfile.TemporaryDirectory(prefix="sc_bench_") as tmp:
+            ctx = make_context(years, dt_min, seed, Path(tmp))
+            steps = len(ctx["ts"])
+            for name, fn in selected:
+                row = {"case": name, "years": years, "dt_min": dt_min, "steps": steps}
+                try:
+                    _requires(name)
+                    row.update(measure(fn, ctx, repeat, memory))
+                    # in-memory size of the results frame the case built (float64 vs compact)
+                    if "frame_mb" in ctx:
+                        row["frame_mb"] = ctx.pop("frame_mb")
+                    # share of dispatch steps filled in closed form at a SoC limit
+                    if "fast_forward_pct" in ctx:
+                        row["fast_forward_pct"] = ctx.pop("fast_forward_pct")
+                    row["status"] = "ok"
+                except ImportError as e:
+                    row["status"] = f"skipped ({e.name} not installed)"
+                except KeyError as e:
+                    row["status"] = f"skipped (needs {e.args[0]} from an earlier case)"
+                results.append(row)
+                _print_row(row)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def _print_row(row: dict):
+    if row.get("status") != "ok":
+        print(f"{row['case']:<20} {row['years']:>6g}y  {row['status']}")
+        return
+    peak = f"{row['peak_mb']:9.1f} MB" if row.get("peak_mb") is not None else "        -   "
+    frame = f"  frame {row['frame_mb']:7.1f} MB" if row.get("frame_mb") is not None else ""
+    ff = f"  fast-forward {row['fast_forward_pct']:4.1f}%" if row.get("fast_forward_pct") is not None else ""
+    print(f"{row['case']:<20} {row['years']:>6g}y  {row['steps']:>9d} steps  "
+          f"wall {row['wall_s']:8.3f}s  cpu {row['cpu_s']:8.3f}s  peak {peak}{frame}{ff}")
+
+def save_results(data: dict, out_dir: Path = BENCH_DIR) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = data["meta"]["created_utc"].replace(":", "").replace("-", "")
+    path = out_dir / f"bench_{stamp}_{data['meta']['commit']}.json"
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    (out_dir / "latest.json").write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return path
+
+def compare(current: dict, baseline: dict, threshold: float = 1.2) -> list:
+    """
+    Rows of (case, years, baseline wall, current wall, ratio, flag) for cases present in both runs
+    """
+    base = {(r["case"], r["years"], r.get("dt_min")): r for r in baseline["results"] if r.get("status") == "ok"}
+    rows = []
+    for r in current["results"]:
+        b = base.get((r["case"], r["years"], r.get("dt_min")))
+        if r.get("status") != "ok" or b is None or b["wall_s"] <= 0:
+            continue
+        ratio = r["wall_s"] / b["wall_s"]
+        rows.append((r["case"], r["years"], b["wall_s"], r["wall_s"], ratio, "REGRESSION" if ratio > threshold else ""))
+    return rows
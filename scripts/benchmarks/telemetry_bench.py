@@ -0,0 +1,204 @@
+# Replay benchmark of the live telemetry service: many sites x one historical year at accelerated speed
+import asyncio
+import json
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import BENCH_DIR, DT_MIN, H_STEPS
+from scripts.benchmarks.suite import git_commit
+from scripts.pipeline.telemetry import Hub, TelemetryService, serve_ingest
+
+TRANSPORTS = ("inproc", "tcp", "unix")
+
+def replay_profiles(n_sites: int, steps: int = None):
+    """
+    (timestamps as ISO strings, load (n_sites, steps), pv (n_sites, steps)) - the processed
+    inputs (synthetic site if they are missing), shifted and scaled per site
+    """
+    try:
+        from scripts.pipeline.resample import load_inputs
+
+        ts, load_kw, pv_kw, _ = load_inputs()
+    except FileNotFoundError:
+        from scripts.preprocessing.synthetic_data import generate_site
+
+        df = generate_site(1.0, DT_MIN)
+        ts, load_kw, pv_kw = df["timestamp"].to_numpy(), df["load_kw"].to_numpy(), df["pv_kw"].to_numpy()
+
+    n = len(ts) if steps is None else min(steps, len(ts))
+    ts_str = pd.DatetimeIndex(ts[:n]).strftime("%Y-%m-%dT%H:%M:%S").tolist()
+    k = np.arange(n_sites)[:, None]
+    idx = (np.arange(n)[None, :] + 97 * k) % len(load_kw)
+    scale = 0.8 + 0.4 * (k / max(1, n_sites - 1))
+    return ts_str, np.asarray(load_kw)[idx] * scale, np.asarray(pv_kw)[idx]
+
+async def _replay(n_sites, steps, speedup, transport, slow_consumer_s, queue_size, forest=None):
+    ts, load, pv = replay_profiles(n_sites, steps)
+    n = len(ts)
+    sites = [f"site{k:04d}" for k in range(n_sites)]
+    tick_of = {t: i for i, t in enumerate(ts)}
+
+    hub = Hub()
+    service = TelemetryService(hub=hub, forest=forest)
+    meter = hub.subscribe(maxsize=queue_size, policy="block")
+    warn_sub = hub.subscribe(maxsize=queue_size, policy="block", warnings_only=True)
+    slow = hub.subscribe(maxsize=queue_size, policy="drop_oldest") if slow_consumer_s > 0 else None
+
+    sent_ns = np.zeros(n, dtype=np.int64)
+    lat_ns = []
+    site0 = []
+    expected = n * n_sites
+    done = asyncio.Event()
+    counts = {"updates": 0, "warnings": 0}
+
+    async def consume():
+        while counts["updates"] < expected:
+            updates = await meter.get()
+            now = time.perf_counter_ns()
+            counts["updates"] += len(updates)
+            lat_ns.append(now - sent_ns[tick_of[updates[-1]["timestamp"]]])
+            site0.extend(u["risk_index"] for u in updates if u["site"] == sites[0])
+        done.set()
+
+    async def consume_warnings():
+        while True:
+            counts["warnings"] += len(await warn_sub.get())
+
+    async def consume_slow():
+        while True:
+            await slow.get()
+            await asyncio.sleep(slow_consumer_s)
+
+    interval = (DT_MIN * 60.0 / speedup) if speedup else 0.0
+
+    async def ticks():
+        t0 = time.perf_counter()
+        for i in range(n):
+            if interval:
+                delay = t0 + i * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            sent_ns[i] = time.perf_counter_ns()
+            yield i
+            if not interval and i % 64 == 0:
+                await asyncio.sleep(0)  # let the subscribers run when replaying flat out
+
+    async def inproc_source():
+        col_l, col_p = load.T.tolist(), pv.T.tolist()
+        async for i in ticks():
+            yield list(zip(sites, [ts[i]] * n_sites, col_l[i], col_p[i]))
+
+    tasks = [asyncio.create_task(consume()), asyncio.create_task(consume_warnings())]
+    if slow is not None:
+        tasks.append(asyncio.create_task(consume_slow()))
+
+    servers = []
+    tmp = tempfile.TemporaryDirectory(prefix="sc_tel_")
+    t_start = time.perf_counter()
+    if transport == "inproc":
+        await service.run_source(inproc_source())
+    else:
+        if transport == "tcp":
+            servers = await serve_ingest(service, port=0)
+            port = servers[0].sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        else:
+            path = Path(tmp.name) / "telemetry.sock"
+            servers = await serve_ingest(service, unix_path=path)
+            reader, writer = await asyncio.open_unix_connection(str(path))
+        # lines are formatted up front: the harness should not be the bottleneck
+        payload = [
+            "".join(f"{s},{ts[i]},{l!r},{p!r}\n" for s, l, p in zip(sites, load[:, i].tolist(), pv[:, i].tolist())).encode()
+            for i in range(n)
+        ]
+        async for i in ticks():
+            writer.write(payload[i])
+            await writer.drain()
+        writer.close()
+    await done.wait()
+    wall = time.perf_counter() - t_start
+
+    for t in tasks:
+        t.cancel()
+    for s in servers:
+        s.close()
+    tmp.cleanup()
+
+    return {
+        "sites": n_sites,
+        "steps": n,
+        "updates": counts["updates"],
+        "warnings": counts["warnings"],
+        "ts": ts,
+        "load0": load[0],
+        "pv0": pv[0],
+        "site0_risk": np.array(site0),
+        "lat_ns": np.array(lat_ns, dtype=float),
+        "wall_s": wall,
+        "slow_dropped": slow.dropped if slow is not None else None,
+        "stats": dict(service.stats),
+    }
+
+def parity_error(load_kw, pv_kw, risk_stream, h_steps=H_STEPS) -> float:
+    """
+    Max |live - offline| risk index of one site; the last h_steps - 1 steps are left out
+    because the offline horizon shrinks at the end of the series
+    """
+    from scripts.pipeline.sim_core import simulate
+
+    ref = simulate(load_kw, pv_kw)["risk_index"]
+    m = max(0, len(ref) - h_steps + 1)
+    return float(np.abs(ref[:m] - risk_stream[:m]).max()) if m else 0.0
+
+def run_telemetry_bench(n_sites=100, steps=None, speedup=None, transport="inproc",
+                        slow_consumer_s=0.0, queue_size=64, forest=None) -> dict:
+    """
+    Replay n_sites x steps (None = the whole year) through the service.
+    speedup: simulated seconds per wall second (None = as fast as possible).
+    forest: FlatForest to score every step with (early-warning model probability).
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"unknown transport {transport!r} (expected one of {TRANSPORTS})")
+    r = asyncio.run(_replay(n_sites, steps, speedup, transport, slow_consumer_s, queue_size, forest))
+
+    lat_ms = r["lat_ns"] / 1e6
+    throughput = r["updates"] / r["wall_s"] if r["wall_s"] > 0 else float("inf")
+    # real time needs sites / dt updates per second; the replay shows how many times faster it could run
+    realtime_rate = r["sites"] / (DT_MIN * 60.0)
+    interval = DT_MIN * 60.0 / speedup if speedup else None
+    out = {
+        "transport": transport,
+        "forest": forest is not None,
+        "sites": r["sites"],
+        "steps": r["steps"],
+        "updates": r["updates"],
+        "warning_transitions": r["warnings"],
+        "speedup": speedup,
+        "wall_s": r["wall_s"],
+        "throughput_per_s": throughput,
+        "realtime_factor": throughput / realtime_rate,
+        # paced replay keeps up when a tick is published before the next one arrives
+        "keeps_up": bool(interval is None or (len(lat_ms) and np.percentile(lat_ms, 99) < interval * 1e3)),
+        "lag_s": (r["wall_s"] - (r["steps"] - 1) * interval) if interval else None,
+        "latency_ms_p50": float(np.percentile(lat_ms, 50)) if len(lat_ms) else None,
+        "latency_ms_p99": float(np.percentile(lat_ms, 99)) if len(lat_ms) else None,
+        "latency_ms_max": float(lat_ms.max()) if len(lat_ms) else None,
+        "slow_subscriber_dropped": r["slow_dropped"],
+        "stale_records": r["stats"]["stale"],
+        "bad_lines": r["stats"]["bad_lines"],
+        "parity_max_abs_err": parity_error(r["load0"], r["pv0"], r["site0_risk"]),
+    }
+    return out
+
+def save_telemetry_results(rows: list, out_dir: Path = BENCH_DIR) -> Path:
+    meta = {"commit": git_commit(), "created_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = meta["created_utc"].replace(":", "").replace("-", "")
+    path = out_dir / f"telemetry_{stamp}_{meta['commit']}.json"
+    path.write_text(json.dumps({"meta": meta, "results": rows}, indent=2), encoding="utf-8")
+    return path
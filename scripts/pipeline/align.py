@@ -0,0 +1,137 @@
+# Time alignment of load / pv inputs onto one regular DT_MIN grid
+import numpy as np
+
+FILL_POLICIES = ("interpolate", "ffill", "zero", "drop")
+
+def to_epoch_ns(ts) -> np.ndarray:
+    """
+    Timestamps (Series / DatetimeIndex / datetime64 array / int64 ns) -> int64 ns since epoch
+    """
+    if hasattr(ts, "to_numpy"):
+        ts = ts.to_numpy()
+    ts = np.asarray(ts)
+    if ts.dtype.kind == "M":
+        return ts.astype("datetime64[ns]").view("int64")
+    return ts.astype("int64", copy=False)
+
+def snap_to_grid(ts_ns: np.ndarray, values: np.ndarray, t0_ns: int, step_ns: int, n_steps: int):
+    """
+    Put samples on the grid t0 + k*step (nearest slot), averaging samples sharing a slot.
+
+    Single linear pass (bincount), so the input does not have to be merged against the
+    grid. Returns (grid_values with NaN for empty slots, stats dict).
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+
+    rel = ts_ns - t0_ns
+    idx = (rel + step_ns // 2) // step_ns
+    inside = (idx >= 0) & (idx < n_steps)
+
+    keep = inside & valid
+    idx_k = idx[keep]
+    v_k = values[keep]
+
+    counts = np.bincount(idx_k, minlength=n_steps)
+    sums = np.bincount(idx_k, weights=v_k, minlength=n_steps)
+
+    out = np.full(n_steps, np.nan)
+    has = counts > 0
+    out[has] = sums[has] / counts[has]
+
+    stats = {
+        "samples": int(len(values)),
+        "nan_samples": int((~valid).sum()),
+        "dropped_outside_range": int((~inside & valid).sum()),
+        "snapped_off_grid": int(((rel[keep] % step_ns) != 0).sum()),
+        "duplicated": int(len(idx_k) - has.sum()),
+        "missing_steps": int((~has).sum()),
+    }
+    return out, stats
+
+def fill_gaps(values: np.ndarray, policy: str) -> np.ndarray:
+    if policy not in FILL_POLICIES:
+        raise ValueError(f"unknown fill policy {policy!r} (expected one of {FILL_POLICIES})")
+
+    missing = np.isnan(values)
+    if not missing.any() or policy == "drop":
+        return values
+    if missing.all():
+        raise RuntimeError("input has no samples inside the aligned time range")
+
+    out = values.copy()
+    if policy == "zero":
+        out[missing] = 0.0
+    elif policy == "ffill":
+        pos = np.where(~missing, np.arange(len(out)), 0)
+        np.maximum.accumulate(pos, out=pos)
+        out = out[pos]
+        # leading gap: take the first valid value
+        first = int(np.argmax(~missing))
+        out[:first] = values[first]
+    else:
+        x = np.arange(len(out))
+        out[missing] = np.interp(x[missing], x[~missing], values[~missing])
+    return out
+
+def align_series(series, dt_min: float, policy: str = "interpolate"):
+    """
+    Align several (timestamps, values) pairs onto their common DT_MIN grid.
+
+    series: {name: (timestamps, values)}
+    Returns (grid timestamps as datetime64[ns], {name: aligned values}, report dict).
+    The grid covers the overlap of all inputs (like an inner join), gaps inside it
+    are filled with `policy`; "drop" removes every step where any input is missing.
+    """
+    step_ns = int(round(dt_min * 60 * 1e9))
+
+    parsed = {}
+    starts, ends = [], []
+    for name, (ts, vals) in series.items():
+        ts_ns = to_epoch_ns(ts)
+        vals = np.asarray(vals, dtype=float)
+        if len(ts_ns) == 0:
+            raise RuntimeError(f"input '{name}' is empty")
+        ok = ~np.isnan(vals)
+        if not ok.any():
+            raise RuntimeError(f"input '{name}' has no valid values")
+        parsed[name] = (ts_ns, vals)
+        starts.append(int(ts_ns[ok].min()))
+        ends.append(int(ts_ns[ok].max()))
+
+    # overlap, snapped to whole grid steps
+    t0 = -((-max(starts)) // step_ns) * step_ns
+    t1 = (min(ends) // step_ns) * step_ns
+    if t1 < t0:
+        raise RuntimeError("inputs do not overlap in time")
+    n_steps = int((t1 - t0) // step_ns) + 1
+
+    aligned = {}
+    report = {"dt_min": dt_min, "fill_policy": policy, "grid_steps": n_steps}
+    for name, (ts_ns, vals) in parsed.items():
+        grid_vals, stats = snap_to_grid(ts_ns, vals, t0, step_ns, n_steps)
+        filled = fill_gaps(grid_vals, policy)
+        stats["filled"] = 0 if policy == "drop" else stats["missing_steps"]
+        for k, v in stats.items():
+            report[f"{name}_{k}"] = v
+        aligned[name] = filled
+
+    grid = t0 + step_ns * np.arange(n_steps, dtype="int64")
+    if policy == "drop":
+        keep = np.ones(n_steps, dtype=bool)
+        for v in aligned.values():
+            keep &= ~np.isnan(v)
+        grid = grid[keep]
+        aligned = {k: v[keep] for k, v in aligned.items()}
+        report["dropped_steps"] = int((~keep).sum())
+    else:
+        report["dropped_steps"] = 0
+
+    report["aligned_steps"] = int(len(grid))
+    return grid.view("datetime64[ns]"), aligned, report
+
+def format_report(report: dict) -> str:
+    lines = ["=== Input alignment ==="]
+    for k, v in report.items():
+        lines.append(f"{k}: {v}")
+    return "\n".join(lines) + "\n"
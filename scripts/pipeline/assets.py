@@ -0,0 +1,260 @@
+# Multi-asset microgrid: battery strings, gensets and extra PV arrays held in contiguous arrays
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    DT_H, H_STEPS,
+    E_KWH, P_MAX_KW, SOC_MIN, SOC_MAX, SOC0, ETA_CH, ETA_DIS,
+    ALPHA, BETA, GAMMA,
+    ASSET_ALLOCATION,
+)
+
+KINDS = ("battery", "genset", "pv")
+ALLOCATION_RULES = ("priority", "proportional")
+
+# registry columns and their defaults (assets.csv may leave any of them out)
+ASSET_FIELDS = {
+    "name": None,
+    "kind": None,
+    "e_kwh": 0.0,
+    "p_max_kw": 0.0,
+    "soc_min": SOC_MIN,
+    "soc_max": SOC_MAX,
+    "soc0": SOC0,
+    "eta_ch": ETA_CH,
+    "eta_dis": ETA_DIS,
+    "priority": 0,
+    "pv_scale": 1.0,          # pv: multiple of the site PV profile (pv_kw)
+    "fuel_l_per_kwh": 0.0,    # genset: fuel use
+}
+
+class AssetRegistry:
+    """
+    Per-asset parameters as one array per field (row i = asset i), so the dispatch
+    step works on whole arrays instead of per-object attribute lookups.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.copy()
+        for k, v in ASSET_FIELDS.items():
+            if k not in df.columns:
+                if v is None:
+                    raise ValueError(f"asset table needs a {k!r} column")
+                df[k] = v
+            elif v is not None:
+                df[k] = df[k].fillna(v)
+        bad = sorted(set(df["kind"]) - set(KINDS))
+        if bad:
+            raise ValueError(f"unknown asset kinds {bad} (expected {KINDS})")
+        if df["name"].duplicated().any():
+            raise ValueError("asset names must be unique")
+
+        self.table = df[list(ASSET_FIELDS)].reset_index(drop=True)
+        self.names = self.table["name"].astype(str).tolist()
+        self.kind = self.table["kind"].to_numpy()
+        for k in ASSET_FIELDS:
+            if k not in ("name", "kind"):
+                setattr(self, k, self.table[k].to_numpy(dtype=float))
+
+        self.battery = np.flatnonzero(self.kind == "battery")
+        self.genset = np.flatnonzero(self.kind == "genset")
+        self.pv = np.flatnonzero(self.kind == "pv")
+        if len(self.battery) and (self.e_kwh[self.battery] <= 0).any():
+            raise ValueError("every battery needs e_kwh > 0")
+
+    def __len__(self):
+        return len(self.names)
+
+    def key(self) -> str:
+        """
+        Short hash of the asset table (tells registries apart in the summary store)
+        """
+        blob = self.table.to_csv(index=False).encode("utf-8")
+        return hashlib.sha1(blob).hexdigest()[:8]
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(Path(path)))
+
+    @classmethod
+    def from_config(cls):
+        """
+        The single-battery model of config.py (site PV + one BESS)
+        """
+        return cls(pd.DataFrame([
+            {"name": "pv", "kind": "pv", "pv_scale": 1.0},
+            {"name": "bess", "kind": "battery", "e_kwh": E_KWH, "p_max_kw": P_MAX_KW,
+             "soc_min": SOC_MIN, "soc_max": SOC_MAX, "soc0": SOC0, "eta_ch": ETA_CH, "eta_dis": ETA_DIS},
+        ]))
+
+    def levels(self, members: np.ndarray, rule: str) -> list:
+        """
+        Allocation order for `members`: list of index arrays served one after the other.
+        priority: ascending priority value, ties share; proportional: batteries share
+        first, gensets cover the rest.
+        """
+        if rule == "priority":
+            pr = self.priority[members]
+            return [members[pr == p] for p in np.unique(pr)]
+        if rule == "proportional":
+            bat = members[self.kind[members] == "battery"]
+            gen = members[self.kind[members] == "genset"]
+            return [lv for lv in (bat, gen) if len(lv)]
+        raise ValueError(f"unknown allocation rule {rule!r} (expected one of {ALLOCATION_RULES})")
+
+def _allocate(demand: float, cap: np.ndarray, levels: list, out: np.ndarray) -> float:
+    """
+    Spread `demand` over assets level by level (within a level in proportion to cap).
+    Writes the allocation into out and returns the part nobody could take.
+    """
+    rem = demand
+    for idx in levels:
+        c = cap[idx]
+        tot = c.sum()
+        if tot <= 0.0:
+            continue
+        if rem >= tot:
+            out[idx] = c
+            rem -= tot
+        else:
+            a = c * (rem / tot)
+            # last share takes the rounding remainder, so the level gives exactly rem
+            a[-1] = max(0.0, rem - a[:-1].sum())
+            out[idx] = a
+            rem = 0.0
+            break
+    return rem
+
+def dispatch_assets(net, dt_h, reg: AssetRegistry, rule=ASSET_ALLOCATION):
+    """
+    Reactive dispatch over all assets: deficits are served by batteries / gensets in
+    allocation order, surpluses charge the batteries.
+
+    Returns (asset power (n, assets) [+ = supply], battery soc_pre and soc (n, batteries), unserved (n,)).
+    """
+    net = np.asarray(net, dtype=float)
+    n = len(net)
+    b = reg.battery
+    nb = len(b)
+
+    e_kwh = reg.e_kwh[b]
+    soc_min = reg.soc_min[b]
+    soc_max = reg.soc_max[b]
+    eta_ch = reg.eta_ch[b]
+    eta_dis = reg.eta_dis[b]
+
+    supply = np.concatenate([b, reg.genset])
+    dis_levels = reg.levels(supply, rule)
+    chg_levels = reg.levels(b, rule)
+
+    p_out = np.zeros((n, len(reg)))
+    soc_pre_out = np.empty((n, nb))
+    soc_out = np.empty((n, nb))
+    unserved_out = np.zeros(n)
+
+    cap = np.zeros(len(reg))
+    cap[reg.genset] = reg.p_max_kw[reg.genset]
+    p_max_b = reg.p_max_kw[b]
+    alloc = np.zeros(len(reg))
+
+    soc = reg.soc0[b].astype(float).copy()
+    for i, net_kw in enumerate(net.tolist()):
+        soc_pre_out[i] = soc
+        alloc[:] = 0.0
+
+        if net_kw > 0.0:
+            cap[b] = np.minimum(p_max_b, np.maximum(0.0, (soc - soc_min) * e_kwh) / dt_h)
+            unserved_out[i] = _allocate(net_kw, cap, dis_levels, alloc)
+            soc = soc - (alloc[b] * dt_h) / (eta_dis * e_kwh)
+            p_out[i] = alloc
+
+        elif net_kw < 0.0:
+            cap[b] = np.minimum(p_max_b, np.maximum(0.0, (soc_max - soc) * e_kwh) / dt_h)
+            _allocate(-net_kw, cap, chg_levels, alloc)
+            soc = soc + (alloc[b] * dt_h * eta_ch) / e_kwh
+            p_out[i, b] = -alloc[b]
+
+        soc = np.minimum(soc_max, np.maximum(soc_min, soc))
+        soc_out[i] = soc
+
+    return p_out, soc_pre_out, soc_out, unserved_out
+
+def _fleet_soc(soc: np.ndarray, e_kwh: np.ndarray) -> np.ndarray:
+    # stored energy / total capacity; a single string is passed through unchanged
+    if soc.shape[1] == 1:
+        return soc[:, 0].copy()
+    if soc.shape[1] == 0:
+        return np.zeros(len(soc))
+    return soc @ e_kwh / e_kwh.sum()
+
+def simulate_assets(load_kw, pv_kw, reg: AssetRegistry, dt_h=DT_H, h_steps=H_STEPS,
+                    alpha=ALPHA, beta=BETA, gamma=GAMMA, rule=ASSET_ALLOCATION) -> dict:
+    """
+    simulate() for a multi-asset site -> {column: array}: the usual result columns
+    (batteries aggregated by energy) plus per-asset columns under "asset_columns"
+    """
+    from scripts.pipeline.sim_core import risk_from_reserve
+
+    load_kw = np.asarray(load_kw, dtype=float)
+    pv_kw = np.asarray(pv_kw, dtype=float)
+    pv_scale = reg.pv_scale[reg.pv].sum() if len(reg.pv) else 1.0
+    pv_total = pv_kw * pv_scale
+    net = load_kw - pv_total
+
+    p, soc_pre, soc, unserved = dispatch_assets(net, dt_h, reg, rule)
+
+    b, g = reg.battery, reg.genset
+    e_kwh = reg.e_kwh[b]
+    agg_soc_pre = _fleet_soc(soc_pre, e_kwh)
+    agg_soc = _fleet_soc(soc, e_kwh)
+
+    # reserve: battery energy above soc_min + gensets (full power, unlimited energy)
+    e_avail = np.maximum(0.0, (soc_pre - reg.soc_min[b]) * e_kwh)
+    p_feas = np.minimum(reg.p_max_kw[b], e_avail / dt_h).sum(axis=1)
+    p_gen = reg.p_max_kw[g].sum()
+    h_eff = np.minimum(h_steps, len(net) - np.arange(len(net)))
+    e_avail_dis = e_avail.sum(axis=1) + p_gen * h_eff * dt_h
+
+    out = {
+        "net_kw": net,
+        "soc_pre": agg_soc_pre,
+        "soc": agg_soc,
+        "batt_p_kw": p[:, b].sum(axis=1),
+        "unserved_kw": unserved,
+        "genset_p_kw": p[:, g].sum(axis=1),
+    }
+    out.update(risk_from_reserve(net, unserved, e_avail_dis, p_feas + p_gen, dt_h, h_steps, alpha, beta, gamma))
+
+    cols = {}
+    for j, idx in enumerate(b):
+        cols[f"{reg.names[idx]}_soc"] = soc[:, j]
+    for idx in range(len(reg)):
+        if reg.kind[idx] == "pv":
+            cols[f"{reg.names[idx]}_p_kw"] = pv_kw * reg.pv_scale[idx]
+        else:
+            cols[f"{reg.names[idx]}_p_kw"] = p[:, idx]
+    out["asset_columns"] = cols
+    return out
+
+def asset_summary(res: dict, reg: AssetRegistry, dt_h=DT_H) -> pd.DataFrame:
+    """
+    Energy per asset over the run (+ genset fuel)
+    """
+    rows = []
+    for idx, name in enumerate(reg.names):
+        pw = res["asset_columns"][f"{name}_p_kw"]
+        row = {
+            "asset": name,
+            "kind": reg.kind[idx],
+            "supplied_kwh": float(np.maximum(pw, 0.0).sum() * dt_h),
+            "absorbed_kwh": float(np.maximum(-pw, 0.0).sum() * dt_h),
+            "max_p_kw": float(np.abs(pw).max()) if len(pw) else 0.0,
+        }
+        if reg.kind[idx] == "genset":
+            row["fuel_l"] = row["supplied_kwh"] * reg.fuel_l_per_kwh[idx]
+            row["run_steps"] = int((pw > 0).sum())
+        rows.append(row)
+    return pd.DataFrame(rows)
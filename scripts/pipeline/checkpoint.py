@@ -0,0 +1,110 @@
+# Checkpoint / resume for batch runs (sweeps, fleets): append-only result parts + a manifest
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = "manifest.json"
+
+def _jsonable(obj):
+    # numpy scalars / paths -> plain JSON values, so manifests compare equal after a round trip
+    return json.loads(json.dumps(obj, default=lambda v: v.item() if isinstance(v, np.generic) else str(v)))
+
+def _part_name(key: str) -> str:
+    # unit keys (site names, scenario ids) may contain anything; file names must not
+    return hashlib.sha1(str(key).encode("utf-8")).hexdigest()[:16] + ".parquet"
+
+def _write_text_atomic(path: Path, text: str):
+    tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+def file_stamp(path) -> str:
+    """
+    Content hash of an input file (None if missing) - part of a run context, so a resume
+    notices inputs that changed in between (rewriting identical content is fine)
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+class RunCheckpoint:
+    """
+    Progress of one batch run in a folder:
+      manifest.json        kind, run context and every work unit (key -> parameters)
+      parts/<hash>.parquet one result row per completed unit
+
+    Parts are only ever added, each written to a temporary file and renamed, so a killed
+    process leaves either a complete part or none. With resume=True units that already
+    have a part are skipped. Everything else (unfinished or failed) runs again.
+    """
+
+    def __init__(self, run_dir, kind: str, units: dict, context: dict = None, resume: bool = False):
+        self.dir = Path(run_dir)
+        self.parts_dir = self.dir / "parts"
+        self.units = _jsonable(units)
+        context = _jsonable(context or {})
+        path = self.dir / MANIFEST
+
+        old = json.loads(path.read_text(encoding="utf-8")) if resume and path.exists() else None
+        if old is not None:
+            if old.get("kind") != kind or old.get("context") != context:
+                raise ValueError(f"cannot resume {self.dir}: it holds a different {kind} run "
+                                 f"(inputs / settings changed) - start without --resume")
+            changed = [k for k, v in self.units.items() if k in old["units"] and old["units"][k] != v]
+            if changed:
+                raise ValueError(f"cannot resume {self.dir}: parameters of {len(changed)} units changed "
+                                 f"(e.g. {changed[0]}) - start without --resume")
+            created = old["created_utc"]
+        else:
+            if resume:
+                print(f"no checkpoint in {self.dir} - starting a new run")
+            # a fresh run must not pick up parts of an earlier one
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+            created = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        # units may be added to a resumed run (e.g. a larger grid); the manifest lists the current ones
+        _write_text_atomic(path, json.dumps({"kind": kind, "created_utc": created, "context": context,
+                                             "units": self.units}, indent=1))
+        present = {p.name for p in self.parts_dir.glob("*.parquet")}
+        self.done = {k for k in self.units if _part_name(k) in present}
+
+    def is_done(self, key) -> bool:
+        return str(key) in self.done
+
+    def pending(self) -> list:
+        return [k for k in self.units if k not in self.done]
+
+    def add(self, key, row: dict):
+        """
+        Record one completed unit
+        """
+        key = str(key)
+        path = self.parts_dir / _part_name(key)
+        tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+        pd.DataFrame([dict(row, unit_key=key)]).to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        self.done.add(key)
+
+    def rows(self) -> pd.DataFrame:
+        """
+        Result rows of all completed units (earlier and current process), in manifest order
+        """
+        frames = [pd.read_parquet(self.parts_dir / _part_name(k)) for k in self.units if k in self.done]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True).drop(columns="unit_key")
+
+    def status(self) -> str:
+        return f"{len(self.done)}/{len(self.units)} units done ({self.dir})"
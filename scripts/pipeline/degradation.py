@@ -0,0 +1,162 @@
+# Battery degradation from the SoC trajectory: streaming rainflow count, equivalent full cycles,
+# depth-of-discharge histogram and a cycle-life (Woehler) curve
+import numpy as np
+
+from config import CYCLE_LIFE_N_REF, CYCLE_LIFE_DOD_REF, CYCLE_LIFE_EXPONENT
+
+# depth-of-discharge histogram bins (fraction of capacity)
+DOD_BINS = np.linspace(0.0, 1.0, 21)
+
+def cycle_life(dod, n_ref=CYCLE_LIFE_N_REF, dod_ref=CYCLE_LIFE_DOD_REF, exponent=CYCLE_LIFE_EXPONENT):
+    """
+    Cycles to end of life at depth `dod`: N(dod) = n_ref * (dod / dod_ref) ** -exponent
+    """
+    dod = np.maximum(np.asarray(dod, dtype=float), 1e-9)
+    return n_ref * (dod / dod_ref) ** (-exponent)
+
+def reversals(x: np.ndarray, last=None, direction: int = 0):
+    """
+    Turning points of x, continuing a series that ended at `last` moving in `direction`.
+
+    Returns (reversal values, new last value, new direction). The final sample is never
+    reported (it is only a reversal once the next chunk turns), it becomes `last`.
+    """
+    x = np.asarray(x, dtype=float)
+    if last is not None:
+        x = np.concatenate([[last], x])
+    if len(x) == 0:
+        return np.empty(0), last, direction
+    x = x[np.concatenate([[True], np.diff(x) != 0])]
+    if len(x) < 2:
+        return (x[:1] if last is None else np.empty(0)), x[-1], direction
+
+    d = np.sign(np.diff(x)).astype(np.int8)
+    turns = np.flatnonzero(d[1:] != d[:-1]) + 1
+    # x[0] is a reversal if it starts the series or the direction changes at it
+    if last is None or (direction != 0 and d[0] != direction):
+        turns = np.concatenate([[0], turns])
+    return x[turns], x[-1], int(d[-1])
+
+class RainflowCounter:
+    """
+    Incremental rainflow count (ASTM E1049 three-point rule) of one SoC series.
+
+    update() can be called with consecutive chunks of any size; finalize() adds the
+    residual half cycles. Cycles are not stored: the counter keeps the DoD histogram,
+    equivalent full cycles and cycle-life damage, so memory does not grow with the run.
+    """
+
+    def __init__(self, bins=DOD_BINS, **life_kwargs):
+        self.bins = np.asarray(bins, dtype=float)
+        self.hist = np.zeros(len(self.bins) - 1)
+        self.efc = 0.0
+        self.damage = 0.0
+        self.n_cycles = 0.0
+        self.life_kwargs = life_kwargs
+        self._stack = []
+        self._last = None
+        self._dir = 0
+        self._done = False
+
+    def _add(self, ranges, counts):
+        if len(ranges) == 0:
+            return
+        ranges = np.asarray(ranges, dtype=float)
+        counts = np.asarray(counts, dtype=float)
+        k = np.clip(np.searchsorted(self.bins, ranges, side="right") - 1, 0, len(self.hist) - 1)
+        np.add.at(self.hist, k, counts)
+        self.efc += float((ranges * counts).sum())
+        self.damage += float((counts / cycle_life(ranges, **self.life_kwargs)).sum())
+        self.n_cycles += float(counts.sum())
+
+    def update(self, soc_chunk):
+        rev, self._last, self._dir = reversals(soc_chunk, self._last, self._dir)
+        st = self._stack
+        ranges, counts = [], []
+        for r in rev.tolist():
+            st.append(r)
+            while len(st) >= 3:
+                x = abs(st[-1] - st[-2])
+                y = abs(st[-2] - st[-3])
+                if x < y:
+                    break
+                ranges.append(y)
+                if len(st) == 3:
+                    counts.append(0.5)
+                    del st[0]
+                else:
+                    counts.append(1.0)
+                    del st[-3:-1]
+        self._add(ranges, counts)
+        return self
+
+    def finalize(self) -> dict:
+        if not self._done:
+            if self._last is not None:
+                self._stack.append(self._last)
+            st = np.asarray(self._stack)
+            res = np.abs(np.diff(st))
+            self._add(res, np.full(len(res), 0.5))
+            self._done = True
+        return self.result()
+
+    def result(self) -> dict:
+        return {
+            "efc": self.efc,
+            "damage": self.damage,
+            "n_cycles": self.n_cycles,
+            "dod_hist": self.hist.copy(),
+        }
+
+def degradation_metrics(soc, dt_h: float, chunk: int = None, **life_kwargs) -> dict:
+    """
+    Rainflow degradation metrics of one SoC series (optionally counted in chunks)
+    """
+    soc = np.asarray(soc, dtype=float)
+    rc = RainflowCounter(**life_kwargs)
+    step = chunk or max(1, len(soc))
+    for a in range(0, len(soc), step):
+        rc.update(soc[a:a + step])
+    out = rc.finalize()
+    return add_rates(out, len(soc) * dt_h / 8760.0)
+
+def add_rates(out: dict, years: float) -> dict:
+    """
+    Add per-year rates and cycle life to a rainflow result covering `years` (e.g. RainflowCounter.finalize())
+    """
+    out["efc_per_year"] = out["efc"] / years if years > 0 else np.nan
+    out["damage_per_year"] = out["damage"] / years if years > 0 else np.nan
+    out["life_years"] = 1.0 / out["damage_per_year"] if out["damage_per_year"] > 0 else np.inf
+    return out
+
+def degradation_batch(soc, dt_h: float, **life_kwargs) -> dict:
+    """
+    degradation_metrics for every column of an (n, m) SoC array (e.g. simulate_batch output)
+    -> {metric: array of length m}, dod_hist (m, bins)
+    """
+    soc = np.asarray(soc, dtype=float)
+    n, m = soc.shape
+    years = n * dt_h / 8760.0
+
+    # step directions for all columns in one diff; turning points and the rainflow stack per column
+    d = np.sign(np.diff(soc, axis=0))
+    results = []
+    for j in range(m):
+        col = soc[:, j]
+        dj = d[:, j]
+        moving = np.flatnonzero(dj != 0)
+        if len(moving) == 0:
+            rev = col[:1]
+        else:
+            dm = dj[moving]
+            turn = moving[1:][dm[1:] != dm[:-1]]
+            rev = np.concatenate([col[:1], col[turn], col[-1:]])
+        results.append(RainflowCounter(**life_kwargs).update(rev).finalize())
+
+    out = {k: np.array([r[k] for r in results]) for k in ("efc", "damage", "n_cycles")}
+    out["dod_hist"] = np.vstack([r["dod_hist"] for r in results])
+    out["efc_per_year"] = out["efc"] / years
+    out["damage_per_year"] = out["damage"] / years
+    with np.errstate(divide="ignore"):
+        out["life_years"] = np.where(out["damage_per_year"] > 0, 1.0 / out["damage_per_year"], np.inf)
+    return out
@@ -2,33 +2,33 @@ import sys
 from pathlib import Path
 
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # Paths
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT))
 
-from config import SIM_DIR, EVENTS_DIR
+from config import EVENTS_DIR, DT_MIN, MAKE_PLOTS
+from scripts.pipeline.plotting import plot_series
+from scripts.pipeline.profiling import StageProfiler
+from scripts.pipeline.results_io import RESULTS_CSV, read_results
 
-EVENTS_DIR.mkdir(parents=True, exist_ok=True)
-
-IN_CSV = SIM_DIR / "sim_results.csv"
+IN_CSV = RESULTS_CSV
 TOP_EVENTS_CSV = EVENTS_DIR / "top_events.csv"
 
-# Load
-df = pd.read_csv(IN_CSV, parse_dates=["timestamp"]).sort_values("timestamp").reset_index(drop=True)
-
 # Classify events
 TOP_K = 5
-events = df.nlargest(TOP_K, "unserved_kw")[["timestamp", "unserved_kw", "risk_index", "soc_pre"]].copy()
-events.to_csv(TOP_EVENTS_CSV, index=False)
 
 # Context for each event
 WINDOW_HOURS = 6
-DT_MIN = 15
 W = int((WINDOW_HOURS * 60) / DT_MIN)
 
-def plot_event(ts: pd.Timestamp):
+def top_events(df: pd.DataFrame, k: int = TOP_K) -> pd.DataFrame:
+    # nlargest already returns a new (k-row) frame
+    return df.nlargest(k, "unserved_kw")[["timestamp", "unserved_kw", "risk_index", "soc_pre"]]
+
+def plot_event(df: pd.DataFrame, ts: pd.Timestamp, out_dir=EVENTS_DIR):
+    import matplotlib.pyplot as plt
+
     idx_arr = df.index[df["timestamp"] == ts]
     if len(idx_arr) == 0:
         return
@@ -36,17 +36,17 @@ def plot_event(ts: pd.Timestamp):
 
     a = max(0, idx - W)
     b = min(len(df), idx + W)
-    w = df.iloc[a:b].copy()
+    w = df.iloc[a:b]
 
     # Create event folder
-    event_folder = EVENTS_DIR / f"event_{ts.strftime('%Y-%m-%d_%H%M')}"
+    event_folder = out_dir / f"event_{ts.strftime('%Y-%m-%d_%H%M')}"
     event_folder.mkdir(parents=True, exist_ok=True)
 
     # net.png (load + pv + net)
     plt.figure(figsize=(10, 4))
-    plt.plot(w["timestamp"], w["load_kw"], label="Load (kW)")
-    plt.plot(w["timestamp"], w["pv_kw"], label="PV (kW)")
-    plt.plot(w["timestamp"], w["net_kw"], label="Net deficit (kW)")
+    plot_series(plt.gca(), w["timestamp"], w["load_kw"], label="Load (kW)")
+    plot_series(plt.gca(), w["timestamp"], w["pv_kw"], label="PV (kW)")
+    plot_series(plt.gca(), w["timestamp"], w["net_kw"], label="Net deficit (kW)")
     plt.title("Event window: load / pv / net")
     plt.axvline(ts, linestyle="--")
     plt.legend()
@@ -57,8 +57,8 @@ def plot_event(ts: pd.Timestamp):
 
     # soc_unserved.png
     plt.figure(figsize=(10, 4))
-    plt.plot(w["timestamp"], w["soc_pre"], label="SoC (pre)")
-    plt.plot(w["timestamp"], w["unserved_kw"], label="Unserved (kW)")
+    plot_series(plt.gca(), w["timestamp"], w["soc_pre"], label="SoC (pre)")
+    plot_series(plt.gca(), w["timestamp"], w["unserved_kw"], label="Unserved (kW)")
     plt.title("Event window: soc and unserved load")
     plt.axvline(ts, linestyle="--")
     plt.legend()
@@ -70,9 +70,9 @@ def plot_event(ts: pd.Timestamp):
     # reserve.png
     plt.figure(figsize=(10, 4))
     if "reserve_deficit_p_kw" in w.columns:
-        plt.plot(w["timestamp"], w["reserve_deficit_p_kw"], label="ReserveDef_P (kW)")
+        plot_series(plt.gca(), w["timestamp"], w["reserve_deficit_p_kw"], label="ReserveDef_P (kW)")
     if "reserve_deficit_e_kwh" in w.columns:
-        plt.plot(w["timestamp"], w["reserve_deficit_e_kwh"], label="ReserveDef_E (kWh)")
+        plot_series(plt.gca(), w["timestamp"], w["reserve_deficit_e_kwh"], label="ReserveDef_E (kWh)")
     plt.title("Event window: reserve deficits")
     plt.axvline(ts, linestyle="--")
     plt.legend()
@@ -83,7 +83,7 @@ def plot_event(ts: pd.Timestamp):
 
     # risk.png
     plt.figure(figsize=(10, 4))
-    plt.plot(w["timestamp"], w["risk_index"], label="Risk index")
+    plot_series(plt.gca(), w["timestamp"], w["risk_index"], label="Risk index")
     plt.title("Event window: risk index")
     plt.axvline(ts, linestyle="--")
     plt.legend()
@@ -92,10 +92,41 @@ def plot_event(ts: pd.Timestamp):
     plt.savefig(event_folder / "risk.png", dpi=200)
     plt.close()
 
-# Plotting main events
-for row in events.itertuples(index=False):
-    plot_event(pd.Timestamp(row.timestamp))
+def make_event_examples(df: pd.DataFrame, out_dir=EVENTS_DIR, k: int = TOP_K) -> pd.DataFrame:
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    events = top_events(df, k)
+    events.to_csv(out_dir / TOP_EVENTS_CSV.name, index=False)
+
+    # Plotting main events
+    for row in events.itertuples(index=False):
+        plot_event(df, pd.Timestamp(row.timestamp), out_dir)
+    return events
+
+def main():
+    prof = StageProfiler("event_examples")
+    EVENTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Load
+    with prof.phase("load"):
+        df = read_results(IN_CSV)
+
+    with prof.phase("extract"):
+        events = top_events(df)
+        events.to_csv(TOP_EVENTS_CSV, index=False)
+
+    # Plotting main events
+    if MAKE_PLOTS:
+        with prof.phase("plot"):
+            for row in events.itertuples(index=False):
+                plot_event(df, pd.Timestamp(row.timestamp))
+    else:
+        print("plots disabled (MAKE_PLOTS) - skipped event plots")
+    prof.save()
+
+    print("Saved:")
+    print(f" - {TOP_EVENTS_CSV}")
+    print(f" - event folders in: {EVENTS_DIR}")
 
-print("Saved:")
-print(f" - {TOP_EVENTS_CSV}")
-print(f" - event folders in: {EVENTS_DIR}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+# Fleet mode: many sites from a site table, simulated in worker processes
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import FLEET_DIR, FLEET_WORKERS, FLEET_SUMMARY_CUBE, ALIGN_FILL_POLICY, H_HOURS, SUMMARY_STORE
+from scripts.pipeline.degradation import degradation_metrics
+from scripts.pipeline.resample import load_inputs
+from scripts.pipeline.sim_core import compute_metrics, simulate
+from scripts.pipeline.summary_store import PARAM_KEYS, input_fingerprint, make_row, scenario_params, upsert
+
+# required site table columns; any of PARAM_KEYS (and assets_csv) may be added per site
+SITE_COLUMNS = ("site", "load_csv", "pv_csv")
+PATH_COLUMNS = ("load_csv", "pv_csv", "assets_csv")
+
+# early-warning statistics (predictive_vs_reactive.evaluate) kept per site
+WARNING_KEYS = ("tp", "fp", "fn", "precision", "recall", "coverage", "missed", "median_lead", "p90_lead")
+
+FLEET_CUBE = "fleet_cube.parquet"
+FLEET_MONTHLY_RISK_CSV = "fleet_monthly_risk.csv"
+
+def read_site_table(path) -> list:
+    """
+    Site table -> one dict per site (input paths resolved against the table folder,
+    empty cells = config.py value)
+    """
+    path = Path(path)
+    df = pd.read_csv(path)
+    missing = [c for c in SITE_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"site table {path} needs columns {missing}")
+    # inputs is the fingerprint of the site's files, never set by hand
+    unknown = set(df.columns) - (set(PARAM_KEYS) - {"inputs"}) - set(PATH_COLUMNS) - {"site"}
+    if unknown:
+        raise ValueError(f"unknown site table columns: {sorted(unknown)}")
+    if df["site"].duplicated().any():
+        raise ValueError("site names must be unique")
+
+    sites = []
+    for rec in df.to_dict("records"):
+        site = {k: v for k, v in rec.items() if not (isinstance(v, float) and np.isnan(v))}
+        site["site"] = str(site["site"])
+        for k in PATH_COLUMNS:
+            if k in site:
+                p = Path(site[k])
+                site[k] = str(p if p.is_absolute() else (path.parent / p).resolve())
+        sites.append(site)
+    return sites
+
+def site_params(site: dict) -> dict:
+    """
+    Scenario parameters of one site; the horizon follows H_HOURS when only dt_min is given
+    """
+    over = {k: site[k] for k in PARAM_KEYS if k in site}
+    over["inputs"] = input_fingerprint(*(site.get(k) for k in PATH_COLUMNS))
+    if "dt_min" in over and "h_steps" not in over:
+        over["h_steps"] = max(1, int(round(H_HOURS * 60.0 / float(over["dt_min"]))))
+    return scenario_params(**over)
+
+def site_dir(out_dir: Path, site: str) -> Path:
+    return Path(out_dir) / "sites" / site
+
+def run_site(site: dict, out_dir=FLEET_DIR, plots: bool = False, dataset=None, cube: bool = FLEET_SUMMARY_CUBE) -> dict:
+    """
+    Simulate one site -> summary row (store row + alignment and early-warning statistics).
+    Inputs come from the memory-mapped input cache, so workers that share a load or
+    PV file share its pages instead of each holding a parsed copy.
+    cube: also write the site's summary cube to sites/<site>/sim/summary_cube.parquet.
+    """
+    from scripts.pipeline.predictive_vs_reactive import evaluate
+
+    params = site_params(site)
+    dt_h = params["dt_min"] / 60.0
+
+    t0 = time.perf_counter()
+    # site table paths name the actual files (csv or parquet), whatever PROCESSED_FORMAT is
+    ts, load_kw, pv_kw, align = load_inputs(params["dt_min"], ALIGN_FILL_POLICY, site["load_csv"], site["pv_csv"],
+                                            fmt="auto")
+    t_load = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    kw = dict(dt_h=dt_h, h_steps=params["h_steps"], alpha=params["alpha"], beta=params["beta"], gamma=params["gamma"])
+    if "assets_csv" in site:
+        from scripts.pipeline.assets import AssetRegistry, simulate_assets
+
+        res = simulate_assets(load_kw, pv_kw, AssetRegistry.from_csv(site["assets_csv"]), **kw)
+    else:
+        res = simulate(
+            load_kw, pv_kw,
+            e_kwh=params["e_kwh"], p_max_kw=params["p_max_kw"],
+            soc_min=params["soc_min"], soc_max=params["soc_max"], soc0=params["soc0"],
+            eta_ch=params["eta_ch"], eta_dis=params["eta_dis"],
+            policy=params["policy"], **kw,
+        )
+    t_sim = time.perf_counter() - t0
+
+    metrics = compute_metrics(res, dt_h)
+    deg = degradation_metrics(res["soc"], dt_h)
+    metrics.update({k: deg[k] for k in ("efc_per_year", "damage_per_year", "life_years")})
+
+    warn_cols = {k: res[k] for k in ("unserved_kw", "reserve_deficit_p_kw", "reserve_deficit_e_kwh")}
+    ev = evaluate(pd.DataFrame(warn_cols), params["h_steps"], params["dt_min"])
+
+    row = make_row(params, metrics, "fleet", steps=len(ts))
+    row.update({f"warn_{k}": ev[k] for k in WARNING_KEYS})
+    row["warn_onsets"] = len(ev["onsets"])
+    row.update({
+        "load_filled": align["load_filled"],
+        "pv_filled": align["pv_filled"],
+        "dropped_steps": align["dropped_steps"],
+        "load_s": t_load,
+        "sim_s": t_sim,
+    })
+
+    if not (plots or cube or dataset is not None):
+        return row
+
+    # one results frame for the plots, the cube and the dataset
+    from scripts.pipeline.simulate_microgrid import build_results_frame
+    from scripts.pipeline.summary_cube import CUBE_PARQUET, build_cube, write_cube
+
+    d = site_dir(out_dir, params["site"])
+    df = build_results_frame(ts, load_kw, pv_kw, res)
+    del res
+    site_cube = None
+    if cube or plots:
+        site_cube = build_cube(df, dt_h)
+    if cube:
+        write_cube(site_cube, d / "sim" / CUBE_PARQUET.name)
+    if plots:
+        _write_site_plots(d, df, ev, site_cube)
+    if dataset is not None:
+        # every worker writes its own site= partition; the scenario table is updated by the parent
+        from scripts.pipeline.results_dataset import write_partitions
+
+        write_partitions(df, params["site"], row["scenario_id"], dataset)
+    return row
+
+def _write_site_plots(d: Path, df: pd.DataFrame, ev: dict, cube: pd.DataFrame):
+    import contextlib
+    import io
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from scripts.pipeline.event_examples import make_event_examples
+    from scripts.pipeline.predictive_vs_reactive import write_plots, write_summaries
+    from scripts.pipeline.risk_curves import make_risk_curves
+    from scripts.pipeline.simulate_microgrid import write_quicklooks
+
+    dirs = {k: d / k for k in ("sim", "risk", "events", "compare")}
+    for p in dirs.values():
+        p.mkdir(parents=True, exist_ok=True)
+
+    # stage helpers print one line per file - too much for hundreds of sites
+    with contextlib.redirect_stdout(io.StringIO()):
+        write_quicklooks(df, dirs["sim"] / "quicklooks", cube)
+        make_risk_curves(df, dirs["risk"])
+        make_event_examples(df, dirs["events"])
+        c = dirs["compare"]
+        write_summaries(ev, c / "predictive_vs_reactive_summary.txt", c / "predictive_vs_reactive_operator.txt")
+        write_plots(ev, df, c)
+
+def write_site_report(site: dict, out_dir=FLEET_DIR, store=SUMMARY_STORE) -> Path:
+    """
+    Operator PDF of one site from its plot folder + summary store row
+    """
+    from scripts.pipeline.make_report import build_report, report_inputs
+
+    params = site_params(site)
+    d = site_dir(out_dir, params["site"])
+    inputs = report_inputs(d / "sim", d / "risk", d / "events", d / "xai", d / "compare",
+                           params=params, run_profile_json=d / "run_profile.json")
+    if store is not None:
+        inputs["summary_store"] = Path(store)
+    out_pdf = d / "report" / "microgrid_stability_report.pdf"
+    build_report(out_pdf, inputs)
+    return out_pdf
+
+def _run_site_safe(args):
+    # worker entry: an error in one site must not stop the fleet
+    site, out_dir, plots, dataset, cube = args
+    try:
+        return run_site(site, out_dir, plots, dataset, cube)
+    except Exception as e:
+        return {"site": site["site"], "error": f"{type(e).__name__}: {e}"}
+
+def _pool_map(fn, items, workers, chunksize=1):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) <= 1:
+        yield from map(fn, items)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        yield from pool.map(fn, items, chunksize=chunksize)
+
+def run_fleet(sites: list, out_dir=FLEET_DIR, workers=FLEET_WORKERS, plots: bool = False, pdf: bool = False,
+              store=SUMMARY_STORE, chunksize: int = None, checkpoint=None, dataset=None,
+              cube: bool = FLEET_SUMMARY_CUBE) -> pd.DataFrame:
+    """
+    Simulate every site (in parallel) -> one summary row per site. Sites that fail
+    get a row with an error message instead of stopping the run.
+    checkpoint: RunCheckpoint keyed by site name - finished sites are recorded as they
+    come back from the workers, and sites it already holds are not dispatched again
+    (failed sites are not recorded, so a resume retries them).
+    dataset: results dataset folder that also gets every site's full time series.
+    cube: per-site summary cubes, merged into fleet_cube.parquet + fleet_monthly_risk.csv.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n_workers = workers or os.cpu_count() or 1
+    # a few chunks per worker: small enough to balance, large enough to keep IPC low
+    chunksize = chunksize or max(1, len(sites) // (4 * n_workers))
+
+    todo = sites
+    if checkpoint is not None:
+        todo = [s for s in sites if not checkpoint.is_done(s["site"])]
+        if len(todo) < len(sites):
+            print(f"resumed: {len(sites) - len(todo)} sites taken from the checkpoint, {len(todo)} to run")
+
+    rows = []
+    t0 = time.perf_counter()
+    step = max(1, len(todo) // 20)
+    jobs = [(s, out_dir, plots or pdf, dataset, cube) for s in todo]
+    for k, row in enumerate(_pool_map(_run_site_safe, jobs, n_workers, chunksize), start=1):
+        rows.append(row)
+        if "error" in row:
+            print(f"site {row['site']} failed: {row['error']}")
+        elif checkpoint is not None:
+            checkpoint.add(row["site"], row)
+        if k % step == 0 or k == len(todo):
+            print(f"[{k}/{len(todo)}] sites done ({time.perf_counter() - t0:.1f}s)")
+
+    ok = [r for r in rows if "error" not in r]
+    if checkpoint is not None:
+        ok = checkpoint.rows().to_dict("records")
+        rows = ok + [r for r in rows if "error" in r]
+    if store is not None and ok:
+        upsert(ok, store)
+        print(f"Saved {len(ok)} site scenarios to summary store: {store}")
+    if dataset is not None and ok:
+        from scripts.pipeline.results_dataset import add_scenarios
+
+        add_scenarios(ok, dataset)
+        print(f"Saved {len(ok)} sites to results dataset: {dataset}")
+    if cube and ok:
+        fleet_cube = merge_site_cubes([r["site"] for r in ok], out_dir)
+        print(f"Saved fleet summary cube: {out_dir / FLEET_CUBE} ({fleet_cube['site'].nunique()} sites), "
+              f"monthly risk table: {out_dir / FLEET_MONTHLY_RISK_CSV}")
+
+    if pdf and ok:
+        done = {r["site"] for r in ok}
+        todo = [s for s in sites if s["site"] in done]
+        for _ in _pool_map(_write_report_safe, [(s, out_dir, store) for s in todo], n_workers):
+            pass
+        print(f"Saved {len(todo)} site reports under {out_dir / 'sites'}")
+
+    return pd.DataFrame(rows)
+
+def merge_site_cubes(site_names: list, out_dir=FLEET_DIR) -> pd.DataFrame:
+    """
+    Per-site summary cubes -> one fleet cube (site column first) + a site x month table
+    of the mean risk index. Sites without a cube file are left out.
+    """
+    from scripts.pipeline.summary_cube import CUBE_PARQUET
+
+    out_dir = Path(out_dir)
+    frames = []
+    for name in site_names:
+        path = site_dir(out_dir, name) / "sim" / CUBE_PARQUET.name
+        if path.exists():
+            c = pd.read_parquet(path)
+            c.insert(0, "site", name)
+            frames.append(c)
+    if not frames:
+        return pd.DataFrame(columns=["site"])
+    cube = pd.concat(frames, ignore_index=True)
+    cube["site"] = cube["site"].astype("category")
+    cube.to_parquet(out_dir / FLEET_CUBE, index=False)
+
+    monthly = cube[cube["resolution"] == "monthly"]
+    table = monthly.pivot(index="site", columns="period", values="risk_index_mean")
+    table.columns = [p.strftime("%Y-%m") for p in table.columns]
+    table.to_csv(out_dir / FLEET_MONTHLY_RISK_CSV)
+    return cube
+
+def _write_report_safe(args):
+    site, out_dir, store = args
+    try:
+        return write_site_report(site, out_dir, store)
+    except Exception as e:
+        print(f"report for site {site['site']} failed: {type(e).__name__}: {e}")
+        return None
+
+def fleet_summary_text(df: pd.DataFrame, wall_s: float, top: int = 10, cube: pd.DataFrame = None) -> str:
+    ok = df[df["error"].isna()] if "error" in df.columns else df
+    lines = ["=== Fleet summary ==="]
+    lines.append(f"sites: {len(df)} ({len(df) - len(ok)} failed)")
+    lines.append(f"wall time (s): {wall_s:.1f}")
+    if ok.empty:
+        return "\n".join(lines) + "\n"
+    lines.append(f"total unserved energy (kWh): {ok['total_unserved_kwh'].sum():.1f}")
+    lines.append(f"sites with unserved load: {int((ok['total_unserved_kwh'] > 0).sum())}")
+    lines.append(f"median risk steps (%): {ok['pct_risk_steps'].median():.2f}")
+    lines.append(f"median warning coverage (%): {100.0 * ok['warn_coverage'].median():.1f}")
+    lines.append(f"median warning precision (%): {100.0 * ok['warn_precision'].median():.1f}")
+    lines.append("")
+    lines.append(f"worst {min(top, len(ok))} sites by unserved energy:")
+    worst = ok.sort_values("total_unserved_kwh", ascending=False).head(top)
+    for r in worst.itertuples():
+        lines.append(f"  {r.site:<20} {r.total_unserved_kwh:10.1f} kWh  risk {r.pct_risk_steps:5.2f}%  "
+                     f"warning coverage {100.0 * r.warn_coverage:5.1f}%  ({r.scenario_id})")
+    if cube is not None and not cube.empty:
+        # months summed / averaged over the sites of the fleet cube
+        monthly = cube[cube["resolution"] == "monthly"].groupby("period").agg(
+            unserved_kwh=("unserved_kwh_sum", "sum"), risk_share=("risk_event_mean", "mean"))
+        lines.append("")
+        lines.append(f"riskiest {min(3, len(monthly))} months across the fleet:")
+        for period, r in monthly.sort_values(["risk_share", "unserved_kwh"], ascending=False).head(3).iterrows():
+            lines.append(f"  {period:%Y-%m}  risk steps {100.0 * r.risk_share:5.2f}%  unserved {r.unserved_kwh:10.1f} kWh")
+    return "\n".join(lines) + "\n"
+
+def synthetic_fleet(n_sites: int, out_dir: Path, years: float = 1.0, dt_min: float = 15, seed: int = 0) -> Path:
+    """
+    Write n synthetic sites (inputs + site table with varied BESS sizes) -> site table path
+    """
+    from scripts.preprocessing.synthetic_data import generate_site, write_site_inputs
+
+    out_dir = Path(out_dir)
+    rng = np.random.default_rng(seed)
+    rows = []
+    for k in range(n_sites):
+        name = f"site{k:04d}"
+        load_path, pv_path = write_site_inputs(generate_site(years, dt_min, k, seed), out_dir, name)
+        rows.append({
+            "site": name,
+            "load_csv": load_path.name,
+            "pv_csv": pv_path.name,
+            "dt_min": dt_min,
+            "e_kwh": float(rng.choice([250, 500, 750, 1000])),
+            "p_max_kw": float(rng.choice([125, 250, 375])),
+        })
+    table = out_dir / "fleet_sites.csv"
+    pd.DataFrame(rows).to_csv(table, index=False)
+    return table
+
@@ -0,0 +1,117 @@
+# Early-warning forest in flat array form: sklearn-free, vectorized scoring of single rows or many sites at once
+import numpy as np
+
+from config import XAI_DIR
+
+FOREST_NPZ = XAI_DIR / "forest_flat.npz"
+# rows scored per pass; larger batches are split so the trees x rows node arrays stay in cache
+CHUNK_ROWS = 512
+
+class FlatForest:
+    """
+    All trees of a fitted RandomForestClassifier in one set of node arrays
+    (feature, threshold, left / right child as global node index, leaf probability).
+
+    Leaves point to themselves, so every row walks exactly `depth` steps and all
+    rows x trees advance together in one array operation per level.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth, feature_names=()):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.depth = int(depth)
+        self.feature_names = list(feature_names)
+        # children side by side: child[2 * node + went_right] saves one gather + where per level
+        self.child = np.stack([self.left, self.right], axis=1).ravel()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_proba1(self, X) -> np.ndarray:
+        """
+        P(risk within the next H steps) for every row of X (n, features) or one row (features,).
+        Rows are compared in float32 like sklearn, so results match predict_proba[:, 1].
+        """
+        X = np.asarray(X, dtype=np.float32)
+        single = X.ndim == 1
+        X = np.atleast_2d(X)
+        if len(X) > CHUNK_ROWS:
+            return np.concatenate([self._proba(X[i:i + CHUNK_ROWS]) for i in range(0, len(X), CHUNK_ROWS)])
+        proba = self._proba(X)
+        return proba[0] if single else proba
+
+    def _proba(self, X) -> np.ndarray:
+        n, nf = X.shape
+        flat_x = X.ravel()
+        # trees x rows: neighbouring entries walk the same tree, which keeps the gathers in cache
+        base = np.arange(n, dtype=np.intp) * nf
+        nodes = np.repeat(self.roots[:, None], n, axis=1)
+        # np.take: cheaper than fancy indexing for 1-d gathers
+        take = np.take
+        for _ in range(self.depth):
+            went_right = take(flat_x, base + take(self.feature, nodes)) > take(self.threshold, nodes)
+            nodes = take(self.child, 2 * nodes + went_right)
+        return take(self.value, nodes).mean(axis=0)
+
+    def save(self, path=FOREST_NPZ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 value=self.value, roots=self.roots, depth=np.array(self.depth),
+                 feature_names=np.array(self.feature_names, dtype=str))
+        return path
+
+    @classmethod
+    def load(cls, path=FOREST_NPZ):
+        with np.load(path, allow_pickle=False) as z:
+            return cls(z["feature"], z["threshold"], z["left"], z["right"], z["value"], z["roots"],
+                       int(z["depth"]), z["feature_names"].tolist())
+
+def export_forest(clf, feature_names=None) -> FlatForest:
+    """
+    Fitted RandomForestClassifier (binary) -> FlatForest
+    """
+    classes = list(clf.classes_)
+    pos = classes.index(1) if 1 in classes else None
+
+    feats, thrs, lefts, rights, vals, roots = [], [], [], [], [], []
+    offset = 0
+    depth = 0
+    for est in clf.estimators_:
+        t = est.tree_
+        n = t.node_count
+        idx = np.arange(n)
+        leaf = t.children_left == -1
+
+        left = np.where(leaf, idx, t.children_left) + offset
+        right = np.where(leaf, idx, t.children_right) + offset
+        # per-tree class probabilities as DecisionTreeClassifier.predict_proba computes them
+        v = t.value[:, 0, :]
+        tot = v.sum(axis=1)
+        p = v[:, pos] / np.where(tot > 0, tot, 1.0) if pos is not None else np.zeros(n)
+
+        feats.append(np.where(leaf, 0, t.feature))
+        thrs.append(np.where(leaf, np.inf, t.threshold))
+        lefts.append(left)
+        rights.append(right)
+        vals.append(p)
+        roots.append(offset)
+        offset += n
+        depth = max(depth, t.max_depth)
+
+    if feature_names is None:
+        feature_names = list(getattr(clf, "feature_names_in_", []))
+    return FlatForest(np.concatenate(feats), np.concatenate(thrs), np.concatenate(lefts), np.concatenate(rights),
+                      np.concatenate(vals), np.array(roots), depth, feature_names)
+
+def parity_error(clf, flat: FlatForest, X) -> float:
+    """
+    Max |flat - sklearn| probability over the rows of X
+    """
+    ref = clf.predict_proba(X)
+    ref = ref[:, list(clf.classes_).index(1)] if 1 in clf.classes_ else np.zeros(len(X))
+    return float(np.abs(flat.predict_proba1(np.asarray(X)) - ref).max()) if len(ref) else 0.0
@@ -0,0 +1,223 @@
+# High-resolution simulation (1 min / 1 s steps): chunked reactive dispatch, streaming metrics, ramp-rate risk
+import time
+
+import numpy as np
+
+from config import (
+    LOAD_CSV, PV_CSV, ALIGN_FILL_POLICY, H_HOURS,
+    E_KWH, P_MAX_KW, SOC_MIN, SOC_MAX, SOC0, ETA_CH, ETA_DIS,
+    ALPHA, BETA, GAMMA, DELTA,
+    HIGHRES_DT_S, HIGHRES_CHUNK_STEPS, RAMP_LIMIT_KW_PER_MIN, RAMP_WINDOW_MIN,
+)
+from scripts.pipeline.degradation import RainflowCounter, add_rates
+from scripts.pipeline.input_cache import load_cached
+from scripts.pipeline.resample import load_inputs, native_step_ns
+from scripts.pipeline.sim_core import dispatch_reactive, reserve_and_risk
+
+# columns of the optional per-step output (float32, risk_event bool)
+HIGHRES_COLUMNS = (
+    "load_kw", "pv_kw", "net_kw", "soc", "batt_p_kw", "unserved_kw",
+    "reserve_deficit_p_kw", "reserve_deficit_e_kwh",
+    "ramp_kw_per_min", "headroom_kw", "ramp_deficit_kw", "risk_event", "risk_index",
+)
+
+# metrics on top of sim_core.compute_metrics
+RAMP_METRIC_KEYS = (
+    "pct_ramp_exceed_steps", "max_ramp_kw_per_min", "pct_ramp_deficit_steps",
+    "max_ramp_deficit_kw", "min_headroom_kw",
+)
+
+def highres_h_steps(dt_s: float, h_hours: float = H_HOURS) -> int:
+    # the forecast horizon stays H_HOURS long, so it has more steps at a finer time step
+    return max(1, int(round(h_hours * 3600.0 / dt_s)))
+
+def source_inputs(dt_s: float = HIGHRES_DT_S, policy=ALIGN_FILL_POLICY, load_csv=LOAD_CSV, pv_csv=PV_CSV):
+    """
+    Load / pv aligned on the finest grid the inputs have, but not finer than dt_s
+    -> (timestamps, load_kw, pv_kw, report).
+    15-min files stay at 15 min here (small arrays); iter_chunks interpolates them to
+    dt_s piece by piece. 1-min / 1-s files are read at their own resolution.
+    """
+    native_min = min(native_step_ns(load_cached(load_csv, "load_kw")[0]),
+                     native_step_ns(load_cached(pv_csv, "pv_kw")[0])) / 60e9
+    src_dt_min = max(dt_s / 60.0, native_min)
+    return load_inputs(src_dt_min, policy, load_csv, pv_csv)
+
+def fine_grid(ts_src: np.ndarray, dt_s: float) -> tuple:
+    """
+    Epoch-anchored dt_s grid inside the source time range -> (first timestamp ns, step ns, steps)
+    """
+    step = int(round(dt_s * 1e9))
+    if step <= 0:
+        raise ValueError(f"time step must be positive, got {dt_s} s")
+    t0 = -((-int(ts_src[0])) // step) * step
+    n = (int(ts_src[-1]) - t0) // step + 1
+    return t0, step, int(n)
+
+def iter_chunks(ts_src, load_src, pv_src, dt_s: float = HIGHRES_DT_S, chunk_steps: int = HIGHRES_CHUNK_STEPS):
+    """
+    Yield (start index, timestamps ns, load_kw, pv_kw) of consecutive chunks of the dt_s grid.
+    Source points are kept; values in between are interpolated linearly, one chunk at a time,
+    so the full-length fine series never exists in memory.
+    """
+    ts_src = np.asarray(ts_src, dtype="int64")
+    src_step = native_step_ns(ts_src)
+    if np.diff(ts_src).max() > src_step:
+        raise ValueError("inputs have gaps (fill policy 'drop'?) - use a fill policy that keeps a regular grid")
+    t0, step, n = fine_grid(ts_src, dt_s)
+    rel_src = (ts_src - t0) / 1e9  # seconds from the first fine step
+    load_src = np.asarray(load_src, dtype=float)
+    pv_src = np.asarray(pv_src, dtype=float)
+
+    for a in range(0, n, max(1, int(chunk_steps))):
+        b = min(n, a + int(chunk_steps))
+        ts = t0 + step * np.arange(a, b, dtype="int64")
+        # only the source samples around this chunk
+        lo = max(0, np.searchsorted(ts_src, ts[0], side="right") - 1)
+        hi = min(len(ts_src), np.searchsorted(ts_src, ts[-1], side="left") + 1)
+        x = (ts - t0) / 1e9
+        yield a, ts, np.interp(x, rel_src[lo:hi], load_src[lo:hi]), np.interp(x, rel_src[lo:hi], pv_src[lo:hi])
+
+def ramp_risk(net, prev_net: float, dt_min: float, p_dis_feasible, batt_p,
+              ramp_window_min: float = RAMP_WINDOW_MIN) -> dict:
+    """
+    Ramp-rate components of one chunk.
+    ramp_kw_per_min: change of net load per minute (PV drop / load step > 0)
+    headroom_kw: discharge power the BESS could still add on top of its current output
+    ramp_deficit_kw: part of an up-ramp held for ramp_window_min that the headroom cannot cover
+    """
+    prev = np.concatenate(([prev_net], net[:-1]))
+    ramp = (net - prev) / dt_min
+    headroom = np.maximum(0.0, p_dis_feasible - batt_p)
+    deficit = np.maximum(0.0, np.maximum(ramp, 0.0) * ramp_window_min - headroom)
+    return {"ramp_kw_per_min": ramp, "headroom_kw": headroom, "ramp_deficit_kw": deficit}
+
+def _parquet_writer(path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = [pa.field("timestamp", pa.timestamp("ms"))]
+    fields += [pa.field(c, pa.bool_() if c == "risk_event" else pa.float32()) for c in HIGHRES_COLUMNS]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return pq.ParquetWriter(str(path), pa.schema(fields), compression="zstd")
+
+def _write_chunk(writer, ts, cols: dict):
+    import pyarrow as pa
+
+    arrays = [pa.array(ts.view("datetime64[ns]").astype("datetime64[ms]"))]
+    arrays += [pa.array(np.asarray(cols[c], dtype=bool if c == "risk_event" else np.float32)) for c in HIGHRES_COLUMNS]
+    writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))  # one row group per chunk
+
+def simulate_highres(ts_src, load_src, pv_src, dt_s: float = HIGHRES_DT_S, chunk_steps: int = HIGHRES_CHUNK_STEPS,
+                     h_steps: int = None, e_kwh=E_KWH, p_max_kw=P_MAX_KW, soc_min=SOC_MIN, soc_max=SOC_MAX, soc0=SOC0,
+                     eta_ch=ETA_CH, eta_dis=ETA_DIS, alpha=ALPHA, beta=BETA, gamma=GAMMA, delta=DELTA,
+                     ramp_limit_kw_per_min=RAMP_LIMIT_KW_PER_MIN, ramp_window_min=RAMP_WINDOW_MIN,
+                     out_parquet=None, degradation: bool = True) -> dict:
+    """
+    Reactive dispatch + reserve risk + ramp risk on the dt_s grid, chunk by chunk.
+
+    SoC and the last net value carry over between chunks, and the reserve horizon is cut
+    at the end of the whole series (not of the chunk), so the per-step results equal one
+    unchunked run. Only aggregates are kept (and, with out_parquet, the float32 per-step
+    columns streamed to disk), so memory is set by chunk_steps and runtime grows linearly
+    with the number of steps.
+    The high-resolution risk index adds delta * ramp_deficit_kw to the 15-min one.
+
+    Returns {"metrics", "steps", "dispatch_stats", "timings", "t_start", "t_end"}.
+    """
+    dt_h = dt_s / 3600.0
+    dt_min = dt_s / 60.0
+    h_steps = highres_h_steps(dt_s) if h_steps is None else int(h_steps)
+    n_total = fine_grid(ts_src, dt_s)[2]
+
+    acc = {"unserved_kwh": 0.0, "unserved_steps": 0, "max_unserved": 0.0, "risk_steps": 0, "max_risk": 0.0,
+           "ramp_exceed_steps": 0, "max_ramp": 0.0, "ramp_deficit_steps": 0, "max_ramp_deficit": 0.0,
+           "min_headroom": np.inf}
+    timings = {"inputs_s": 0.0, "dispatch_s": 0.0, "risk_s": 0.0, "write_s": 0.0}
+    stats = {}
+    rc = RainflowCounter() if degradation else None
+    writer = _parquet_writer(out_parquet) if out_parquet is not None else None
+
+    soc = float(soc0)
+    prev_net = None
+    t_start = t_end = None
+    try:
+        t = time.perf_counter()
+        for a, ts, load, pv in iter_chunks(ts_src, load_src, pv_src, dt_s, chunk_steps):
+            net = load - pv
+            t_start = ts[0] if t_start is None else t_start
+            t_end = ts[-1]
+            t1 = time.perf_counter()
+            timings["inputs_s"] += t1 - t
+
+            soc_pre, soc_arr, batt_p, unserved = dispatch_reactive(
+                net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc, eta_ch, eta_dis, stats
+            )
+            soc = float(soc_arr[-1])
+            if rc is not None:
+                rc.update(soc_arr)
+            t2 = time.perf_counter()
+            timings["dispatch_s"] += t2 - t1
+
+            steps_left = n_total - a - np.arange(len(net))
+            risk = reserve_and_risk(net, soc_pre, unserved, dt_h, h_steps, e_kwh, p_max_kw, soc_min,
+                                    alpha, beta, gamma, steps_left)
+            ramp = ramp_risk(net, net[0] if prev_net is None else prev_net, dt_min,
+                             risk["p_dis_feasible_kw"], batt_p, ramp_window_min)
+            prev_net = float(net[-1])
+            deficit = ramp["ramp_deficit_kw"]
+            risk_index = risk["risk_index"] + delta * deficit
+            risk_event = risk["risk_event"] | (deficit > 0.0)
+
+            acc["unserved_kwh"] += float(unserved.sum()) * dt_h
+            acc["unserved_steps"] += int(np.count_nonzero(unserved > 0.0))
+            acc["max_unserved"] = max(acc["max_unserved"], float(unserved.max()))
+            acc["risk_steps"] += int(np.count_nonzero(risk_event))
+            acc["max_risk"] = max(acc["max_risk"], float(risk_index.max()))
+            abs_ramp = np.abs(ramp["ramp_kw_per_min"])
+            acc["ramp_exceed_steps"] += int(np.count_nonzero(abs_ramp > ramp_limit_kw_per_min))
+            acc["max_ramp"] = max(acc["max_ramp"], float(abs_ramp.max()))
+            acc["ramp_deficit_steps"] += int(np.count_nonzero(deficit > 0.0))
+            acc["max_ramp_deficit"] = max(acc["max_ramp_deficit"], float(deficit.max()))
+            acc["min_headroom"] = min(acc["min_headroom"], float(ramp["headroom_kw"].min()))
+            t3 = time.perf_counter()
+            timings["risk_s"] += t3 - t2
+
+            if writer is not None:
+                _write_chunk(writer, ts, {
+                    "load_kw": load, "pv_kw": pv, "net_kw": net, "soc": soc_arr, "batt_p_kw": batt_p,
+                    "unserved_kw": unserved, "reserve_deficit_p_kw": risk["reserve_deficit_p_kw"],
+                    "reserve_deficit_e_kwh": risk["reserve_deficit_e_kwh"], **ramp,
+                    "risk_event": risk_event, "risk_index": risk_index,
+                })
+            t = time.perf_counter()
+            timings["write_s"] += t - t3
+    finally:
+        if writer is not None:
+            writer.close()
+
+    pct = 100.0 / max(1, n_total)
+    metrics = {
+        "total_unserved_kwh": acc["unserved_kwh"],
+        "pct_unserved_steps": pct * acc["unserved_steps"],
+        "max_unserved_kw": acc["max_unserved"],
+        "pct_risk_steps": pct * acc["risk_steps"],
+        "max_risk_index": acc["max_risk"],
+        "pct_ramp_exceed_steps": pct * acc["ramp_exceed_steps"],
+        "max_ramp_kw_per_min": acc["max_ramp"],
+        "pct_ramp_deficit_steps": pct * acc["ramp_deficit_steps"],
+        "max_ramp_deficit_kw": acc["max_ramp_deficit"],
+        "min_headroom_kw": acc["min_headroom"],
+    }
+    if rc is not None:
+        deg = add_rates(rc.finalize(), n_total * dt_h / 8760.0)
+        metrics.update({k: deg[k] for k in ("efc_per_year", "damage_per_year", "life_years")})
+
+    return {
+        "metrics": metrics,
+        "steps": n_total,
+        "dispatch_stats": stats,
+        "timings": timings,
+        "t_start": t_start,
+        "t_end": t_end,
+    }
@@ -0,0 +1,124 @@
+# Binary cache of processed inputs: int64 epoch-ns timestamps + value arrays, opened with np.memmap
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from config import CACHE_DIR, CACHE_VALIDATION, CACHE_VALUE_DTYPE, PROCESSED_FORMAT
+from scripts.pipeline.inputs import processed_path, read_processed
+
+CACHE_VERSION = 1
+
+def _sha256(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def source_fingerprint(path: Path, mode: str = CACHE_VALIDATION) -> dict:
+    st = path.stat()
+    if mode == "mtime":
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if mode == "hash":
+        return {"size": st.st_size, "sha256": _sha256(path)}
+    raise ValueError(f"unknown cache validation mode {mode!r} (expected 'mtime' or 'hash')")
+
+def cache_base(src: Path, column: str, tag: str = "") -> Path:
+    src = Path(src).resolve()
+    key = hashlib.sha1(str(src).encode("utf-8")).hexdigest()[:10]
+    suffix = f".{tag}" if tag else ""
+    return CACHE_DIR / f"{src.stem}-{key}.{column}{suffix}"
+
+def _paths(base: Path):
+    return (
+        base.with_name(base.name + ".ts.i8"),
+        base.with_name(base.name + ".val.bin"),
+        base.with_name(base.name + ".meta.json"),
+    )
+
+def _read_meta(meta_path: Path):
+    if not meta_path.exists():
+        return None
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def write_arrays(base: Path, ts_ns: np.ndarray, values: np.ndarray, meta: dict):
+    """
+    Write one cache entry (timestamps + values + meta) and return it memmapped.
+    meta.json is written last, so a half-written entry is never picked up as valid.
+    """
+    ts_path, val_path, meta_path = _paths(base)
+    base.parent.mkdir(parents=True, exist_ok=True)
+
+    meta = dict(meta, version=CACHE_VERSION, length=int(len(ts_ns)), dtype=str(values.dtype))
+    for path, arr in ((ts_path, ts_ns), (val_path, values)):
+        tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+        arr.tofile(tmp)
+        os.replace(tmp, path)
+    tmp = meta_path.with_name(meta_path.name + f".tmp{os.getpid()}")
+    tmp.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    os.replace(tmp, meta_path)
+    return open_arrays(base, meta)
+
+def open_arrays(base: Path, meta: dict):
+    ts_path, val_path, _ = _paths(base)
+    n = int(meta["length"])
+    if n == 0:
+        return np.empty(0, dtype="int64"), np.empty(0, dtype=meta["dtype"])
+    ts = np.memmap(ts_path, dtype="int64", mode="r", shape=(n,))
+    vals = np.memmap(val_path, dtype=meta["dtype"], mode="r", shape=(n,))
+    return ts, vals
+
+def lookup(base: Path, expect: dict):
+    """
+    Return the memmapped arrays of a cache entry if its meta matches `expect`, else None
+    """
+    meta = _read_meta(_paths(base)[2])
+    if meta is None or meta.get("version") != CACHE_VERSION:
+        return None
+    if any(meta.get(k) != v for k, v in expect.items()):
+        return None
+    return open_arrays(base, meta)
+
+def read_processed_file(path: Path):
+    fmt = "parquet" if path.suffix == ".parquet" else "csv"
+    return read_processed(path, fmt)
+
+def build_cache(src: Path, column: str, dtype: str = CACHE_VALUE_DTYPE, mode: str = CACHE_VALIDATION):
+    src = Path(src)
+    df = read_processed_file(src)
+    ts_ns = df["timestamp"].to_numpy("datetime64[ns]").view("int64")
+    vals = df[column].to_numpy(dtype=dtype)
+
+    # store sorted so readers can rely on it
+    if len(ts_ns) > 1 and (np.diff(ts_ns) < 0).any():
+        order = np.argsort(ts_ns, kind="stable")
+        ts_ns = ts_ns[order]
+        vals = vals[order]
+
+    meta = {"source": str(src.resolve()), "column": column, "source_fingerprint": source_fingerprint(src, mode)}
+    return write_arrays(cache_base(src, column), np.ascontiguousarray(ts_ns), np.ascontiguousarray(vals), meta)
+
+def load_cached(csv_path: Path, column: str, dtype: str = CACHE_VALUE_DTYPE, mode: str = CACHE_VALIDATION,
+                fmt: str = PROCESSED_FORMAT):
+    """
+    Processed input column as (int64 epoch-ns timestamps, values), both np.memmap.
+
+    The first call (or a changed source file) parses the source and writes the cache;
+    later calls - also from other worker processes - just map the same files.
+    """
+    src = processed_path(csv_path, fmt)
+    if not src.exists():
+        raise FileNotFoundError(f"missing processed input {src} - run preprocessing first")
+
+    expect = {"column": column, "dtype": str(np.dtype(dtype)), "source_fingerprint": source_fingerprint(src, mode)}
+    hit = lookup(cache_base(src, column), expect)
+    if hit is not None:
+        return hit
+    print(f"building input cache for {src.name}:{column}")
+    return build_cache(src, column, dtype, mode)
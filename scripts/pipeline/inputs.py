@@ -0,0 +1,39 @@
+# Reading of the processed simulation inputs (load / pv)
+from pathlib import Path
+
+import pandas as pd
+
+from config import PROCESSED_FORMAT
+
+def processed_path(csv_path: Path, fmt: str = PROCESSED_FORMAT) -> Path:
+    """
+    Path of a processed input in the configured format (csv path -> .parquet sibling).
+    fmt "auto": an explicitly listed file (e.g. a fleet site table entry), read by its own suffix
+    """
+    csv_path = Path(csv_path)
+    if fmt == "auto":
+        return csv_path
+    if fmt == "parquet":
+        return csv_path.with_suffix(".parquet")
+    if fmt == "csv":
+        return csv_path
+    raise ValueError(f"unknown processed format: {fmt!r} (expected 'csv', 'parquet' or 'auto')")
+
+def write_processed(df: pd.DataFrame, csv_path: Path, fmt: str = PROCESSED_FORMAT) -> Path:
+    path = processed_path(csv_path, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+def read_processed(csv_path: Path, fmt: str = PROCESSED_FORMAT) -> pd.DataFrame:
+    path = processed_path(csv_path, fmt)
+    if not path.exists():
+        raise FileNotFoundError(f"missing processed input {path} - run preprocessing first")
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        return df
+    return pd.read_csv(path, parse_dates=["timestamp"])
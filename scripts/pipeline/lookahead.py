@@ -0,0 +1,169 @@
+# Rolling-horizon look-ahead BESS dispatch: one small LP per step (scipy linprog / HiGHS)
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from config import LOOKAHEAD_FORECAST, LOOKAHEAD_PEAK_WEIGHT, LOOKAHEAD_TERMINAL_WEIGHT
+
+# tiny cost on battery throughput: rules out simultaneous charge + discharge
+THROUGHPUT_EPS = 1e-4
+
+class HorizonLP:
+    """
+    Horizon problem for a fixed length h; the constraint matrices are built once and
+    only the right-hand side and the bounds change from step to step.
+
+    Variables per horizon step k: charge c_k, discharge d_k, unserved u_k, spill w_k (kW),
+    stored energy s_k (kWh, after step k); plus the horizon peak unserved z (kW).
+
+        min  sum_k u_k*dt + peak_weight*z - terminal_weight*s_{h-1} + eps*sum_k (c_k + d_k)*dt
+        s.t. d_k - c_k + u_k - w_k = net_k
+             s_k - s_{k-1} - eta_ch*dt*c_k + dt/eta_dis*d_k = 0      (s_{-1} = stored energy now)
+             u_k - z <= 0
+             0 <= c_k, d_k <= p_max;  0 <= u_k <= max(net_k, 0);  0 <= w_k <= max(-net_k, 0)
+             soc_min*E <= s_k <= soc_max*E
+    """
+
+    def __init__(self, h, dt_h, e_kwh, p_max_kw, soc_min, soc_max, eta_ch, eta_dis,
+                 peak_weight=LOOKAHEAD_PEAK_WEIGHT, terminal_weight=LOOKAHEAD_TERMINAL_WEIGHT):
+        self.h = h
+        nv = 5 * h + 1
+        self.ic, self.id, self.iu, self.iw, self.is_ = (np.arange(h) + j * h for j in range(5))
+        self.iz = 5 * h
+
+        cost = np.zeros(nv)
+        cost[self.iu] = dt_h
+        cost[self.ic] = THROUGHPUT_EPS * dt_h
+        cost[self.id] = THROUGHPUT_EPS * dt_h
+        cost[self.iz] = peak_weight
+        cost[self.is_[-1]] = -terminal_weight
+        self.cost = cost
+
+        k = np.arange(h)
+        ones = np.ones(h)
+        # power balance rows 0..h-1, energy balance rows h..2h-1
+        rows = np.concatenate([k, k, k, k, h + k, h + k, h + k, h + k[1:]])
+        cols = np.concatenate([self.id, self.ic, self.iu, self.iw, self.is_, self.ic, self.id, self.is_[:-1]])
+        vals = np.concatenate([ones, -ones, ones, -ones, ones, -eta_ch * dt_h * ones, dt_h / eta_dis * ones, -ones[1:]])
+        self.A_eq = sparse.csr_matrix((vals, (rows, cols)), shape=(2 * h, nv))
+        self.b_eq = np.zeros(2 * h)
+
+        self.A_ub = sparse.csr_matrix(
+            (np.concatenate([ones, -ones]), (np.concatenate([k, k]), np.concatenate([self.iu, np.full(h, self.iz)]))),
+            shape=(h, nv),
+        )
+        self.b_ub = np.zeros(h)
+
+        self.bounds = np.zeros((nv, 2))
+        self.bounds[self.ic, 1] = p_max_kw
+        self.bounds[self.id, 1] = p_max_kw
+        self.bounds[self.is_, 0] = soc_min * e_kwh
+        self.bounds[self.is_, 1] = soc_max * e_kwh
+        self.bounds[self.iz, 1] = np.inf
+
+    def solve(self, net_hat, s0_kwh):
+        """
+        First-step (charge, discharge) of the optimal horizon plan, or None if the solve failed
+        """
+        self.b_eq[:self.h] = net_hat
+        self.b_eq[self.h] = s0_kwh
+        self.bounds[self.iu, 1] = np.maximum(net_hat, 0.0)
+        self.bounds[self.iw, 1] = np.maximum(-net_hat, 0.0)
+        res = linprog(self.cost, A_ub=self.A_ub, b_ub=self.b_ub, A_eq=self.A_eq, b_eq=self.b_eq,
+                      bounds=self.bounds, method="highs")
+        if res.status != 0:
+            return None
+        return res.x[self.ic[0]], res.x[self.id[0]]
+
+def forecast(net, i, h, mode=LOOKAHEAD_FORECAST):
+    """
+    Net forecast for steps i..i+h-1: "persistence" (net now held) or "perfect" (actual values)
+    """
+    if mode == "persistence":
+        return np.full(h, net[i])
+    if mode == "perfect":
+        return net[i:i + h]
+    raise ValueError(f"unknown forecast mode {mode!r} (expected 'persistence' or 'perfect')")
+
+def _greedy_unserved(net_hat, soc, dt_h, e_kwh, p_max_kw, soc_min, soc_max, eta_ch, eta_dis):
+    """
+    Unserved energy of the reactive plan over the forecast horizon (scalar roll-out)
+    """
+    total = 0.0
+    for net_kw in net_hat.tolist():
+        if net_kw > 0.0:
+            p = min(net_kw, p_max_kw, max(0.0, (soc - soc_min) * e_kwh) / dt_h)
+            soc -= (p * dt_h) / (eta_dis * e_kwh)
+            total += net_kw - p
+        elif net_kw < 0.0:
+            p = min(-net_kw, p_max_kw, max(0.0, (soc_max - soc) * e_kwh) / dt_h)
+            soc += (p * dt_h * eta_ch) / e_kwh
+        soc = min(soc_max, max(soc_min, soc))
+    return total
+
+def dispatch_lookahead(net, dt_h, h_steps, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis,
+                       forecast_mode=LOOKAHEAD_FORECAST):
+    """
+    Receding-horizon dispatch: plan h_steps ahead, apply the first step, move on.
+
+    Two exact shortcuts skip the LP:
+      - the reactive plan has no unserved energy over the horizon: it is optimal
+        (nothing to save for later, and charging greedily maximises the terminal SoC)
+      - the battery is at SOC_MIN and no surplus is forecast: nothing can be dispatched
+
+    Returns (soc_pre, soc, batt_p_kw, unserved_kw, stats).
+    """
+    net = np.asarray(net, dtype=float)
+    n = len(net)
+    soc_pre_out = np.empty(n)
+    soc_out = np.empty(n)
+    batt_out = np.zeros(n)
+    unserved_out = np.zeros(n)
+
+    lps = {}
+    stats = {"lp_solves": 0, "greedy_steps": 0, "empty_steps": 0, "lp_failures": 0}
+    soc = float(soc0)
+    net_list = net.tolist()
+    for i in range(n):
+        net_kw = net_list[i]
+        soc_pre_out[i] = soc
+        h = min(h_steps, n - i)
+        net_hat = forecast(net, i, h, forecast_mode)
+
+        e_avail_dis = max(0.0, (soc - soc_min) * e_kwh)
+        e_avail_chg = max(0.0, (soc_max - soc) * e_kwh)
+        p_dis_feasible = min(p_max_kw, e_avail_dis / dt_h)
+        p_chg_feasible = min(p_max_kw, e_avail_chg / dt_h)
+
+        # reactive action = target of both shortcuts
+        target = net_kw
+        if e_avail_dis <= 0.0 and net_hat.min() >= 0.0:
+            stats["empty_steps"] += 1
+        elif _greedy_unserved(net_hat, soc, dt_h, e_kwh, p_max_kw, soc_min, soc_max, eta_ch, eta_dis) <= 0.0:
+            stats["greedy_steps"] += 1
+        else:
+            if h not in lps:
+                lps[h] = HorizonLP(h, dt_h, e_kwh, p_max_kw, soc_min, soc_max, eta_ch, eta_dis)
+            plan = lps[h].solve(net_hat, soc * e_kwh)
+            stats["lp_solves"] += 1
+            if plan is None:
+                stats["lp_failures"] += 1
+            else:
+                c0, d0 = plan
+                target = d0 - c0
+
+        # apply the first step with the same physics as the reactive dispatch
+        batt_p = 0.0
+        if net_kw > 0.0:
+            batt_p = min(max(target, 0.0), net_kw, p_dis_feasible)
+            soc -= (batt_p * dt_h) / (eta_dis * e_kwh)
+            unserved_out[i] = max(0.0, net_kw - batt_p)
+        elif net_kw < 0.0:
+            batt_p = -min(max(-target, 0.0), -net_kw, p_chg_feasible)
+            soc += (-batt_p * dt_h * eta_ch) / e_kwh
+
+        soc = min(soc_max, max(soc_min, soc))
+        soc_out[i] = soc
+        batt_out[i] = batt_p
+
+    return soc_pre_out, soc_out, batt_out, unserved_out, stats
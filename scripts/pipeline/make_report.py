@@ -1,7 +1,14 @@
 # final operator-tailored holistic stability report (pdf)
+# --compare: one comparative report over all scenarios in the summary store
 
 from pathlib import Path
+import argparse
+import json
 import re
+import time
+
+import numpy as np
+import pandas as pd
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
@@ -38,7 +45,14 @@ from config import (
     ALPHA,
     BETA,
     GAMMA,
+    DISPATCH_POLICY,
+    RUN_PROFILE_JSON,
+    SUMMARY_STORE,
+    MAKE_PLOTS,
 )
+from scripts.pipeline.profiling import StageProfiler
+from scripts.pipeline.summary_cube import CUBE_PARQUET, read_cube
+from scripts.pipeline.summary_store import METRIC_KEYS, PARAM_KEYS, lookup, read_store, scenario_id, scenario_params
 
 # input files created
 METRICS_TXT = SIM_DIR / "metrics_summary.txt"
@@ -47,21 +61,67 @@ PRED_REACT_OP_TXT = COMPARE_DIR / "predictive_vs_reactive_operator.txt"
 LEAD_TIME_CDF_PNG = COMPARE_DIR / "lead_time_cdf.png"
 TOP_DRIVERS_TXT = XAI_DIR / "top_drivers.txt"
 
-# key figures created
-QUICKLOOK_DIR = SIM_DIR / "quicklooks"
-FIGS = [
-    QUICKLOOK_DIR / "load_pv_net_full.png",
-    QUICKLOOK_DIR / "soc_full.png",
-    QUICKLOOK_DIR / "unserved_full.png",
-    QUICKLOOK_DIR / "risk_index_full.png",
-    RISK_DIR / "risk_index_exceedance.png",
-    RISK_DIR / "unserved_exceedance.png",
-    XAI_DIR / "fig5_shap_importance_horizontal.png",
-]
-
 # report output
 REPORT_DIR = RESULTS_DIR / "report"
 OUT_PDF = REPORT_DIR / "microgrid_stability_report.pdf"
+COMPARE_PDF = REPORT_DIR / "scenario_comparison_report.pdf"
+COMPARE_FIG_DIR = REPORT_DIR / "comparison"
+
+# metric labels as written to metrics_summary.txt
+METRIC_LABELS = {
+    "total_unserved_kwh": "Total unserved energy (kWh)",
+    "pct_unserved_steps": "Timesteps with unserved load (%)",
+    "max_unserved_kw": "Max unserved power (kW)",
+    "pct_risk_steps": "Timesteps flagged as risk events (%)",
+    "max_risk_index": "Max risk index",
+}
+
+DEGRADATION_LABELS = {
+    "efc_per_year": "Equivalent full cycles per year",
+    "life_years": "Estimated cycle life (years)",
+}
+
+# columns of the ranked scenario table (comparative report)
+RANK_COLUMNS = [
+    ("scenario_id", "scenario"),
+    ("dt_min", "dt (min)"),
+    ("e_kwh", "E (kWh)"),
+    ("p_max_kw", "P (kW)"),
+    ("total_unserved_kwh", "unserved (kWh)"),
+    ("pct_unserved_steps", "unserved steps (%)"),
+    ("pct_risk_steps", "risk steps (%)"),
+    ("max_risk_index", "max risk"),
+]
+
+def report_inputs(sim_dir=SIM_DIR, risk_dir=RISK_DIR, events_dir=EVENTS_DIR, xai_dir=XAI_DIR, compare_dir=COMPARE_DIR,
+                  params: dict = None, run_profile_json=RUN_PROFILE_JSON) -> dict:
+    """
+    Paths of all stage outputs the report reads (defaults = config result folders).
+    params: scenario parameters of the run (summary_store.scenario_params), None = config.py
+    """
+    quicklook_dir = sim_dir / "quicklooks"
+    return {
+        "metrics_txt": sim_dir / METRICS_TXT.name,
+        "pred_react_op_txt": compare_dir / PRED_REACT_OP_TXT.name,
+        "lead_time_cdf_png": compare_dir / LEAD_TIME_CDF_PNG.name,
+        "top_drivers_txt": xai_dir / TOP_DRIVERS_TXT.name,
+        "events_dir": events_dir,
+        "run_profile_json": run_profile_json,
+        "summary_cube": sim_dir / CUBE_PARQUET.name,
+        "summary_store": SUMMARY_STORE,
+        "params": params,
+        # key figures created
+        "figs": [
+            quicklook_dir / "load_pv_net_full.png",
+            quicklook_dir / "soc_full.png",
+            quicklook_dir / "unserved_full.png",
+            quicklook_dir / "risk_index_full.png",
+            quicklook_dir / "risk_hour_month.png",
+            risk_dir / "risk_index_exceedance.png",
+            risk_dir / "unserved_exceedance.png",
+            xai_dir / "fig5_shap_importance_horizontal.png",
+        ],
+    }
 
 def _read_text_safe(path: Path) -> str:
     if not path.exists():
@@ -93,8 +153,26 @@ def _kv_to_num_map(kv_rows):
         m[k] = num if num is not None else v2
     return m
 
-def _read_top_drivers():
-    text = _read_text_safe(TOP_DRIVERS_TXT).strip()
+def _structured_metrics(store: Path, params: dict = None):
+    """
+    Metrics of the scenario (default: the configured one) from the summary store, or None if it has no row yet
+    """
+    row = lookup(scenario_id(params or scenario_params()), store)
+    if row is None:
+        return None
+    out = {k: float(row[k]) for k in METRIC_KEYS}
+    for k in DEGRADATION_LABELS:
+        if k in row and row[k] == row[k]:
+            out[k] = float(row[k])
+    return out
+
+def _metrics_from_text(kv_rows) -> dict:
+    # fallback for runs without a summary store row: label -> metric key
+    num = _kv_to_num_map(kv_rows)
+    return {k: num[label] for k, label in METRIC_LABELS.items() if isinstance(num.get(label), float)}
+
+def _read_top_drivers(path: Path = TOP_DRIVERS_TXT):
+    text = _read_text_safe(path).strip()
     if not text:
         return []
     lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
@@ -183,8 +261,8 @@ def _make_table(rows, col_widths_cm=(7.5, 9.5)):
     )
     return tbl
 
-def _collect_top_events_table_and_stats():
-    top_csv = EVENTS_DIR / "top_events.csv"
+def _collect_top_events_table_and_stats(events_dir: Path = EVENTS_DIR):
+    top_csv = events_dir / "top_events.csv"
     if not top_csv.exists():
         return None, None
 
@@ -220,15 +298,65 @@ def _collect_top_events_table_and_stats():
 
     return _make_table(rows, col_widths_cm=(6.2, 10.8)), stats
 
+def _collect_period_risk_table(path: Path):
+    # seasons, then months, from the summary cube written by simulate_microgrid
+    if not path.exists():
+        return None
+    rows = [["period", "risk steps (%)", "mean risk", "max risk", "unserved (kWh)", "min soc"]]
+    for res, label in (("season", lambda r: r["season"]), ("monthly", lambda r: r["period"].strftime("%b %Y"))):
+        for _, r in read_cube(path, res).iterrows():
+            rows.append([
+                label(r),
+                f"{100.0 * r['risk_event_mean']:.1f}",
+                f"{r['risk_index_mean']:.2f}",
+                f"{r['risk_index_max']:.2f}",
+                f"{r['unserved_kwh_sum']:.1f}",
+                f"{r['soc_min']:.2f}",
+            ])
+    if len(rows) == 1:
+        return None
+    return _make_table(rows, col_widths_cm=(3.2, 2.8, 2.6, 2.6, 3.2, 2.6))
+
+def _fmt_num(v, fmt="{:.2f}"):
+    return fmt.format(v) if isinstance(v, (int, float)) else "-"
+
+def _collect_run_profile_table(path: Path):
+    text = _read_text_safe(path).strip()
+    if not text:
+        return None, None
+    try:
+        prof = json.loads(text)
+    except ValueError:
+        return None, None
+
+    rows = [["stage / phase", "wall (s)", "cpu (s)", "peak RSS (MB)"]]
+    for st in prof.get("stages", []):
+        rows.append([
+            st.get("stage", "?"),
+            _fmt_num(st.get("wall_s")),
+            _fmt_num(st.get("cpu_s")),
+            _fmt_num(st.get("peak_rss_mb"), "{:.0f}"),
+        ])
+        for ph in st.get("phases", []):
+            rows.append([
+                f"    {ph.get('phase', '?')}",
+                _fmt_num(ph.get("wall_s")),
+                _fmt_num(ph.get("cpu_s")),
+                _fmt_num(ph.get("peak_rss_mb"), "{:.0f}"),
+            ])
+    if len(rows) == 1:
+        return None, None
+    total = prof.get("total_wall_s")
+    return _make_table(rows, col_widths_cm=(7.0, 3.3, 3.3, 3.4)), total
+
 def _build_operator_notes(metrics_map, top_event_stats, top_drivers):
     notes = []
 
     # key numbers
-    total_unserved_kwh = metrics_map.get("Total unserved energy (kWh)")
-    pct_unserved_steps = metrics_map.get("Timesteps with unserved load (%)")
-    pct_risk_steps = metrics_map.get("Timesteps flagged as risk events (%)")
-    max_risk_index = metrics_map.get("Max risk index")
-    max_unserved_kw = metrics_map.get("Max unserved power (kW)")
+    total_unserved_kwh = metrics_map.get("total_unserved_kwh")
+    pct_unserved_steps = metrics_map.get("pct_unserved_steps")
+    pct_risk_steps = metrics_map.get("pct_risk_steps")
+    max_unserved_kw = metrics_map.get("max_unserved_kw")
 
     # metrics
     if isinstance(total_unserved_kwh, float) and total_unserved_kwh > 0.0:
@@ -268,14 +396,47 @@ def _build_operator_notes(metrics_map, top_event_stats, top_drivers):
 
     return notes[:8]
 
-def main():
-    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+def _settings_rows(params: dict = None):
+    if params is None:
+        return [
+            ["Parameter", "value"],
+            ["Time step (min)", str(DT_MIN)],
+            ["Forecast horizon (steps)", str(H_STEPS)],
+            ["Forecast horizon (hours)", f"{(H_STEPS * DT_MIN) / 60.0:.2f}"],
+            ["PV installed capacity (kWp)", str(PV_KWP)],
+            ["BESS energy capacity (kWh)", str(E_KWH)],
+            ["BESS power limit (kW)", str(P_MAX_KW)],
+            ["SoC window", f"[{SOC_MIN}, {SOC_MAX}]"],
+            ["Initial SoC", str(SOC0)],
+            ["Charge efficiency", str(ETA_CH)],
+            ["Discharge efficiency", str(ETA_DIS)],
+            ["Risk weights (alpha, beta, gamma)", f"{ALPHA}, {BETA}, {GAMMA}"],
+            ["BESS dispatch policy", DISPATCH_POLICY],
+        ]
+    p = params
+    return [
+        ["Parameter", "value"],
+        ["Site", p["site"]],
+        ["Time step (min)", f"{p['dt_min']:g}"],
+        ["Forecast horizon (steps)", str(p["h_steps"])],
+        ["Forecast horizon (hours)", f"{(p['h_steps'] * p['dt_min']) / 60.0:.2f}"],
+        ["PV installed capacity (kWp)", f"{p['pv_kwp']:g}"],
+        ["BESS energy capacity (kWh)", f"{p['e_kwh']:g}"],
+        ["BESS power limit (kW)", f"{p['p_max_kw']:g}"],
+        ["SoC window", f"[{p['soc_min']:g}, {p['soc_max']:g}]"],
+        ["Initial SoC", f"{p['soc0']:g}"],
+        ["Charge efficiency", f"{p['eta_ch']:g}"],
+        ["Discharge efficiency", f"{p['eta_dis']:g}"],
+        ["Risk weights (alpha, beta, gamma)", f"{p['alpha']:g}, {p['beta']:g}, {p['gamma']:g}"],
+        ["BESS dispatch policy", p["policy"]],
+    ]
 
-    print("creating pdf report")
-    print(f"output: {OUT_PDF}")
+def build_report(out_pdf: Path = OUT_PDF, inputs: dict = None):
+    inputs = inputs or report_inputs()
+    out_pdf.parent.mkdir(parents=True, exist_ok=True)
 
     doc = SimpleDocTemplate(
-        str(OUT_PDF),
+        str(out_pdf),
         pagesize=A4,
         leftMargin=2.0 * cm,
         rightMargin=2.0 * cm,
@@ -295,44 +456,45 @@ def main():
 
     # config settings
     story.append(Paragraph("Run settings", st["sc_h2"]))
-    settings_rows = [
-        ["Parameter", "value"],
-        ["Time step (min)", str(DT_MIN)],
-        ["Forecast horizon (steps)", str(H_STEPS)],
-        ["Forecast horizon (hours)", f"{(H_STEPS * DT_MIN) / 60.0:.2f}"],
-        ["PV installed capacity (kWp)", str(PV_KWP)],
-        ["BESS energy capacity (kWh)", str(E_KWH)],
-        ["BESS power limit (kW)", str(P_MAX_KW)],
-        ["SoC window", f"[{SOC_MIN}, {SOC_MAX}]"],
-        ["Initial SoC", str(SOC0)],
-        ["Charge efficiency", str(ETA_CH)],
-        ["Discharge efficiency", str(ETA_DIS)],
-        ["Risk weights (alpha, beta, gamma)", f"{ALPHA}, {BETA}, {GAMMA}"],
-    ]
+    settings_rows = _settings_rows(inputs.get("params"))
     story.append(_make_table(settings_rows))
     story.append(Spacer(1, 12))
 
     # key metrics summary
     story.append(Paragraph("Key metrics", st["sc_h2"]))
-    metrics_text = _read_text_safe(METRICS_TXT)
-    metrics_kv = []
-    metrics_map = {}
-    if metrics_text.strip():
-        metrics_kv = _parse_metrics_kv(metrics_text)
-        metrics_map = _kv_to_num_map(metrics_kv)
-        rows = [["metric", "value"]] + metrics_kv[:30]
+    metrics_map = _structured_metrics(inputs["summary_store"], inputs.get("params"))
+    if metrics_map is not None:
+        rows = [["metric", "value"]] + [[METRIC_LABELS[k], f"{metrics_map[k]:.2f}"] for k in METRIC_KEYS]
+        rows += [[label, f"{metrics_map[k]:.1f}"] for k, label in DEGRADATION_LABELS.items() if k in metrics_map]
         story.append(_make_table(rows))
     else:
-        story.append(Paragraph("- metrics file not found yet (run simulate_microgrid first)", st["note"]))
+        metrics_text = _read_text_safe(inputs["metrics_txt"])
+        metrics_map = {}
+        if metrics_text.strip():
+            metrics_kv = _parse_metrics_kv(metrics_text)
+            metrics_map = _metrics_from_text(metrics_kv)
+            rows = [["metric", "value"]] + metrics_kv[:30]
+            story.append(_make_table(rows))
+        else:
+            story.append(Paragraph("- metrics file not found yet (run simulate_microgrid first)", st["note"]))
     story.append(Spacer(1, 12))
 
+    # seasonal / monthly risk (summary cube)
+    period_tbl = _collect_period_risk_table(inputs["summary_cube"])
+    if period_tbl is not None:
+        story.append(Paragraph("Risk by season and month", st["sc_h2"]))
+        story.append(Paragraph("Seasons are DJF / MAM / JJA / SON of the simulated period", st["note"]))
+        story.append(Spacer(1, 6))
+        story.append(period_tbl)
+        story.append(Spacer(1, 12))
+
     # figures
     story.append(PageBreak())
     story.append(Paragraph("Main figures", st["sc_h2"]))
     story.append(Paragraph("These plots show what happened across the run", st["note"]))
     story.append(Spacer(1, 10))
 
-    for p in FIGS:
+    for p in inputs["figs"]:
         _safe_add_image(story, p)
 
     story.append(Spacer(1, 6))
@@ -342,7 +504,8 @@ def main():
     story.append(Paragraph("These are the biggest unserved-load events", st["note"]))
     story.append(Spacer(1, 8))
 
-    top_tbl, top_stats = _collect_top_events_table_and_stats()
+    events_dir = inputs["events_dir"]
+    top_tbl, top_stats = _collect_top_events_table_and_stats(events_dir)
     if top_tbl is not None:
         story.append(top_tbl)
         story.append(Spacer(1, 10))
@@ -350,8 +513,8 @@ def main():
         story.append(Paragraph("Event folders (plots):", st["BodyText"]))
         story.append(Spacer(1, 4))
 
-        if EVENTS_DIR.exists():
-            ev_folders = sorted([p for p in EVENTS_DIR.iterdir() if p.is_dir() and p.name.startswith("event_")])[:10]
+        if events_dir.exists():
+            ev_folders = sorted([p for p in events_dir.iterdir() if p.is_dir() and p.name.startswith("event_")])[:10]
             if ev_folders:
                 for d in ev_folders:
                     story.append(Paragraph(f"- {d.name}", st["mono"]))
@@ -368,14 +531,14 @@ def main():
     section_flow = []
     section_flow.append(Paragraph("Early-warning vs reactive comparison", st["sc_h2"]))
 
-    op_text = _read_text_safe(PRED_REACT_OP_TXT).strip()
+    op_text = _read_text_safe(inputs["pred_react_op_txt"]).strip()
     if op_text:
         html = "<br/>".join([ln.strip() for ln in op_text.splitlines()])
         section_flow.append(Paragraph(html, st["BodyText"]))
         section_flow.append(Spacer(1, 8))
 
-        if LEAD_TIME_CDF_PNG.exists():
-            img = Image(str(LEAD_TIME_CDF_PNG))
+        if inputs["lead_time_cdf_png"].exists():
+            img = Image(str(inputs["lead_time_cdf_png"]))
             max_w = 17.5 * cm
             iw, ih = img.imageWidth, img.imageHeight
             if iw > 0:
@@ -393,7 +556,7 @@ def main():
 
     story.append(Paragraph("Operator notes", st["sc_h2"]))
 
-    top_drivers = _read_top_drivers()
+    top_drivers = _read_top_drivers(inputs["top_drivers_txt"])
     notes = _build_operator_notes(metrics_map, top_stats, top_drivers)
 
     for n in notes:
@@ -401,7 +564,202 @@ def main():
 
     story.append(Spacer(1, 10))
 
+    # run performance (stages that finished before the report)
+    perf_tbl, total_wall = _collect_run_profile_table(inputs["run_profile_json"])
+    if perf_tbl is not None:
+        story.append(PageBreak())
+        story.append(Paragraph("Run performance", st["sc_h2"]))
+        story.append(Paragraph(
+            f"Wall time, CPU time and peak memory per pipeline stage and phase (total so far {_fmt_num(total_wall)} s)",
+            st["note"],
+        ))
+        story.append(Spacer(1, 8))
+        story.append(perf_tbl)
+        story.append(Spacer(1, 10))
+
+    doc.build(story)
+
+# comparative report (many scenarios, read from the summary store only)
+
+def pareto_mask(values: np.ndarray) -> np.ndarray:
+    """
+    True for rows not dominated by any other row (all columns minimised)
+    """
+    v = np.asarray(values, dtype=float)
+    keep = np.ones(len(v), dtype=bool)
+    for i in range(len(v)):
+        if not keep[i]:
+            continue
+        dominated = np.all(v <= v[i], axis=1) & np.any(v < v[i], axis=1)
+        if dominated.any():
+            keep[i] = False
+        else:
+            # everything that row i dominates can be dropped right away
+            keep &= ~(np.all(v[i] <= v, axis=1) & np.any(v[i] < v, axis=1))
+    return keep
+
+def swept_params(df: pd.DataFrame) -> list:
+    return [k for k in PARAM_KEYS if k in df.columns and df[k].nunique() > 1]
+
+def rank_scenarios(df: pd.DataFrame, rank_by=("total_unserved_kwh", "pct_risk_steps"), top: int = 20) -> pd.DataFrame:
+    ranked = df.sort_values(list(rank_by), kind="mergesort").reset_index(drop=True)
+    ranked.insert(0, "rank", np.arange(1, len(ranked) + 1))
+    return ranked.head(top)
+
+def _scenario_table(df: pd.DataFrame, with_rank: bool = True):
+    cols = ([("rank", "#")] if with_rank else []) + RANK_COLUMNS
+    rows = [[label for _, label in cols]]
+    for r in df.itertuples(index=False):
+        row = []
+        for key, _ in cols:
+            v = getattr(r, key)
+            row.append(f"{v:.2f}" if isinstance(v, (float, np.floating)) else str(v))
+        rows.append(row)
+    widths = [0.8] if with_rank else []
+    widths += [2.2, 1.4, 1.6, 1.5, 2.4, 2.6, 2.2, 1.7]
+    if not with_rank:
+        widths[0] += 0.8
+    return _make_table(rows, col_widths_cm=widths)
+
+def plot_pareto(df: pd.DataFrame, x: str, y: str, out_png: Path, color: str = None):
+    import matplotlib.pyplot as plt
+
+    front = df[pareto_mask(df[[x, y]].to_numpy())].sort_values(x)
+    fig, ax = plt.subplots(figsize=(8, 5))
+    c = df[color] if color and color in df.columns else None
+    sc = ax.scatter(df[x], df[y], c=c, s=18, alpha=0.7, cmap="viridis")
+    if c is not None:
+        fig.colorbar(sc, ax=ax, label=color)
+    ax.step(front[x], front[y], where="post", color="tab:red", linewidth=1.5, label="pareto front")
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    ax.set_title(f"{y} vs {x} ({len(df)} scenarios)")
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(out_png, dpi=150)
+    plt.close(fig)
+
+def plot_sensitivity(df: pd.DataFrame, param: str, metrics, out_png: Path):
+    """
+    Metric vs one parameter: median over all other parameters, min-max band
+    """
+    import matplotlib.pyplot as plt
+
+    g = df.groupby(param)[list(metrics)]
+    med, lo, hi = g.median(), g.min(), g.max()
+    fig, axes = plt.subplots(1, len(metrics), figsize=(5 * len(metrics), 4), squeeze=False)
+    for ax, m in zip(axes[0], metrics):
+        ax.fill_between(med.index, lo[m], hi[m], alpha=0.25, label="min-max")
+        ax.plot(med.index, med[m], marker="o", label="median")
+        ax.set_xlabel(param)
+        ax.set_ylabel(m)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+    fig.suptitle(f"Sensitivity to {param}")
+    fig.tight_layout()
+    fig.savefig(out_png, dpi=150)
+    plt.close(fig)
+
+def build_comparative_report(store: Path = SUMMARY_STORE, out_pdf: Path = COMPARE_PDF,
+                             rank_by=("total_unserved_kwh", "pct_risk_steps"), top: int = 20,
+                             source: str = None, fig_dir: Path = COMPARE_FIG_DIR):
+    """
+    Ranked tables, Pareto charts and sensitivity plots over all stored scenarios.
+    Only the summary store is read, so the cost does not depend on time-series length.
+    """
+    df = read_store(store)
+    if source is not None and "source" in df.columns:
+        df = df[df["source"].astype(str) == source]
+    if df.empty or "scenario_id" not in df.columns:
+        raise FileNotFoundError(f"no scenarios in summary store {store} (run the pipeline or run_sweep.py first)")
+    df = df.reset_index(drop=True)
+
+    out_pdf.parent.mkdir(parents=True, exist_ok=True)
+    doc = SimpleDocTemplate(
+        str(out_pdf),
+        pagesize=A4,
+        leftMargin=1.5 * cm,
+        rightMargin=1.5 * cm,
+        topMargin=1.8 * cm,
+        bottomMargin=1.8 * cm,
+        title="Microgrid scenario comparison",
+        author="Case study pipeline",
+    )
+    st = _styles()
+    story = []
+
+    story.append(Paragraph("Microgrid scenario comparison", st["sc_h1"]))
+    params = swept_params(df)
+    story.append(Paragraph(
+        f"{len(df)} scenarios from {store.name}; varied parameters: {', '.join(params) or 'none'}",
+        st["note"],
+    ))
+    story.append(Spacer(1, 10))
+
+    # ranked tables
+    story.append(Paragraph(f"Best {min(top, len(df))} scenarios (ranked by {', '.join(rank_by)})", st["sc_h2"]))
+    story.append(_scenario_table(rank_scenarios(df, rank_by, top)))
+    story.append(Spacer(1, 12))
+
+    objectives = ["e_kwh", "p_max_kw", "total_unserved_kwh"]
+    front = df[pareto_mask(df[objectives].to_numpy())].sort_values(objectives)
+    story.append(Paragraph("Pareto-optimal scenarios (BESS energy, BESS power, unserved energy)", st["sc_h2"]))
+    story.append(Paragraph(
+        f"{len(front)} scenarios are not beaten on all three by any other scenario",
+        st["note"],
+    ))
+    story.append(_scenario_table(front.head(top), with_rank=False))
+
+    # charts
+    if MAKE_PLOTS:
+        fig_dir.mkdir(parents=True, exist_ok=True)
+        story.append(PageBreak())
+        story.append(Paragraph("Pareto charts", st["sc_h2"]))
+        for x, color in (("e_kwh", "p_max_kw"), ("p_max_kw", "e_kwh")):
+            png = fig_dir / f"pareto_{x}_unserved.png"
+            plot_pareto(df, x, "total_unserved_kwh", png, color=color)
+            _safe_add_image(story, png)
+
+        if params:
+            story.append(PageBreak())
+            story.append(Paragraph("Sensitivity", st["sc_h2"]))
+            story.append(Paragraph("Median over all other parameters, band = min-max", st["note"]))
+            for p in params:
+                if not pd.api.types.is_numeric_dtype(df[p]):
+                    continue
+                png = fig_dir / f"sensitivity_{p}.png"
+                plot_sensitivity(df, p, ("total_unserved_kwh", "pct_risk_steps"), png)
+                _safe_add_image(story, png)
+    else:
+        story.append(Paragraph("- charts skipped (MAKE_PLOTS disabled)", st["note"]))
+
     doc.build(story)
+    return len(df)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the operator PDF report")
+    parser.add_argument("--compare", action="store_true", help="Comparative report over all scenarios in the summary store")
+    parser.add_argument("--rank-by", nargs="+", default=["total_unserved_kwh", "pct_risk_steps"],
+                        choices=list(METRIC_KEYS), help="Metrics to rank scenarios by (comparative report)")
+    parser.add_argument("--top", type=int, default=20, help="Rows in the ranked tables (comparative report)")
+    parser.add_argument("--source", choices=["pipeline", "sweep", "sizing", "rescore", "fleet", "highres"], help="Only scenarios from this source")
+    args = parser.parse_args()
+
+    if args.compare:
+        t0 = time.perf_counter()
+        n = build_comparative_report(rank_by=args.rank_by, top=args.top, source=args.source)
+        print(f"comparison report for {n} scenarios created in {time.perf_counter() - t0:.1f}s")
+        print(f"saved: {COMPARE_PDF}")
+        return
+
+    prof = StageProfiler("make_report")
+    print("creating pdf report")
+    print(f"output: {OUT_PDF}")
+
+    with prof.phase("render"):
+        build_report(OUT_PDF)
+    prof.save()
 
     print("report created!")
     print(f"saved: {OUT_PDF}")
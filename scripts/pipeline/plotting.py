@@ -0,0 +1,93 @@
+# Peak-preserving decimation for time-series plots: draw cost follows pixel width, not sample count
+import numpy as np
+
+from config import PLOT_DECIMATION
+
+# below this many samples per pixel column decimation is skipped
+MIN_SAMPLES_PER_PX = 2
+
+def axis_width_px(ax, dpi: float) -> int:
+    """
+    Width of the axes area in output pixels when the figure is saved at `dpi`
+    """
+    fig = ax.get_figure()
+    return max(1, int(ax.get_position().width * fig.get_figwidth() * dpi))
+
+def _as_numeric(x: np.ndarray) -> np.ndarray:
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype("int64").astype(float)
+    return x.astype(float)
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Index of the min and the max sample of each of n_buckets equal-count buckets (in time order),
+    plus the first and last sample. Every extreme survives, so spikes stay visible.
+    """
+    n = len(y)
+    size = int(np.ceil(n / n_buckets))
+    nb = int(np.ceil(n / size))
+    pad = nb * size - n
+
+    y = np.asarray(y, dtype=float)
+    lo = np.concatenate([np.where(np.isnan(y), np.inf, y), np.full(pad, np.inf)]).reshape(nb, size)
+    hi = np.concatenate([np.where(np.isnan(y), -np.inf, y), np.full(pad, -np.inf)]).reshape(nb, size)
+    base = np.arange(nb) * size
+    i_min = base + lo.argmin(axis=1)
+    i_max = base + hi.argmax(axis=1)
+
+    idx = np.concatenate([[0], np.minimum(i_min, i_max), np.maximum(i_min, i_max), [n - 1]])
+    return np.unique(np.minimum(idx, n - 1))
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: keeps the visually most significant sample per bucket
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_numeric(np.asarray(x))
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+
+        # average point of the next bucket
+        ny = y[nlo:nhi]
+        ok = ~np.isnan(ny)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = ny[ok].mean() if ok.any() else y[a]
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        area = np.where(np.isnan(area), -1.0, area)
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+def decimate(x, y, width_px: int, method: str = PLOT_DECIMATION):
+    """
+    (x, y) reduced to about 2 points per output pixel with `method` ("minmax", "lttb" or "none")
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if method == "none" or n <= MIN_SAMPLES_PER_PX * width_px:
+        return x, y
+    if method == "minmax":
+        idx = minmax_indices(y, width_px)
+    elif method == "lttb":
+        idx = lttb_indices(x, y, 2 * width_px)
+    else:
+        raise ValueError(f"unknown decimation method {method!r} (expected 'minmax', 'lttb' or 'none')")
+    return x[idx], y[idx]
+
+def plot_series(ax, x, y, dpi: float = 200, method: str = PLOT_DECIMATION, **kwargs):
+    """
+    ax.plot of a decimated series (sized to the axes width at the save dpi)
+    """
+    xd, yd = decimate(x, y, axis_width_px(ax, dpi), method)
+    return ax.plot(xd, yd, **kwargs)
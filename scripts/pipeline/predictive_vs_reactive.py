@@ -5,15 +5,16 @@
 from pathlib import Path
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # import project config paths
-from config import SIM_DIR, COMPARE_DIR, DT_MIN, H_STEPS
+from config import COMPARE_DIR, DT_MIN, H_STEPS, MAKE_PLOTS
+from scripts.pipeline.plotting import plot_series
+from scripts.pipeline.profiling import StageProfiler
+from scripts.pipeline.results_io import RESULTS_CSV, read_results
 
 EVAL_DIR = COMPARE_DIR
-EVAL_DIR.mkdir(parents=True, exist_ok=True)
 
-IN_CSV = SIM_DIR / "sim_results.csv"
+IN_CSV = RESULTS_CSV
 OUT_TXT = EVAL_DIR / "predictive_vs_reactive_summary.txt"
 OUT_OP_TXT = EVAL_DIR / "predictive_vs_reactive_operator.txt"
 OUT_CDF = EVAL_DIR / "lead_time_cdf.png"
@@ -36,12 +37,14 @@ def find_event_onsets(event: np.ndarray) -> np.ndarray:
     """
     Return indices where event transitions 0 -> 1
     """
-    event = event.astype(int)
-    prev = np.r_[0, event[:-1]]
-    onsets = np.where((prev == 0) & (event == 1))[0]
+    event = np.asarray(event) > 0
+    prev = np.r_[False, event[:-1]]
+    onsets = np.where(~prev & event)[0]
     return onsets
 
 def plot_lead_time_cdf(lead_minutes: np.ndarray, out_path: Path):
+    import matplotlib.pyplot as plt
+
     if len(lead_minutes) == 0:
         return
     x = np.sort(lead_minutes)
@@ -72,17 +75,16 @@ def build_operator_summary(coverage, median_lead, p90_lead, missed, precision, h
     lines.append("- Main goal: keep SoC higher / reduce net deficit peaks during warning periods")
     return "\n".join(lines) + "\n"
 
-def main():
-    if not IN_CSV.exists():
-        raise FileNotFoundError(f"missing {IN_CSV} - run simulation first")
-
-    df = pd.read_csv(IN_CSV, parse_dates=["timestamp"]).sort_values("timestamp").reset_index(drop=True)
-
+def evaluate(df: pd.DataFrame, h_steps: int = H_STEPS, dt_min: float = DT_MIN) -> dict:
+    """
+    Warning-vs-outage confusion counts and lead-time statistics for one results frame
+    """
     # reactive event definition
     if "unserved_kw" not in df.columns:
         raise RuntimeError("sim_results.csv missing column 'unserved_kw'")
 
-    reactive_event = (df["unserved_kw"].to_numpy() > 0.0).astype(int)
+    # 0/1 flags as uint8: one byte per step instead of eight
+    reactive_event = (df["unserved_kw"].to_numpy() > 0.0).astype(np.uint8)
 
     # predictive warning signal definition
     required_cols = ["reserve_deficit_p_kw", "reserve_deficit_e_kwh"]
@@ -93,10 +95,10 @@ def main():
     warn = (
         (df["reserve_deficit_p_kw"].to_numpy() > 0.0)
         | (df["reserve_deficit_e_kwh"].to_numpy() > 0.0)
-    ).astype(int)
+    ).astype(np.uint8)
 
     # evaluation target definition
-    y_future = compute_future_event(reactive_event, H_STEPS)
+    y_future = compute_future_event(reactive_event, h_steps)
 
     tp = int(((warn == 1) & (y_future == 1)).sum())
     fp = int(((warn == 1) & (y_future == 0)).sum())
@@ -112,7 +114,7 @@ def main():
     missed = 0
 
     for idx in onsets:
-        a = max(0, idx - H_STEPS)
+        a = max(0, idx - h_steps)
         window = warn[a:idx]
         if window.sum() == 0:
             missed += 1
@@ -123,52 +125,70 @@ def main():
         lead_steps.append(lead)
 
     lead_steps = np.array(lead_steps, dtype=float) if len(lead_steps) else np.array([], dtype=float)
-    lead_minutes = lead_steps * float(DT_MIN)
+    lead_minutes = lead_steps * float(dt_min)
 
     coverage = 1.0 - (missed / len(onsets)) if len(onsets) > 0 else 0.0
     median_lead = float(np.median(lead_minutes)) if len(lead_minutes) else 0.0
     p90_lead = float(np.quantile(lead_minutes, 0.90)) if len(lead_minutes) else 0.0
 
-    horizon_minutes = float(H_STEPS) * float(DT_MIN)
-
+    return {
+        "tp": tp, "fp": fp, "tn": tn, "fn": fn,
+        "precision": precision,
+        "recall": recall,
+        "onsets": onsets,
+        "missed": missed,
+        "coverage": coverage,
+        "lead_minutes": lead_minutes,
+        "median_lead": median_lead,
+        "p90_lead": p90_lead,
+        "horizon_minutes": float(h_steps) * float(dt_min),
+    }
+
+def write_summaries(ev: dict, out_txt=OUT_TXT, out_op_txt=OUT_OP_TXT):
     # summary
-    with open(OUT_TXT, "w", encoding="utf-8") as f:
+    with open(out_txt, "w", encoding="utf-8") as f:
         f.write("Detailed Predictive vs Reactive Evaluation\n")
         f.write("reactive event: outage happens when unserved_kw > 0\n")
         f.write("early-warning: warnings appear when reserve_deficit_p_kw > 0 OR reserve_deficit_e_kwh > 0\n")
-        f.write(f"horizon: {horizon_minutes:.0f} minutes (H_STEPS={H_STEPS}, DT_MIN={DT_MIN})\n\n")
+        f.write(f"horizon: {ev['horizon_minutes']:.0f} minutes (H_STEPS={H_STEPS}, DT_MIN={DT_MIN})\n\n")
 
         f.write("1. Warning as predictor of outage within the next horizon\n")
-        f.write(f"TP={tp}  FP={fp}  TN={tn}  FN={fn}\n")
-        f.write(f"precision={precision:.3f}\n")
-        f.write(f"recall   ={recall:.3f}\n\n")
+        f.write(f"TP={ev['tp']}  FP={ev['fp']}  TN={ev['tn']}  FN={ev['fn']}\n")
+        f.write(f"precision={ev['precision']:.3f}\n")
+        f.write(f"recall   ={ev['recall']:.3f}\n\n")
 
         f.write("2. Warning time before outage onset (0->1 transitions)\n")
-        f.write(f"number of outage onsets: {len(onsets)}\n")
-        f.write(f"coverage of onsets: {coverage*100:.2f}%\n")
-        f.write(f"median warning time (min): {median_lead:.1f}\n")
-        f.write(f"90th percentile warning time (min): {p90_lead:.1f}\n")
-        f.write(f"missed onsets (no warning): {missed}\n")
+        f.write(f"number of outage onsets: {len(ev['onsets'])}\n")
+        f.write(f"coverage of onsets: {ev['coverage']*100:.2f}%\n")
+        f.write(f"median warning time (min): {ev['median_lead']:.1f}\n")
+        f.write(f"90th percentile warning time (min): {ev['p90_lead']:.1f}\n")
+        f.write(f"missed onsets (no warning): {ev['missed']}\n")
 
-    print(f"Saved: {OUT_TXT}")
+    print(f"Saved: {out_txt}")
 
     # operator summary
     op_text = build_operator_summary(
-        coverage=coverage,
-        median_lead=median_lead,
-        p90_lead=p90_lead,
-        missed=missed,
-        precision=precision,
-        horizon_minutes=horizon_minutes,
+        coverage=ev["coverage"],
+        median_lead=ev["median_lead"],
+        p90_lead=ev["p90_lead"],
+        missed=ev["missed"],
+        precision=ev["precision"],
+        horizon_minutes=ev["horizon_minutes"],
     )
-    with open(OUT_OP_TXT, "w", encoding="utf-8") as f:
+    with open(out_op_txt, "w", encoding="utf-8") as f:
         f.write(op_text)
-    print(f"Saved: {OUT_OP_TXT}")
+    print(f"Saved: {out_op_txt}")
+
+def write_plots(ev: dict, df: pd.DataFrame, out_dir=EVAL_DIR):
+    import matplotlib.pyplot as plt
+
+    lead_minutes = ev["lead_minutes"]
+    onsets = ev["onsets"]
 
     # plot
     if len(lead_minutes) > 0:
-        plot_lead_time_cdf(lead_minutes, OUT_CDF)
-        print(f"Saved: {OUT_CDF}")
+        plot_lead_time_cdf(lead_minutes, out_dir / OUT_CDF.name)
+        print(f"Saved: {out_dir / OUT_CDF.name}")
 
         # histogram
         plt.figure(figsize=(7, 4))
@@ -177,20 +197,20 @@ def main():
         plt.ylabel("count")
         plt.title("warning time distribution (histogram)")
         plt.tight_layout()
-        plt.savefig(OUT_HIST, dpi=200)
+        plt.savefig(out_dir / OUT_HIST.name, dpi=200)
         plt.close()
-        print(f"Saved: {OUT_HIST}")
+        print(f"Saved: {out_dir / OUT_HIST.name}")
 
     if len(onsets) > 0:
         center = int(onsets[0])
-        W = 24 * 4  # 24 hours at 15min steps
+        W = int(24 * 60 / DT_MIN)  # 24 hours of steps
         a = max(0, center - W)
         b = min(len(df), center + W)
-        w = df.iloc[a:b].copy()
+        w = df.iloc[a:b]
 
         plt.figure(figsize=(10, 3.5))
-        plt.plot(w["timestamp"], (w["unserved_kw"] > 0).astype(int), label="Reactive event (unserved>0)")
-        plt.plot(w["timestamp"], (
+        plot_series(plt.gca(), w["timestamp"], (w["unserved_kw"] > 0).astype(int), label="Reactive event (unserved>0)")
+        plot_series(plt.gca(), w["timestamp"], (
             (w["reserve_deficit_p_kw"] > 0) | (w["reserve_deficit_e_kwh"] > 0)
         ).astype(int), label="Predictive warning (reserve deficit)")
         plt.ylim(-0.1, 1.1)
@@ -198,9 +218,28 @@ def main():
         plt.xticks(rotation=25)
         plt.title("Predictive warning vs reactive detection")
         plt.tight_layout()
-        plt.savefig(OUT_TIMELINE, dpi=200)
+        plt.savefig(out_dir / OUT_TIMELINE.name, dpi=200)
         plt.close()
-        print(f"Saved: {OUT_TIMELINE}")
+        print(f"Saved: {out_dir / OUT_TIMELINE.name}")
+
+def main():
+    if not IN_CSV.exists():
+        raise FileNotFoundError(f"missing {IN_CSV} - run simulation first")
+
+    prof = StageProfiler("predictive_vs_reactive")
+    EVAL_DIR.mkdir(parents=True, exist_ok=True)
+    with prof.phase("load"):
+        df = read_results(IN_CSV)
+
+    with prof.phase("evaluate"):
+        ev = evaluate(df)
+        write_summaries(ev)
+    if MAKE_PLOTS:
+        with prof.phase("plot"):
+            write_plots(ev, df)
+    else:
+        print("plots disabled (MAKE_PLOTS) - skipped comparison plots")
+    prof.save()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
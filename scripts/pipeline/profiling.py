@@ -0,0 +1,81 @@
+# Stage / phase timers: wall time, CPU time and peak RSS, written as JSON for run_pipeline
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+from config import PROFILE_DIR
+
+def peak_rss_mb(children: bool = False):
+    """
+    Peak resident set size of this process (or of its finished children) in MB, None if unknown
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource is not None:
+        who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+        rss = resource.getrusage(who).ru_maxrss
+        # bytes on macOS, kilobytes on Linux
+        return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+
+    if children:
+        return None
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1e6
+    except ImportError:
+        return None
+
+def children_cpu_s():
+    try:
+        import resource
+    except ImportError:
+        return None
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+class StageProfiler:
+    """
+    Collects named phases of one pipeline stage.
+
+    peak_rss_mb of a phase is the process high-water mark when the phase ends, so the
+    phase that raises it is the one that allocated the memory.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.phases = []
+        self._w0 = time.perf_counter()
+        self._c0 = time.process_time()
+
+    @contextmanager
+    def phase(self, name: str):
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                "phase": name,
+                "wall_s": time.perf_counter() - w0,
+                "cpu_s": time.process_time() - c0,
+                "peak_rss_mb": peak_rss_mb(),
+            })
+
+    def summary(self) -> dict:
+        return {
+            "stage": self.stage,
+            "wall_s": time.perf_counter() - self._w0,
+            "cpu_s": time.process_time() - self._c0,
+            "peak_rss_mb": peak_rss_mb(),
+            "phases": self.phases,
+        }
+
+    def save(self, out_dir=PROFILE_DIR):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{self.stage}.json"
+        path.write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+        return path
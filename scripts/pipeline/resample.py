@@ -0,0 +1,119 @@
+# Resampling of processed inputs to the configured time base (cached per resolution)
+import numpy as np
+
+from config import (
+    LOAD_CSV, PV_CSV,
+    DT_MIN, ALIGN_FILL_POLICY,
+    USE_INPUT_CACHE, CACHE_VALIDATION, CACHE_VALUE_DTYPE, PROCESSED_FORMAT,
+)
+from scripts.pipeline.align import align_series
+from scripts.pipeline.input_cache import cache_base, load_cached, lookup, source_fingerprint, write_arrays
+from scripts.pipeline.inputs import processed_path, read_processed
+
+# part of the resampled cache key: entries written by an older resample_to are rebuilt
+RESAMPLE_VERSION = 2
+
+def native_step_ns(ts_ns: np.ndarray) -> int:
+    """
+    Native sampling step of a sorted timestamp array (median spacing)
+    """
+    if len(ts_ns) < 2:
+        raise RuntimeError("need at least two samples to infer the native time step")
+    return int(np.median(np.diff(ts_ns)))
+
+def resample_to(ts_ns: np.ndarray, values: np.ndarray, dt_min: float):
+    """
+    Resample a power series (kW) onto an epoch-anchored dt_min grid.
+
+    Coarser target: mean power per target step (label = step start), which conserves
+    energy. Finer target: linear interpolation between samples; grid points inside
+    gaps longer than 1.5 native steps stay NaN so the alignment fill policy sees them.
+    Returns the inputs unchanged when they already are on the target grid.
+    Unsorted samples (e.g. read without the input cache) are sorted first.
+    """
+    if len(ts_ns) > 1 and (np.diff(ts_ns) < 0).any():
+        order = np.argsort(ts_ns, kind="stable")
+        ts_ns, values = np.asarray(ts_ns)[order], np.asarray(values)[order]
+
+    step = int(round(dt_min * 60 * 1e9))
+    native = native_step_ns(ts_ns)
+    if native == step and int(ts_ns[0]) % step == 0:
+        return ts_ns, values
+
+    ts_ns = np.asarray(ts_ns, dtype="int64")
+    values = np.asarray(values, dtype=float)
+    ok = ~np.isnan(values)
+
+    if step > native:
+        t0 = (int(ts_ns[0]) // step) * step
+        idx = (ts_ns - t0) // step
+        n = int(idx[-1]) + 1
+        counts = np.bincount(idx[ok], minlength=n)
+        sums = np.bincount(idx[ok], weights=values[ok], minlength=n)
+        out = np.full(n, np.nan)
+        has = counts > 0
+        out[has] = sums[has] / counts[has]
+        grid = t0 + step * np.arange(n, dtype="int64")
+        return grid, out
+
+    t_start = -((-int(ts_ns[0])) // step) * step
+    t_end = (int(ts_ns[-1]) // step) * step
+    grid = np.arange(t_start, t_end + 1, step, dtype="int64")
+
+    ts_ok = ts_ns[ok]
+    rel = (ts_ok - t_start).astype(float)
+    out = np.interp((grid - t_start).astype(float), rel, values[ok])
+
+    # no interpolation across gaps in the source: only grid points strictly between the two
+    # samples of a gap; a point on a sample (e.g. the first one after the gap) keeps its value
+    right = np.clip(np.searchsorted(ts_ok, grid, side="right"), 1, len(ts_ok) - 1)
+    span = ts_ok[right] - ts_ok[right - 1]
+    inside = (grid > ts_ok[right - 1]) & (grid < ts_ok[right])
+    out[inside & (span > 1.5 * native)] = np.nan
+    return grid, out
+
+def load_resampled(csv_path, column: str, dt_min: float, dtype: str = CACHE_VALUE_DTYPE, mode: str = CACHE_VALIDATION,
+                   fmt: str = PROCESSED_FORMAT):
+    """
+    Processed input column resampled to dt_min -> (int64 epoch-ns timestamps, values).
+
+    With USE_INPUT_CACHE the resampled arrays are cached per resolution next to the
+    native cache entry, so sweeps over DT_MIN resample every input only once.
+    """
+    if not USE_INPUT_CACHE:
+        df = read_processed(csv_path, fmt)
+        ts = df["timestamp"].to_numpy("datetime64[ns]").view("int64")
+        return resample_to(ts, df[column].to_numpy(dtype=float), dt_min)
+
+    src = processed_path(csv_path, fmt)
+    base = cache_base(src, column, tag=f"dt{dt_min:g}")
+    expect = {
+        "column": column,
+        "dt_min": float(dt_min),
+        "resample_version": RESAMPLE_VERSION,
+        "dtype": str(np.dtype(dtype)),
+        "source_fingerprint": source_fingerprint(src, mode),
+    }
+    hit = lookup(base, expect)
+    if hit is not None:
+        return hit
+
+    ts, vals = load_cached(csv_path, column, dtype, mode, fmt)
+    r_ts, r_vals = resample_to(ts, vals, dt_min)
+    if r_ts is ts:
+        return ts, vals
+
+    meta = {"source": str(src.resolve()), "column": column, "dt_min": float(dt_min),
+            "resample_version": RESAMPLE_VERSION, "source_fingerprint": expect["source_fingerprint"]}
+    return write_arrays(base, np.ascontiguousarray(r_ts), np.ascontiguousarray(r_vals.astype(dtype)), meta)
+
+def load_inputs(dt_min=DT_MIN, policy=ALIGN_FILL_POLICY, load_csv=LOAD_CSV, pv_csv=PV_CSV, fmt=PROCESSED_FORMAT):
+    """
+    Processed load / pv resampled to dt_min and aligned on one grid -> (timestamps, load_kw, pv_kw, report)
+    fmt: processed format of the input paths ("auto" = read every file by its own suffix)
+    """
+    load = load_resampled(load_csv, "load_kw", dt_min, fmt=fmt)
+    pv   = load_resampled(pv_csv, "pv_kw", dt_min, fmt=fmt)
+
+    ts, aligned, report = align_series({"load": load, "pv": pv}, dt_min=dt_min, policy=policy)
+    return ts, aligned["load"], aligned["pv"], report
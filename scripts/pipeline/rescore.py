@@ -0,0 +1,137 @@
+# Re-score the risk index for new weights from the stored components (no re-simulation)
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from config import SIM_DIR, DT_H, ALPHA, BETA, GAMMA
+
+SIM_CSV = SIM_DIR / "sim_results.csv"
+
+# risk_index = ALPHA * unserved + BETA * reserve_deficit_p + GAMMA * reserve_deficit_e
+COMPONENT_COLUMNS = ["unserved_kw", "reserve_deficit_p_kw", "reserve_deficit_e_kwh"]
+WEIGHT_NAMES = ["alpha", "beta", "gamma"]
+
+# weight vectors per matrix product (memory ~ steps x chunk x 8 bytes)
+WEIGHT_CHUNK = 64
+
+# exceedance levels of the stored risk curves (log-spaced)
+N_CURVE_POINTS = 200
+
+def load_components(path=SIM_CSV):
+    """
+    (timestamps, components (n, 3)) - only the weight-independent columns are read
+    """
+    df = pd.read_csv(path, usecols=["timestamp"] + COMPONENT_COLUMNS, parse_dates=["timestamp"])
+    df = df.sort_values("timestamp", kind="mergesort")
+    return df["timestamp"].to_numpy(), df[COMPONENT_COLUMNS].to_numpy(dtype=float)
+
+def parse_weights(specs) -> np.ndarray:
+    """
+    ["1,1,1", "2,1,0.5"] -> (k, 3) array of (alpha, beta, gamma)
+    """
+    rows = []
+    for spec in specs:
+        vals = [float(v) for v in str(spec).split(",")]
+        if len(vals) != 3:
+            raise ValueError(f"weight vector {spec!r} needs three values: alpha,beta,gamma")
+        rows.append(vals)
+    return np.array(rows, dtype=float).reshape(-1, 3)
+
+def weight_grid(alphas=(ALPHA,), betas=(BETA,), gammas=(GAMMA,)) -> np.ndarray:
+    return np.array(list(itertools.product(alphas, betas, gammas)), dtype=float)
+
+def rescore(components: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Risk index for every weight vector: (n, 3) @ (3, k) -> (n, k)
+    """
+    return components @ np.asarray(weights, dtype=float).reshape(-1, 3).T
+
+def _exceedance_levels(n: int) -> np.ndarray:
+    return np.unique(np.geomspace(1.0 / n, 1.0, N_CURVE_POINTS))
+
+def rescore_all(ts, components: np.ndarray, weights: np.ndarray, dt_h=DT_H, top_k: int = 5, chunk: int = WEIGHT_CHUNK):
+    """
+    Metrics, risk curves and top-risk events for every weight vector.
+
+    Returns (metrics DataFrame, curves DataFrame, top events DataFrame).
+    """
+    weights = np.asarray(weights, dtype=float).reshape(-1, 3)
+    n = len(components)
+    unserved = components[:, 0]
+
+    # weight-independent parts (same definition as sim_core)
+    base = {
+        "total_unserved_kwh": float((unserved * dt_h).sum()),
+        "pct_unserved_steps": float(100.0 * (unserved > 0).mean()),
+        "max_unserved_kw": float(unserved.max()),
+        "pct_risk_steps": float(100.0 * (components > 0).any(axis=1).mean()),
+    }
+
+    p_exc = _exceedance_levels(n)
+    metric_parts, curve_parts, event_parts = [], [], []
+    for a in range(0, len(weights), chunk):
+        w = weights[a:a + chunk]
+        risk = rescore(components, w)
+
+        m = pd.DataFrame(w, columns=WEIGHT_NAMES)
+        for k, v in base.items():
+            m[k] = v
+        m["max_risk_index"] = risk.max(axis=0)
+        m["mean_risk_index"] = risk.mean(axis=0)
+        m["p95_risk_index"] = np.quantile(risk, 0.95, axis=0)
+        m["p99_risk_index"] = np.quantile(risk, 0.99, axis=0)
+        metric_parts.append(m)
+
+        # exceedance curve P(risk > x) at fixed probability levels
+        q = np.quantile(risk, 1.0 - p_exc, axis=0)
+        for j in range(len(w)):
+            curve_parts.append(pd.DataFrame({
+                "alpha": w[j, 0], "beta": w[j, 1], "gamma": w[j, 2],
+                "exceedance": p_exc, "risk_index": q[:, j],
+            }))
+
+        # top-k steps by risk index per weight vector
+        kk = min(top_k, n)
+        top = np.argpartition(-risk, kk - 1, axis=0)[:kk]
+        top_val = np.take_along_axis(risk, top, axis=0)
+        order = np.argsort(-top_val, axis=0, kind="stable")
+        top = np.take_along_axis(top, order, axis=0)
+        for j in range(len(w)):
+            idx = top[:, j]
+            event_parts.append(pd.DataFrame({
+                "alpha": w[j, 0], "beta": w[j, 1], "gamma": w[j, 2],
+                "rank": np.arange(1, kk + 1),
+                "timestamp": ts[idx],
+                "risk_index": risk[idx, j],
+                "unserved_kw": components[idx, 0],
+                "reserve_deficit_p_kw": components[idx, 1],
+                "reserve_deficit_e_kwh": components[idx, 2],
+            }))
+        del risk
+
+    return (
+        pd.concat(metric_parts, ignore_index=True),
+        pd.concat(curve_parts, ignore_index=True),
+        pd.concat(event_parts, ignore_index=True),
+    )
+
+def plot_exceedance_by_weight(curves: pd.DataFrame, out_png, max_lines: int = 12):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 5))
+    groups = list(curves.groupby(WEIGHT_NAMES, sort=False))
+    for (a, b, g), c in groups[:max_lines]:
+        plt.plot(c["risk_index"], c["exceedance"], label=f"a={a:g} b={b:g} g={g:g}")
+    plt.yscale("log")
+    plt.xlabel("risk_index")
+    plt.ylabel("Exceedance  P(X > x)  (log scale)")
+    title = "Risk index exceedance by weight vector"
+    if len(groups) > max_lines:
+        title += f" (first {max_lines} of {len(groups)})"
+    plt.title(title)
+    plt.grid(True, alpha=0.3)
+    plt.legend(fontsize=8)
+    plt.tight_layout()
+    plt.savefig(out_png, dpi=200)
+    plt.close()
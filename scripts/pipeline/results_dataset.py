@@ -0,0 +1,190 @@
+# Results of all runs as one hive-partitioned parquet dataset (site / scenario / year) + filtered queries
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from config import RESULTS_DATASET
+from scripts.pipeline.sim_core import RESULT_COLUMNS
+from scripts.pipeline.summary_store import read_store, upsert
+
+# scenario parameters + metrics of every scenario in the dataset (summary store format);
+# the leading "_" keeps it out of the dataset scan
+SCENARIOS_FILE = "_scenarios.parquet"
+
+# one row group per ~6 weeks at 15 min, so time filters can skip row groups by their statistics
+ROW_GROUP_ROWS = 4096
+
+# comparison operators for scenario predicates, e.g. {"e_kwh": ("<", 400)}
+OPS = {
+    "==": lambda s, v: s == v, "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v, "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v, ">=": lambda s, v: s >= v,
+}
+
+def result_schema():
+    """
+    Fixed column set and types of every data file (multi-asset columns stay in sim_results.csv)
+    """
+    import pyarrow as pa
+
+    fields = [("timestamp", pa.timestamp("ms")), ("load_kw", pa.float64()), ("pv_kw", pa.float64()),
+              ("net_kw", pa.float64())]
+    fields += [(c, pa.bool_() if c == "risk_event" else pa.float64()) for c in RESULT_COLUMNS]
+    return pa.schema(fields)
+
+def partition_schema():
+    import pyarrow as pa
+
+    return pa.schema([("site", pa.string()), ("scenario", pa.string()), ("year", pa.int32())])
+
+def write_partitions(df: pd.DataFrame, site: str, scenario: str, path=RESULTS_DATASET) -> int:
+    """
+    Write one scenario's results frame under site=/scenario=/year=. Rewriting a scenario
+    replaces its partitions. Returns the number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    schema = result_schema()
+    table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+    n = len(df)
+    table = table.append_column("site", pa.array([str(site)] * n, pa.string()))
+    table = table.append_column("scenario", pa.array([str(scenario)] * n, pa.string()))
+    table = table.append_column("year", pa.array(df["timestamp"].dt.year.to_numpy(), pa.int32()))
+
+    ds.write_dataset(
+        table, str(path), format="parquet",
+        partitioning=ds.partitioning(partition_schema(), flavor="hive"),
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+        max_rows_per_group=ROW_GROUP_ROWS,
+    )
+    return n
+
+def add_scenarios(rows: list, path=RESULTS_DATASET):
+    """
+    Register scenario rows (make_row format) so queries can select scenarios by parameter
+    """
+    if rows:
+        Path(path).mkdir(parents=True, exist_ok=True)
+        upsert(rows, Path(path) / SCENARIOS_FILE)
+
+def scenario_ids(where: dict, path=RESULTS_DATASET) -> list:
+    """
+    Ids of the scenarios whose parameters / metrics match every predicate.
+    where: {column: value} or {column: (op, value)} with op in OPS
+    """
+    df = read_store(Path(path) / SCENARIOS_FILE)
+    if df.empty:
+        return []
+    mask = pd.Series(True, index=df.index)
+    for col, cond in where.items():
+        if col not in df.columns:
+            raise ValueError(f"unknown scenario column {col!r}")
+        op, value = cond if isinstance(cond, tuple) else ("==", cond)
+        if op not in OPS:
+            raise ValueError(f"unknown operator {op!r} (expected one of {list(OPS)})")
+        col_values = df[col].astype(object) if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col]
+        mask &= OPS[op](col_values, value)
+    return df.loc[mask, "scenario_id"].astype(str).tolist()
+
+def parse_where(text: str) -> tuple:
+    """
+    "e_kwh<400" -> ("e_kwh", ("<", 400.0)); non-numeric values stay strings
+    """
+    m = re.fullmatch(r"\s*(\w+)\s*(<=|>=|==|!=|<|>|=)\s*(.+?)\s*", text)
+    if m is None:
+        raise ValueError(f"cannot parse condition {text!r} (expected e.g. e_kwh<400 or policy=reactive)")
+    col, op, value = m.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        pass
+    return col, ("==" if op == "=" else op, value)
+
+def open_dataset(path=RESULTS_DATASET):
+    import pyarrow.dataset as ds
+
+    if not Path(path).exists():
+        raise FileNotFoundError(f"no results dataset at {path} - run the pipeline, a sweep or a fleet with the dataset on")
+    return ds.dataset(str(path), format="parquet", partitioning=ds.partitioning(partition_schema(), flavor="hive"),
+                      schema=_full_schema())
+
+def _full_schema():
+    import pyarrow as pa
+
+    return pa.schema(list(result_schema()) + list(partition_schema()))
+
+def _and(a, b):
+    return b if a is None else a & b
+
+def build_filter(where: dict = None, sites=None, scenarios=None, years=None, start=None, end=None,
+                 months=None, outages: bool = False, path=RESULTS_DATASET):
+    """
+    Dataset filter expression. Site / scenario / year (and `where`, resolved to scenario ids)
+    prune whole partitions. Time ranges become timestamp comparisons that skip row groups.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # value sets are typed explicitly: an empty list (no scenario matches `where`) would be a null array
+    expr = None
+    ids = None
+    if where:
+        ids = scenario_ids(where, path)
+    if scenarios is not None:
+        ids = [s for s in map(str, scenarios) if ids is None or s in ids]
+    if ids is not None:
+        expr = _and(expr, ds.field("scenario").isin(pa.array(ids, pa.string())))
+    if sites is not None:
+        expr = _and(expr, ds.field("site").isin(pa.array([str(s) for s in sites], pa.string())))
+    if years is not None:
+        expr = _and(expr, ds.field("year").isin(pa.array([int(y) for y in years], pa.int32())))
+
+    ts = ds.field("timestamp")
+    ms = pa.timestamp("ms")
+    if start is not None:
+        expr = _and(expr, ts >= pa.scalar(pd.Timestamp(start), ms))
+    if end is not None:
+        expr = _and(expr, ts < pa.scalar(pd.Timestamp(end), ms))
+    if months:
+        # one [month start, next month start) range per year present, instead of month(timestamp),
+        # so the row-group statistics still apply
+        present = years if years is not None else partition_years(open_dataset(path), expr)
+        rng = None
+        for y in sorted(present):
+            for m in sorted(set(int(m) for m in months)):
+                a = pd.Timestamp(year=int(y), month=m, day=1)
+                r = (ts >= pa.scalar(a, ms)) & (ts < pa.scalar(a + pd.offsets.MonthBegin(1), ms))
+                rng = r if rng is None else rng | r
+        expr = _and(expr, rng if rng is not None else ds.scalar(False))
+    if outages:
+        expr = _and(expr, ds.field("unserved_kw") > 0.0)
+    return expr
+
+def partition_years(dset, expr=None) -> set:
+    # year partitions of the files that survive the partition part of `expr`
+    return {int(m.group(1)) for f in dset.get_fragments(filter=expr) if (m := re.search(r"year=(\d+)", f.path))}
+
+def query_results(where: dict = None, sites=None, scenarios=None, years=None, start=None, end=None, months=None,
+                  outages: bool = False, columns=None, path=RESULTS_DATASET) -> pd.DataFrame:
+    """
+    Rows of the results dataset across runs, e.g. all outage steps in January of the scenarios
+    with E < 400 kWh:  query_results({"e_kwh": ("<", 400)}, months=[1], outages=True)
+    Only matching partitions are opened; within a file, row groups outside the time range are skipped.
+    """
+    dset = open_dataset(path)
+    expr = build_filter(where, sites, scenarios, years, start, end, months, outages, path)
+    if columns is not None:
+        columns = list(dict.fromkeys(["site", "scenario", "year", "timestamp"] + list(columns)))
+    table = dset.to_table(columns=columns, filter=expr)
+    return table.to_pandas()
+
+def scan_stats(where: dict = None, sites=None, scenarios=None, years=None, path=RESULTS_DATASET) -> tuple:
+    """
+    (files a query has to open, files in the dataset) - shows the partition pruning
+    """
+    dset = open_dataset(path)
+    expr = build_filter(where, sites, scenarios, years, path=path)
+    return len(list(dset.get_fragments(filter=expr))), len(dset.files)
@@ -0,0 +1,57 @@
+# Result frames in memory: optional compact dtypes and a shared loader for sim_results.csv
+import numpy as np
+import pandas as pd
+
+from config import SIM_DIR, COMPACT_RESULTS
+
+RESULTS_CSV = SIM_DIR / "sim_results.csv"
+
+# boolean flags (1 byte per step); every other non-timestamp column is a value column
+FLAG_COLUMNS = ("risk_event",)
+
+def compact_column(name: str, values):
+    """
+    One result column in compact dtype: float32 values, bool flags, categorical labels
+    """
+    values = np.asarray(values)
+    if name in FLAG_COLUMNS:
+        return values.astype(bool, copy=False)
+    if values.dtype.kind == "f":
+        return values.astype(np.float32, copy=False)
+    if values.dtype.kind in "OU":
+        return pd.Categorical(values)
+    return values
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast an existing results frame in place (float64 -> float32, flags -> bool, labels -> category)
+    """
+    for c in df.columns:
+        if c != "timestamp" and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = compact_column(c, df[c].to_numpy())
+    return df
+
+def read_results(path=RESULTS_CSV, columns=None, compact: bool = COMPACT_RESULTS) -> pd.DataFrame:
+    """
+    sim_results.csv -> frame sorted by timestamp with a 0..n-1 index.
+    compact: value columns are parsed straight into float32 (no float64 frame in between).
+    A file that is already in time order (the normal case) is not sorted or copied again.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in header if columns is None or c in columns or c == "timestamp"]
+    dtype = {c: bool for c in FLAG_COLUMNS if c in usecols}
+    if compact:
+        dtype.update({c: np.float32 for c in usecols if c != "timestamp" and c not in dtype})
+    df = pd.read_csv(path, usecols=usecols, dtype=dtype, parse_dates=["timestamp"])
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp", kind="stable", ignore_index=True)
+    return df
+
+def window(df: pd.DataFrame, start, end) -> pd.DataFrame:
+    """
+    Rows with start <= timestamp < end of a time-sorted frame as a positional slice
+    (no boolean mask, no copy of the columns)
+    """
+    ts = df["timestamp"].to_numpy()
+    a, b = np.searchsorted(ts, [np.datetime64(pd.Timestamp(start)), np.datetime64(pd.Timestamp(end))])
+    return df.iloc[a:b]
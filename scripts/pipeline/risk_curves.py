@@ -1,18 +1,17 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from config import SIM_DIR, RISK_DIR
+from config import RISK_DIR, MAKE_PLOTS
+from scripts.pipeline.profiling import StageProfiler
+from scripts.pipeline.results_io import RESULTS_CSV, read_results
 
 # Paths
-RISK_DIR.mkdir(parents=True, exist_ok=True)
-IN_CSV = SIM_DIR / "sim_results.csv"
-
-# Data
-df = pd.read_csv(IN_CSV, parse_dates=["timestamp"]).sort_values("timestamp")
+IN_CSV = RESULTS_CSV
 
 # Helpers
 def plot_cdf(series, title, out_png):
+    import matplotlib.pyplot as plt
+
     x = series.dropna().to_numpy()
     x = np.sort(x)
     y = np.arange(1, len(x) + 1) / len(x)
@@ -27,6 +26,8 @@ def plot_cdf(series, title, out_png):
     plt.close()
 
 def plot_exceedance(series, title, out_png):
+    import matplotlib.pyplot as plt
+
     x = series.dropna().to_numpy()
     x = np.sort(x)
     y = 1.0 - (np.arange(1, len(x) + 1) / len(x))
@@ -42,14 +43,32 @@ def plot_exceedance(series, title, out_png):
     plt.close()
 
 # Risk curves
-plot_cdf(df["risk_index"], "Risk index CDF", RISK_DIR / "risk_index_cdf.png")
-plot_exceedance(df["risk_index"], "Risk index exceedance", RISK_DIR / "risk_index_exceedance.png")
+def make_risk_curves(df: pd.DataFrame, out_dir=RISK_DIR):
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    plot_cdf(df["risk_index"], "Risk index CDF", out_dir / "risk_index_cdf.png")
+    plot_exceedance(df["risk_index"], "Risk index exceedance", out_dir / "risk_index_exceedance.png")
+
+    plot_cdf(df["unserved_kw"], "Unserved power CDF", out_dir / "unserved_cdf.png")
+    plot_exceedance(df["unserved_kw"], "Unserved power exceedance", out_dir / "unserved_exceedance.png")
+
+def main():
+    if not MAKE_PLOTS:
+        print("plots disabled (MAKE_PLOTS) - risk curves skipped")
+        return
+
+    prof = StageProfiler("risk_curves")
+    with prof.phase("load"):
+        df = read_results(IN_CSV, columns=["unserved_kw", "risk_index"])
+    with prof.phase("plot"):
+        make_risk_curves(df)
+    prof.save()
 
-plot_cdf(df["unserved_kw"], "Unserved power CDF", RISK_DIR / "unserved_cdf.png")
-plot_exceedance(df["unserved_kw"], "Unserved power exceedance", RISK_DIR / "unserved_exceedance.png")
+    print("Saved risk curves in:", RISK_DIR)
+    print(" - risk_index_cdf.png")
+    print(" - risk_index_exceedance.png")
+    print(" - unserved_cdf.png")
+    print(" - unserved_exceedance.png")
 
-print("Saved risk curves in:", RISK_DIR)
-print(" - risk_index_cdf.png")
-print(" - risk_index_exceedance.png")
-print(" - unserved_cdf.png")
-print(" - unserved_exceedance.png")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# Run one pipeline stage with config values changed for this run only (runners/run_pipeline.py)
+# usage: python -m scripts.pipeline.run_stage <stage module> ['{"MAKE_PLOTS": false}']
+import json
+import runpy
+import sys
+
+import config
+
+def apply_overrides(overrides: dict):
+    """
+    Set config constants before the stage imports them (the stages use `from config import ...`)
+    """
+    for name, value in overrides.items():
+        if not hasattr(config, name):
+            raise ValueError(f"unknown config setting {name!r}")
+        setattr(config, name, value)
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        raise SystemExit("usage: python -m scripts.pipeline.run_stage <module> [json overrides]")
+    module = sys.argv[1]
+    apply_overrides(json.loads(sys.argv[2]) if len(sys.argv) > 2 else {})
+    sys.argv = [module]
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,28 @@
+import hashlib
+import json
+
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import roc_auc_score, average_precision_score, classification_report
-import shap
+# sklearn / shap / matplotlib are imported where they are needed: a run with cached
+# explanations and plots disabled never loads shap or matplotlib
 
-from config import SIM_DIR, XAI_DIR, H_STEPS
+from config import XAI_DIR, H_STEPS, MAKE_PLOTS
+from scripts.pipeline.profiling import StageProfiler
+from scripts.pipeline.results_io import RESULTS_CSV, read_results
 
 # Paths
-XAI_DIR.mkdir(parents=True, exist_ok=True)
-
-IN_CSV = SIM_DIR / "sim_results.csv"
+IN_CSV = RESULTS_CSV
 METRICS_TXT = XAI_DIR / "model_metrics.txt"
-OUT_SHAP_BAR = XAI_DIR / "shap_summary_bar.png"
-OUT_SHAP_BEE = XAI_DIR / "shap_beeswarm.png"
-
-# Load data
-df = (
-    pd.read_csv(IN_CSV, parse_dates=["timestamp"])
-      .sort_values("timestamp")
-      .reset_index(drop=True)
-)
-
-# Early warning target
-risk_event = df["risk_event"].astype(int).to_numpy()
-y_next = np.zeros(len(df), dtype=int)
-
-for i in range(len(df)):
-    y_next[i] = int(risk_event[i:min(len(df), i + H_STEPS)].max())
-
-df["risk_next_H"] = y_next
+TOP_DRIVERS_TXT = XAI_DIR / "top_drivers.txt"
+OUT_SHAP_BAR = XAI_DIR / "fig5_shap_importance_horizontal.png"
+OUT_SHAP_BEE = XAI_DIR / "shap_beeswarm_wide.png"
+SHAP_CACHE = XAI_DIR / "shap_cache.npz"
+# explanation key the SHAP figures were drawn from
+SHAP_FIG_KEY = XAI_DIR / "shap_figures.key"
 
 # Features
-feature_cols = [
+FEATURE_COLS = [
     "load_kw", "pv_kw", "net_kw",
     "soc_pre",
     "p_req_kw", "e_req_kwh",
@@ -41,59 +30,7 @@ feature_cols = [
     "reserve_deficit_p_kw", "reserve_deficit_e_kwh",
 ]
 
-feature_cols = [c for c in feature_cols if c in df.columns]
-
-X = df[feature_cols].replace([np.inf, -np.inf], np.nan).fillna(0.0)
-y = df["risk_next_H"].astype(int)
-
-split = int(0.7 * len(df))
-X_train, X_test = X.iloc[:split], X.iloc[split:]
-y_train, y_test = y.iloc[:split], y.iloc[split:]
-
-# Train model
-clf = RandomForestClassifier(
-    n_estimators=300,
-    max_depth=8,
-    random_state=42,
-    n_jobs=-1,
-    class_weight="balanced",
-)
-clf.fit(X_train, y_train)
-
-proba = clf.predict_proba(X_test)[:, 1]
-auc = roc_auc_score(y_test, proba)
-ap = average_precision_score(y_test, proba)
-report = classification_report(y_test, (proba >= 0.5).astype(int))
-
-# Save + print model metrics
-with open(METRICS_TXT, "w", encoding="utf-8") as f:
-    f.write("Early-warning model (predict risk within next H steps)\n")
-    f.write(f"H_STEPS: {H_STEPS}\n")
-    f.write(f"AUC: {auc:.3f}\n")
-    f.write(f"AP : {ap:.3f}\n\n")
-    f.write(report)
-
-print("Early-warning model (predict risk within next H steps)")
-print(f"H_STEPS: {H_STEPS}")
-print(f"AUC: {auc:.3f}")
-print(f"AP : {ap:.3f}")
-print(report)
-
-# SHAP
-explainer = shap.TreeExplainer(clf)
-
-X_explain = X_test.iloc[:5000]
-
-shap_out = explainer.shap_values(X_explain)
-
-if isinstance(shap_out, list):
-    sv = shap_out[1]
-else:
-    sv = shap_out.values if hasattr(shap_out, "values") else shap_out
-    if sv.ndim == 3:
-        sv = sv[:, :, 1]
-
-feature_labels = {
+FEATURE_LABELS = {
     "load_kw": "Load",
     "pv_kw": "PV",
     "net_kw": "Net deficit",
@@ -106,50 +43,218 @@ feature_labels = {
     "reserve_deficit_e_kwh": "Reserve energy deficit",
 }
 
-# horizontal view
-OUT_SHAP_BAR = XAI_DIR / "fig5_shap_importance_horizontal.png"
-TOP_N = 8 
+TOP_N = 8
+N_EXPLAIN = 5000
+
+RF_PARAMS = {
+    "n_estimators": 300,
+    "max_depth": 8,
+    "random_state": 42,
+    "n_jobs": -1,
+    "class_weight": "balanced",
+}
 
-mean_abs = np.abs(sv).mean(axis=0)
-imp = (
-    pd.Series(mean_abs, index=X_explain.columns)
-      .sort_values(ascending=True)
-      .tail(TOP_N)
-)
+# Early warning target
+def label_risk_next_h(risk_event: np.ndarray, h_steps: int = H_STEPS) -> np.ndarray:
+    n = len(risk_event)
+    y_next = np.zeros(n, dtype=int)
 
-imp.index = [feature_labels.get(c, c) for c in imp.index]
+    for i in range(n):
+        y_next[i] = int(risk_event[i:min(n, i + h_steps)].max())
+    return y_next
 
-# save top drivers
-TOP_DRIVERS_TXT = XAI_DIR / "top_drivers.txt"
-top_drivers = list(imp.index)[::-1]
-with open(TOP_DRIVERS_TXT, "w", encoding="utf-8") as f:
-    for name in top_drivers[:5]:
-        f.write(f"{name}\n")
+def build_dataset(df: pd.DataFrame, h_steps: int = H_STEPS):
+    y = pd.Series(label_risk_next_h(df["risk_event"].astype(int).to_numpy(), h_steps), name="risk_next_H")
 
-print("Saved top drivers:", TOP_DRIVERS_TXT)
+    feature_cols = [c for c in FEATURE_COLS if c in df.columns]
+    X = df[feature_cols]
+    # replace / fillna copy the whole feature matrix twice; only needed when something is not finite
+    if not np.isfinite(X.to_numpy()).all():
+        X = X.replace([np.inf, -np.inf], np.nan).fillna(0.0)
 
-plt.figure(figsize=(9.0, 3.2))
-plt.barh(imp.index, imp.values)
-plt.xlabel("mean SHAP values")
-plt.title("Primary drivers of predicted short-term risk (SHAP)")
-plt.tight_layout()
-plt.savefig(OUT_SHAP_BAR, dpi=600, bbox_inches="tight")
-plt.close()
+    split = int(0.7 * len(df))
+    return X.iloc[:split], X.iloc[split:], y.iloc[:split], y.iloc[split:]
 
-print("Saved compact SHAP figure:", OUT_SHAP_BAR)
+# Train model
+def train_model(X_train, y_train):
+    from sklearn.ensemble import RandomForestClassifier
 
-# Beeswarm plot
-OUT_SHAP_BEE = XAI_DIR / "shap_beeswarm_wide.png"
-plt.figure(figsize=(9.0, 3.2))
-shap.summary_plot(
-    sv,
-    X_explain,
-    max_display=TOP_N,
-    show=False,
-    feature_names=[feature_labels.get(c, c) for c in X_explain.columns],
-)
-plt.tight_layout()
-plt.savefig(OUT_SHAP_BEE, dpi=400, bbox_inches="tight")
-plt.close()
-
-print("Saved beeswarm:", OUT_SHAP_BEE)
\ No newline at end of file
+    clf = RandomForestClassifier(**RF_PARAMS)
+    clf.fit(X_train, y_train)
+    return clf
+
+def evaluate_model(clf, X_test, y_test):
+    from sklearn.metrics import roc_auc_score, average_precision_score, classification_report
+
+    proba = clf.predict_proba(X_test)[:, 1]
+    auc = roc_auc_score(y_test, proba)
+    ap = average_precision_score(y_test, proba)
+    report = classification_report(y_test, (proba >= 0.5).astype(int))
+    return auc, ap, report
+
+def write_model_metrics(auc, ap, report, h_steps: int = H_STEPS, out_txt=METRICS_TXT):
+    with open(out_txt, "w", encoding="utf-8") as f:
+        f.write("Early-warning model (predict risk within next H steps)\n")
+        f.write(f"H_STEPS: {h_steps}\n")
+        f.write(f"AUC: {auc:.3f}\n")
+        f.write(f"AP : {ap:.3f}\n\n")
+        f.write(report)
+
+# SHAP
+def explain(clf, X_explain) -> np.ndarray:
+    import shap
+
+    explainer = shap.TreeExplainer(clf)
+    shap_out = explainer.shap_values(X_explain)
+
+    if isinstance(shap_out, list):
+        sv = shap_out[1]
+    else:
+        sv = shap_out.values if hasattr(shap_out, "values") else shap_out
+        if sv.ndim == 3:
+            sv = sv[:, :, 1]
+    return sv
+
+def top_features(sv, X_explain, top_n: int = TOP_N) -> pd.Series:
+    mean_abs = np.abs(sv).mean(axis=0)
+    imp = (
+        pd.Series(mean_abs, index=X_explain.columns)
+          .sort_values(ascending=True)
+          .tail(top_n)
+    )
+    imp.index = [FEATURE_LABELS.get(c, c) for c in imp.index]
+    return imp
+
+def explanation_key(X_train, y_train, X_explain) -> str:
+    """
+    Fingerprint of everything the explanation depends on (data + model settings)
+    """
+    h = hashlib.sha1()
+    h.update(json.dumps({"rf": RF_PARAMS, "cols": list(X_explain.columns)}, sort_keys=True).encode("utf-8"))
+    for arr in (X_train.to_numpy(), y_train.to_numpy(), X_explain.to_numpy()):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+def load_cached_explanation(key: str, path=SHAP_CACHE):
+    if not path.exists():
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        if str(z["key"]) != key:
+            return None
+        return z["sv"]
+
+def save_cached_explanation(key: str, sv, path=SHAP_CACHE):
+    np.savez_compressed(path, key=np.array(key), sv=np.asarray(sv))
+
+def figures_current(key: str, path=SHAP_FIG_KEY) -> bool:
+    """
+    True if both SHAP figures exist and were drawn from the explanation with this key
+    (a --no-plots run on other data refreshes the cache but not the figures)
+    """
+    return (OUT_SHAP_BAR.exists() and OUT_SHAP_BEE.exists() and path.exists()
+            and path.read_text(encoding="utf-8").strip() == key)
+
+def write_top_drivers(sv, X_explain, out_dir=XAI_DIR):
+    imp = top_features(sv, X_explain)
+
+    # save top drivers
+    top_drivers = list(imp.index)[::-1]
+    with open(out_dir / TOP_DRIVERS_TXT.name, "w", encoding="utf-8") as f:
+        for name in top_drivers[:5]:
+            f.write(f"{name}\n")
+
+    print("Saved top drivers:", out_dir / TOP_DRIVERS_TXT.name)
+    return imp
+
+def write_shap_outputs(sv, X_explain, out_dir=XAI_DIR):
+    import matplotlib.pyplot as plt
+    import shap
+
+    # horizontal view
+    imp = write_top_drivers(sv, X_explain, out_dir)
+
+    plt.figure(figsize=(9.0, 3.2))
+    plt.barh(imp.index, imp.values)
+    plt.xlabel("mean SHAP values")
+    plt.title("Primary drivers of predicted short-term risk (SHAP)")
+    plt.tight_layout()
+    plt.savefig(out_dir / OUT_SHAP_BAR.name, dpi=600, bbox_inches="tight")
+    plt.close()
+
+    print("Saved compact SHAP figure:", out_dir / OUT_SHAP_BAR.name)
+
+    # Beeswarm plot
+    plt.figure(figsize=(9.0, 3.2))
+    shap.summary_plot(
+        sv,
+        X_explain,
+        max_display=TOP_N,
+        show=False,
+        feature_names=[FEATURE_LABELS.get(c, c) for c in X_explain.columns],
+    )
+    plt.tight_layout()
+    plt.savefig(out_dir / OUT_SHAP_BEE.name, dpi=400, bbox_inches="tight")
+    plt.close()
+
+    print("Saved beeswarm:", out_dir / OUT_SHAP_BEE.name)
+
+def main():
+    prof = StageProfiler("shap_explain")
+    XAI_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Load data
+    with prof.phase("load"):
+        df = read_results(IN_CSV)
+
+    with prof.phase("label"):
+        X_train, X_test, y_train, y_test = build_dataset(df)
+    with prof.phase("fit"):
+        clf = train_model(X_train, y_train)
+        auc, ap, report = evaluate_model(clf, X_test, y_test)
+
+    # Save + print model metrics
+    write_model_metrics(auc, ap, report)
+
+    # flat-array copy of the forest for live scoring (forest.py), checked against sklearn
+    with prof.phase("export"):
+        from scripts.pipeline.forest import FOREST_NPZ, export_forest, parity_error
+
+        flat = export_forest(clf)
+        flat.save(FOREST_NPZ)
+        err = parity_error(clf, flat, X_test)
+        print(f"Saved flat forest: {FOREST_NPZ} ({flat.n_trees} trees, {len(flat.feature)} nodes, "
+              f"max |p - sklearn| = {err:.1e})")
+        if err > 1e-9:
+            raise RuntimeError(f"flat forest does not match sklearn (max abs diff {err:.3g})")
+
+    print("Early-warning model (predict risk within next H steps)")
+    print(f"H_STEPS: {H_STEPS}")
+    print(f"AUC: {auc:.3f}")
+    print(f"AP : {ap:.3f}")
+    print(report)
+
+    X_explain = X_test.iloc[:N_EXPLAIN]
+    with prof.phase("explain"):
+        key = explanation_key(X_train, y_train, X_explain)
+        sv = load_cached_explanation(key)
+        cached = sv is not None
+        if cached:
+            print(f"Using cached SHAP values: {SHAP_CACHE}")
+        else:
+            sv = explain(clf, X_explain)
+            save_cached_explanation(key, sv)
+
+    with prof.phase("plot"):
+        if not MAKE_PLOTS:
+            write_top_drivers(sv, X_explain)
+            print("plots disabled (MAKE_PLOTS) - skipped SHAP figures")
+        elif figures_current(key):
+            write_top_drivers(sv, X_explain)
+            print("SHAP figures up to date")
+        else:
+            write_shap_outputs(sv, X_explain)
+            SHAP_FIG_KEY.write_text(key, encoding="utf-8")
+    prof.save()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+# Microgrid simulation core (reactive / look-ahead BESS dispatch + reserve feasibility + risk index)
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from config import (
+    DT_H, H_STEPS,
+    E_KWH, P_MAX_KW, SOC_MIN, SOC_MAX, SOC0, ETA_CH, ETA_DIS,
+    ALPHA, BETA, GAMMA,
+    DISPATCH_POLICY,
+    CHECKPOINT_CHUNK_STEPS,
+)
+
+DISPATCH_POLICIES = ("reactive", "lookahead")
+
+RESULT_COLUMNS = [
+    "soc_pre", "soc", "batt_p_kw", "unserved_kw",
+    "p_req_kw", "e_req_kwh", "p_dis_feasible_kw", "e_dis_avail_kwh",
+    "reserve_deficit_p_kw", "reserve_deficit_e_kwh",
+    "risk_event", "risk_index",
+]
+
+def dispatch_reactive(net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis, stats: dict = None):
+    """
+    Reactive BESS action: discharge to cover net_kw now, charge from surplus.
+
+    While SoC sits exactly at a limit, the outcome of a step only depends on the sign of
+    net_kw: at soc_min with net >= 0 nothing is discharged (unserved = net), at soc_max with
+    net <= 0 nothing is charged. Such segments are filled in one array operation up to the
+    next step that can move the battery off the limit; all other steps run one by one.
+    The result is identical to stepping through every step.
+    stats: dict that gets "steps" and "fast_forward_steps" (steps filled in closed form).
+
+    Returns (soc_pre, soc, batt_p_kw, unserved_kw) arrays.
+    """
+    net = np.asarray(net, dtype=float)
+    n = len(net)
+    soc_pre_out = np.empty(n)
+    soc_out = np.empty(n)
+    batt_out = np.zeros(n)
+    unserved_out = np.zeros(n)
+
+    # steps that can move the battery off soc_min (net < 0) / off soc_max (net > 0); NaN counts too
+    leave_min = np.flatnonzero(~(net >= 0.0))
+    leave_max = np.flatnonzero(~(net <= 0.0))
+    net_list = net.tolist()
+    fast = 0
+
+    soc = float(soc0)
+    i = 0
+    while i < n:
+        if soc == soc_min or soc == soc_max:
+            leave = leave_min if soc == soc_min else leave_max
+            k = np.searchsorted(leave, i)
+            j = int(leave[k]) if k < len(leave) else n
+            if j > i:
+                seg = net[i:j]
+                soc_pre_out[i:j] = soc
+                soc_out[i:j] = soc
+                if soc == soc_min:
+                    unserved_out[i:j] = np.where(seg > 0.0, seg, 0.0)
+                else:
+                    batt_out[i:j] = np.where(seg < 0.0, -0.0, 0.0)  # -min(-net, 0.0) in the loop below
+                fast += j - i
+                i = j
+                if i == n:
+                    break
+
+        # one step at a time until the battery reaches a limit
+        for i in range(i, n):
+            net_kw = net_list[i]
+            soc_pre_out[i] = soc
+
+            # Feasible power this step
+            e_avail_dis = max(0.0, (soc - soc_min) * e_kwh)
+            e_avail_chg = max(0.0, (soc_max - soc) * e_kwh)
+            p_dis_feasible = min(p_max_kw, e_avail_dis / dt_h)
+            p_chg_feasible = min(p_max_kw, e_avail_chg / dt_h)
+
+            batt_p = 0.0
+            if net_kw > 0.0:
+                batt_p = min(net_kw, p_dis_feasible)
+                soc -= (batt_p * dt_h) / (eta_dis * e_kwh)
+                unserved_out[i] = max(0.0, net_kw - batt_p)
+
+            elif net_kw < 0.0:
+                batt_p = -min(-net_kw, p_chg_feasible)
+                soc += (-batt_p * dt_h * eta_ch) / e_kwh
+
+            soc = min(soc_max, max(soc_min, soc))
+
+            soc_out[i] = soc
+            batt_out[i] = batt_p
+            if soc == soc_min or soc == soc_max:
+                break
+        i += 1
+
+    if stats is not None:
+        stats["steps"] = stats.get("steps", 0) + n
+        stats["fast_forward_steps"] = stats.get("fast_forward_steps", 0) + fast
+    return soc_pre_out, soc_out, batt_out, unserved_out
+
+DISPATCH_OUTPUTS = ("soc_pre", "soc", "batt_p_kw", "unserved_kw")
+
+def _save_atomic(path: Path, **arrays):
+    tmp = path.with_name(path.stem + f".tmp{os.getpid()}.npz")
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+def dispatch_reactive_chunked(net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis,
+                              checkpoint, chunk_steps=CHECKPOINT_CHUNK_STEPS, stats: dict = None):
+    """
+    dispatch_reactive in chunks of chunk_steps. After every chunk its outputs go to one part
+    file (<checkpoint stem>_parts/<first step>.npz) and the state to continue from (steps done,
+    SoC) to the small `checkpoint` npz, so the writes per chunk do not grow with the run.
+    A rerun with the same inputs and parameters reads the parts back and continues after the
+    last saved chunk. SoC is the only state carried from step to step, so the result is
+    identical to one uninterrupted run. A finished run deletes the checkpoint and its parts.
+    stats: as in dispatch_reactive (steps run by this call).
+    """
+    net = np.asarray(net, dtype=float)
+    n = len(net)
+    args = [float(v) for v in (dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis)]
+    key = hashlib.sha1(net.tobytes() + json.dumps(args).encode("utf-8")).hexdigest()
+    checkpoint = Path(checkpoint)
+    parts_dir = checkpoint.with_name(checkpoint.stem + "_parts")
+
+    outs = [np.empty(n) for _ in DISPATCH_OUTPUTS]
+    done, soc = 0, float(soc0)
+    if checkpoint.exists():
+        with np.load(checkpoint, allow_pickle=False) as z:
+            # a checkpoint of other inputs / parameters (or of the older single-file format) is ignored
+            if str(z["key"]) == key and "soc" in z.files:
+                done, soc = int(z["done"]), float(z["soc"])
+        # parts are written before the state, so every step below `done` has one
+        a = 0
+        try:
+            while a < done:
+                with np.load(parts_dir / f"{a:012d}.npz", allow_pickle=False) as z:
+                    m = len(z[DISPATCH_OUTPUTS[0]])
+                    for o, k in zip(outs, DISPATCH_OUTPUTS):
+                        o[a:a + m] = z[k]
+                a += m
+        except FileNotFoundError:
+            print(f"checkpoint parts missing in {parts_dir} - starting over")
+            done, soc = 0, float(soc0)
+        if done:
+            print(f"resuming simulation at step {done}/{n} from {checkpoint}")
+    if not done:
+        # parts of an earlier run must not be mixed into this one
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    while done < n:
+        b = min(n, done + max(1, int(chunk_steps)))
+        part = dispatch_reactive(net[done:b], dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc, eta_ch, eta_dis, stats)
+        for o, p in zip(outs, part):
+            o[done:b] = p
+        _save_atomic(parts_dir / f"{done:012d}.npz", **dict(zip(DISPATCH_OUTPUTS, part)))
+        done, soc = b, float(outs[1][b - 1])
+        _save_atomic(checkpoint, key=np.array(key), done=np.array(done), soc=np.array(soc))
+
+    # the result is complete in memory; a kept checkpoint would only be a second copy on disk
+    checkpoint.unlink(missing_ok=True)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    return tuple(outs)
+
+def dispatch_reactive_batch(net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis, stats: dict = None):
+    """
+    dispatch_reactive for m scenarios at once (e_kwh / p_max_kw: arrays of length m).
+    Same arithmetic per scenario, so every column equals the scalar run. Segments where
+    every scenario sits at the same SoC limit are filled in closed form (see dispatch_reactive).
+
+    Returns (soc_pre, soc, batt_p_kw, unserved_kw) arrays of shape (n, m).
+    """
+    net = np.asarray(net, dtype=float)
+    e_kwh = np.atleast_1d(np.asarray(e_kwh, dtype=float))
+    p_max_kw = np.atleast_1d(np.asarray(p_max_kw, dtype=float))
+    e_kwh, p_max_kw = np.broadcast_arrays(e_kwh, p_max_kw)
+    n, m = len(net), len(e_kwh)
+
+    soc_pre_out = np.empty((n, m))
+    soc_out = np.empty((n, m))
+    batt_out = np.zeros((n, m))
+    unserved_out = np.zeros((n, m))
+
+    leave_min = np.flatnonzero(~(net >= 0.0))
+    leave_max = np.flatnonzero(~(net <= 0.0))
+    net_list = net.tolist()
+    fast = 0
+
+    def at_limit(soc):
+        # soc_min / soc_max when every scenario sits at it, else None (first element short-circuits)
+        if soc[0] == soc_min and soc.max() == soc_min:
+            return soc_min
+        if soc[0] == soc_max and soc.min() == soc_max:
+            return soc_max
+        return None
+
+    dis_scale = eta_dis * e_kwh
+    soc = np.full(m, float(soc0))
+    i = 0
+    while i < n:
+        limit = at_limit(soc)
+        if limit is not None:
+            leave = leave_min if limit == soc_min else leave_max
+            k = np.searchsorted(leave, i)
+            j = int(leave[k]) if k < len(leave) else n
+            if j > i:
+                seg = net[i:j]
+                soc_pre_out[i:j] = soc
+                soc_out[i:j] = soc
+                if limit == soc_min:
+                    unserved_out[i:j] = np.where(seg > 0.0, seg, 0.0)[:, None]
+                else:
+                    batt_out[i:j] = np.where(seg < 0.0, -0.0, 0.0)[:, None]
+                fast += j - i
+                i = j
+                if i == n:
+                    break
+
+        for i in range(i, n):
+            net_kw = net_list[i]
+            soc_pre_out[i] = soc
+
+            if net_kw > 0.0:
+                e_avail_dis = np.maximum(0.0, (soc - soc_min) * e_kwh)
+                batt_p = np.minimum(net_kw, np.minimum(p_max_kw, e_avail_dis / dt_h))
+                soc = soc - (batt_p * dt_h) / dis_scale
+                unserved_out[i] = np.maximum(0.0, net_kw - batt_p)
+                batt_out[i] = batt_p
+
+            elif net_kw < 0.0:
+                e_avail_chg = np.maximum(0.0, (soc_max - soc) * e_kwh)
+                batt_p = -np.minimum(-net_kw, np.minimum(p_max_kw, e_avail_chg / dt_h))
+                soc = soc + (-batt_p * dt_h * eta_ch) / e_kwh
+                batt_out[i] = batt_p
+
+            soc = np.minimum(soc_max, np.maximum(soc_min, soc))
+            soc_out[i] = soc
+            if at_limit(soc) is not None:
+                break
+        i += 1
+
+    if stats is not None:
+        stats["steps"] = stats.get("steps", 0) + n
+        stats["fast_forward_steps"] = stats.get("fast_forward_steps", 0) + fast
+    return soc_pre_out, soc_out, batt_out, unserved_out
+
+def reserve_and_risk(net, soc_pre, unserved, dt_h, h_steps, e_kwh, p_max_kw, soc_min, alpha, beta, gamma,
+                     steps_left=None):
+    """
+    Reserve feasibility over the horizon + risk proxy, vectorized over all steps.
+
+    Forecast is persistence (net_hat = net now over the next h_eff steps), so the
+    horizon max / sum have a closed form. With (n, m) batch arrays net is (n,) and
+    the scenario parameters broadcast over the columns.
+    steps_left: steps to the end of the whole series (chunks of a longer run), default n - i.
+    """
+    if np.ndim(soc_pre) == 2:
+        net = np.asarray(net)[:, None]
+    e_avail_dis = np.maximum(0.0, (soc_pre - soc_min) * e_kwh)
+    p_dis_feasible = np.minimum(p_max_kw, e_avail_dis / dt_h)
+    return risk_from_reserve(net, unserved, e_avail_dis, p_dis_feasible, dt_h, h_steps, alpha, beta, gamma, steps_left)
+
+def risk_from_reserve(net, unserved, e_avail_dis, p_dis_feasible, dt_h, h_steps, alpha, beta, gamma, steps_left=None):
+    """
+    Reserve deficits + risk proxy from the dispatchable energy / power at each step
+    (shared by the single-BESS and the multi-asset model)
+    """
+    n = len(net)
+    if steps_left is None:
+        steps_left = n - np.arange(n)
+    h_eff = np.minimum(h_steps, steps_left).reshape((n,) + (1,) * (np.ndim(net) - 1))
+    pos = np.maximum(net, 0.0)
+    p_req = pos
+    e_req = pos * h_eff * dt_h
+
+    res_def_p = np.maximum(0.0, p_req - p_dis_feasible)
+    res_def_e = np.maximum(0.0, e_req - e_avail_dis)
+
+    risk_event = (unserved > 0.0) | (res_def_p > 0.0) | (res_def_e > 0.0)
+    risk_index = alpha * unserved + beta * res_def_p + gamma * res_def_e
+
+    return {
+        "p_req_kw": p_req,
+        "e_req_kwh": e_req,
+        "p_dis_feasible_kw": p_dis_feasible,
+        "e_dis_avail_kwh": e_avail_dis,
+        "reserve_deficit_p_kw": res_def_p,
+        "reserve_deficit_e_kwh": res_def_e,
+        "risk_event": risk_event,
+        "risk_index": risk_index,
+    }
+
+def simulate(
+    load_kw,
+    pv_kw,
+    dt_h=DT_H,
+    h_steps=H_STEPS,
+    e_kwh=E_KWH,
+    p_max_kw=P_MAX_KW,
+    soc_min=SOC_MIN,
+    soc_max=SOC_MAX,
+    soc0=SOC0,
+    eta_ch=ETA_CH,
+    eta_dis=ETA_DIS,
+    alpha=ALPHA,
+    beta=BETA,
+    gamma=GAMMA,
+    policy=DISPATCH_POLICY,
+    checkpoint=None,
+) -> dict:
+    """
+    Run one scenario over aligned load / pv arrays -> {column: array} (net_kw + RESULT_COLUMNS).
+    "dispatch_stats" holds the dispatch counters: steps / fast_forward_steps (reactive),
+    LP solves etc. (lookahead).
+    checkpoint: npz path - reactive dispatch saves its state there every CHECKPOINT_CHUNK_STEPS
+    steps (chunk outputs in <stem>_parts/) and resumes from it (dispatch_reactive_chunked).
+    """
+    load_kw = np.asarray(load_kw, dtype=float)
+    pv_kw = np.asarray(pv_kw, dtype=float)
+    net = load_kw - pv_kw
+
+    stats = {}
+    if checkpoint is not None and policy != "reactive":
+        raise ValueError("chunk checkpoints are only supported for the reactive policy")
+    if policy == "reactive" and checkpoint is not None:
+        soc_pre, soc, batt_p, unserved = dispatch_reactive_chunked(
+            net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis, checkpoint, stats=stats
+        )
+    elif policy == "reactive":
+        soc_pre, soc, batt_p, unserved = dispatch_reactive(
+            net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis, stats
+        )
+    elif policy == "lookahead":
+        # scipy is only needed (and imported) for this policy
+        from scripts.pipeline.lookahead import dispatch_lookahead
+
+        soc_pre, soc, batt_p, unserved, stats = dispatch_lookahead(
+            net, dt_h, h_steps, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis
+        )
+    else:
+        raise ValueError(f"unknown dispatch policy {policy!r} (expected one of {DISPATCH_POLICIES})")
+
+    out = {
+        "net_kw": net,
+        "soc_pre": soc_pre,
+        "soc": soc,
+        "batt_p_kw": batt_p,
+        "unserved_kw": unserved,
+    }
+    out.update(reserve_and_risk(net, soc_pre, unserved, dt_h, h_steps, e_kwh, p_max_kw, soc_min, alpha, beta, gamma))
+    out["dispatch_stats"] = stats
+    return out
+
+def simulate_batch(load_kw, pv_kw, e_kwh, p_max_kw, dt_h=DT_H, h_steps=H_STEPS, soc_min=SOC_MIN, soc_max=SOC_MAX,
+                   soc0=SOC0, eta_ch=ETA_CH, eta_dis=ETA_DIS, alpha=ALPHA, beta=BETA, gamma=GAMMA) -> dict:
+    """
+    simulate() for m BESS sizes at once -> {column: (n, m) array}; net_kw stays (n,)
+    """
+    load_kw = np.asarray(load_kw, dtype=float)
+    pv_kw = np.asarray(pv_kw, dtype=float)
+    net = load_kw - pv_kw
+    e_kwh, p_max_kw = np.broadcast_arrays(np.atleast_1d(np.asarray(e_kwh, dtype=float)),
+                                          np.atleast_1d(np.asarray(p_max_kw, dtype=float)))
+
+    stats = {}
+    soc_pre, soc, batt_p, unserved = dispatch_reactive_batch(
+        net, dt_h, e_kwh, p_max_kw, soc_min, soc_max, soc0, eta_ch, eta_dis, stats
+    )
+    out = {
+        "net_kw": net,
+        "soc_pre": soc_pre,
+        "soc": soc,
+        "batt_p_kw": batt_p,
+        "unserved_kw": unserved,
+    }
+    out.update(reserve_and_risk(net, soc_pre, unserved, dt_h, h_steps, e_kwh, p_max_kw, soc_min, alpha, beta, gamma))
+    # requirements depend on net only: (n, 1) -> read-only (n, m) views
+    for k in ("p_req_kw", "e_req_kwh"):
+        out[k] = np.broadcast_to(out[k], soc_pre.shape)
+    out["dispatch_stats"] = stats
+    return out
+
+def compute_metrics(res: dict, dt_h=DT_H) -> dict:
+    unserved = res["unserved_kw"]
+    return {
+        "total_unserved_kwh": float((unserved * dt_h).sum()),
+        "pct_unserved_steps": float(100.0 * (unserved > 0).mean()),
+        "max_unserved_kw": float(unserved.max()),
+        "pct_risk_steps": float(100.0 * res["risk_event"].mean()),
+        "max_risk_index": float(res["risk_index"].max()),
+    }
+
+def compute_metrics_batch(res: dict, dt_h=DT_H) -> dict:
+    """
+    compute_metrics per scenario column of a simulate_batch result -> {metric: array of length m}
+    """
+    unserved = res["unserved_kw"]
+    return {
+        "total_unserved_kwh": (unserved * dt_h).sum(axis=0),
+        "pct_unserved_steps": 100.0 * (unserved > 0).mean(axis=0),
+        "max_unserved_kw": unserved.max(axis=0),
+        "pct_risk_steps": 100.0 * res["risk_event"].mean(axis=0),
+        "max_risk_index": res["risk_index"].max(axis=0),
+    }
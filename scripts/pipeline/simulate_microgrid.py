@@ -1,21 +1,34 @@
-import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 from config import (
-    LOAD_CSV, PV_CSV,
-    RESULTS_DIR, SIM_DIR,
+    MAKE_PLOTS,
+    RESULTS_DIR, SIM_DIR, SUMMARY_STORE,
     DT_H, H_STEPS,
     PV_KWP,
-    E_KWH, P_MAX_KW, SOC_MIN, SOC_MAX, SOC0, ETA_CH, ETA_DIS,
-    ALPHA, BETA, GAMMA
+    E_KWH, P_MAX_KW, SOC_MIN, SOC_MAX, ETA_CH, ETA_DIS,
+    DISPATCH_POLICY,
+    ASSETS_CSV, ASSET_ALLOCATION,
+    COMPACT_RESULTS,
+    SIM_CHECKPOINT,
+    WRITE_RESULTS_DATASET, RESULTS_DATASET,
 )
-
-RESULTS_DIR.mkdir(parents=True, exist_ok=True)
-SIM_DIR.mkdir(parents=True, exist_ok=True)
-
-OUT_CSV = SIM_DIR / "sim_results.csv"
+from scripts.pipeline.align import format_report
+from scripts.pipeline.degradation import DOD_BINS, degradation_metrics
+from scripts.pipeline.plotting import plot_series
+from scripts.pipeline.profiling import StageProfiler
+from scripts.pipeline.resample import load_inputs
+from scripts.pipeline.results_io import RESULTS_CSV, compact_column, window
+from scripts.pipeline.sim_core import RESULT_COLUMNS, compute_metrics, simulate
+from scripts.pipeline.summary_cube import CUBE_PARQUET, build_cube, hour_month_grid, write_cube
+from scripts.pipeline.summary_store import make_row, scenario_params, upsert
+
+OUT_CSV = RESULTS_CSV
+ASSETS_OUT_CSV = SIM_DIR / "asset_summary.csv"
+DOD_CSV = SIM_DIR / "dod_histogram.csv"
 METRICS_TXT = SIM_DIR / "metrics_summary.txt"
+ALIGN_TXT = SIM_DIR / "alignment_report.txt"
+QUICKLOOK_DIR = SIM_DIR / "quicklooks"
+CHECKPOINT_NPZ = SIM_DIR / "sim_checkpoint.npz"
 
 # Plot windows
 WINDOWS = [
@@ -23,235 +36,164 @@ WINDOWS = [
     ("2018-07-01", "2018-07-15", "jul_2w"),
 ]
 
-# Load + align data
-load = pd.read_csv(LOAD_CSV, parse_dates=["timestamp"]).sort_values("timestamp")
-pv   = pd.read_csv(PV_CSV,   parse_dates=["timestamp"]).sort_values("timestamp")
+def build_results_frame(ts, load_kw, pv_kw, res: dict, compact: bool = COMPACT_RESULTS) -> pd.DataFrame:
+    cols = {"timestamp": ts, "load_kw": load_kw, "pv_kw": pv_kw, "net_kw": res["net_kw"]}
+    for c in RESULT_COLUMNS:
+        cols[c] = res[c]
+    # multi-asset runs: genset total + one power / SoC column per asset
+    if "asset_columns" in res:
+        cols["genset_p_kw"] = res["genset_p_kw"]
+        cols.update(res["asset_columns"])
+    if compact:
+        # column by column, so no float64 frame is built first
+        cols = {c: v if c == "timestamp" else compact_column(c, v) for c, v in cols.items()}
+    return pd.DataFrame(cols, copy=False)
+
+def write_quicklooks(df: pd.DataFrame, out_dir=QUICKLOOK_DIR, cube: pd.DataFrame = None):
+    import matplotlib.pyplot as plt
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # daily and hour x month statistics come from the summary cube (built here if not given)
+    if cube is None:
+        cube = build_cube(df)
+    daily = cube[cube["resolution"] == "daily"].set_index("period").rename(columns={
+        "load_kw_mean": "load_mean_kw",
+        "pv_kw_mean": "pv_mean_kw",
+        "net_kw_mean": "net_mean_kw",
+        "soc_median": "soc_med",
+        "unserved_kw_max": "unserved_max_kw",
+        "risk_index_max": "risk_max",
+    })
+
+    W = 7
+    daily["load_mean_kw_roll7"] = daily["load_mean_kw"].rolling(W, min_periods=1).mean()
+    daily["pv_mean_kw_roll7"] = daily["pv_mean_kw"].rolling(W, min_periods=1).mean()
+    daily["net_mean_kw_roll7"] = daily["net_mean_kw"].rolling(W, min_periods=1).mean()
+
+    daily["soc_med_roll7"] = daily["soc_med"].rolling(W, min_periods=1).median()
+    daily["unserved_max_kw_roll7"] = daily["unserved_max_kw"].rolling(W, min_periods=1).mean()
+    daily["risk_max_roll7"] = daily["risk_max"].rolling(W, min_periods=1).mean()
+
+    plt.figure(figsize=(12, 4))
+    plt.plot(daily.index, daily["load_mean_kw"], label="Daily mean load (kW)", alpha=0.6)
+    plt.plot(daily.index, daily["load_mean_kw_roll7"], label="7d avg load", linestyle="--", linewidth=2.0)
+
+    plt.plot(daily.index, daily["pv_mean_kw"], label="Daily mean pv (kW)", alpha=0.6)
+    plt.plot(daily.index, daily["pv_mean_kw_roll7"], label="7d avg pv", linestyle="--", linewidth=2.0)
+
+    plt.plot(daily.index, daily["net_mean_kw"], label="Daily mean net deficit (kW)", alpha=0.6)
+    plt.plot(daily.index, daily["net_mean_kw_roll7"], label="7d avg net deficit", linestyle="--", linewidth=2.0)
 
-df = (
-    pd.merge(load, pv, on="timestamp", how="inner")
-      .sort_values("timestamp")
-      .reset_index(drop=True)
-)
+    plt.legend()
+    plt.title("Daily mean load / pv / net (full year)")
+    plt.xticks(rotation=30)
+    plt.tight_layout()
+    plt.savefig(out_dir / "load_pv_net_full.png", dpi=200)
+    plt.close()
 
-df["net_kw"] = df["load_kw"] - df["pv_kw"]
+    plt.figure(figsize=(12, 3))
+    plt.fill_between(daily.index, daily["soc_min"], daily["soc_max"], alpha=0.20, label="Daily soc min-max")
+    plt.plot(daily.index, daily["soc_med"], label="Daily soc median", alpha=0.65)
+    plt.plot(daily.index, daily["soc_med_roll7"], label="7d median soc", linestyle="--", linewidth=2.0)
 
-net = df["net_kw"].to_numpy()
-load_series = df["load_kw"].to_numpy()
-pv_series   = df["pv_kw"].to_numpy()
-N = len(df)
+    plt.ylim(0, 1)
+    plt.legend()
+    plt.title("Daily battery soc band (full year)")
+    plt.xticks(rotation=30)
+    plt.tight_layout()
+    plt.savefig(out_dir / "soc_full.png", dpi=200)
+    plt.close()
 
-# Simulation main
-soc = SOC0
+    # full resolution, decimated to min/max per pixel so single-step spikes stay visible
+    plt.figure(figsize=(12, 3))
+    plot_series(plt.gca(), df["timestamp"], df["unserved_kw"], label="Unserved (kW)", alpha=0.65, linewidth=0.8)
+    plt.plot(daily.index, daily["unserved_max_kw_roll7"], label="7d avg daily max", linestyle="--", linewidth=2.0)
 
-soc_pre_list = []
-soc_list = []
-batt_p_list = []
-unserved_list = []
+    plt.ylabel("Unserved (kW)")
+    plt.legend()
+    plt.title("Unserved load (full year)")
+    plt.xticks(rotation=30)
+    plt.tight_layout()
+    plt.savefig(out_dir / "unserved_full.png", dpi=200)
+    plt.close()
 
-p_req_list = []
-e_req_list = []
-p_dis_feasible_list = []
-e_dis_avail_list = []
-res_def_p_list = []
-res_def_e_list = []
+    plt.figure(figsize=(12, 3))
+    plot_series(plt.gca(), df["timestamp"], df["risk_index"], label="Risk index", alpha=0.65, linewidth=0.8)
+    plt.plot(daily.index, daily["risk_max_roll7"], label="7d avg daily max", linestyle="--", linewidth=2.0)
 
-risk_event_list = []
-risk_index_list = []
+    plt.ylabel("Risk index")
+    plt.legend()
+    plt.title("Risk index (full year)")
+    plt.xticks(rotation=30)
+    plt.tight_layout()
+    plt.savefig(out_dir / "risk_index_full.png", dpi=200)
+    plt.close()
 
-for i in range(N):
-    net_kw = float(net[i])
+    grid = hour_month_grid(cube, "risk_index_mean")
+    plt.figure(figsize=(8, 4))
+    plt.imshow(grid.to_numpy(dtype=float), aspect="auto", origin="lower", cmap="magma",
+               extent=(grid.columns.min() - 0.5, grid.columns.max() + 0.5, -0.5, 23.5))
+    plt.colorbar(label="Mean risk index")
+    plt.xlabel("Month")
+    plt.ylabel("Hour of day")
+    plt.xticks(grid.columns)
+    plt.title("Mean risk index by hour of day and month")
+    plt.tight_layout()
+    plt.savefig(out_dir / "risk_hour_month.png", dpi=200)
+    plt.close()
 
-    # SoC
-    soc_pre = float(soc)
-    soc_pre_list.append(soc_pre)
-
-    # Energy margins
-    e_avail_dis = max(0.0, (soc - SOC_MIN) * E_KWH)
-    e_avail_chg = max(0.0, (SOC_MAX - soc) * E_KWH)
-
-    # Feasible power this step
-    p_dis_feasible = min(P_MAX_KW, e_avail_dis / DT_H)
-    p_chg_feasible = min(P_MAX_KW, e_avail_chg / DT_H)
-
-    # Rolling forecast
-    h_eff = min(H_STEPS, N - i)
-    load_hat = np.full(h_eff, load_series[i], dtype=float)
-    pv_hat   = np.full(h_eff, pv_series[i], dtype=float)
-    net_hat  = load_hat - pv_hat
-
-    # Required reserve over horizon
-    p_req = float(np.max(np.maximum(net_hat, 0.0)))
-    e_req = float(np.sum(np.maximum(net_hat, 0.0)) * DT_H)
-
-    res_def_p = float(max(0.0, p_req - p_dis_feasible))
-    res_def_e = float(max(0.0, e_req - e_avail_dis))
-
-    p_req_list.append(p_req)
-    e_req_list.append(e_req)
-    p_dis_feasible_list.append(float(p_dis_feasible))
-    e_dis_avail_list.append(float(e_avail_dis))
-    res_def_p_list.append(res_def_p)
-    res_def_e_list.append(res_def_e)
-
-    # Reactive BESS action
-    batt_p = 0.0
-    unserved = 0.0
-
-    if net_kw > 0.0:
-        batt_p = min(net_kw, p_dis_feasible)
-        soc -= (batt_p * DT_H) / (ETA_DIS * E_KWH)
-        unserved = max(0.0, net_kw - batt_p)
-
-    elif net_kw < 0.0:
-        batt_p = -min(-net_kw, p_chg_feasible)
-        soc += (-batt_p * DT_H * ETA_CH) / E_KWH
-
-    soc = min(SOC_MAX, max(SOC_MIN, soc))
-
-    soc_list.append(float(soc))
-    batt_p_list.append(float(batt_p))
-    unserved_list.append(float(unserved))
-
-    # Frequency-risk
-    risk_event = (unserved > 0.0) or (res_def_p > 0.0) or (res_def_e > 0.0)
-    risk_index = ALPHA * unserved + BETA * res_def_p + GAMMA * res_def_e
-
-    risk_event_list.append(bool(risk_event))
-    risk_index_list.append(float(risk_index))
-
-df["soc_pre"] = soc_pre_list
-df["soc"] = soc_list
-df["batt_p_kw"] = batt_p_list
-df["unserved_kw"] = unserved_list
-
-df["p_req_kw"] = p_req_list
-df["e_req_kwh"] = e_req_list
-df["p_dis_feasible_kw"] = p_dis_feasible_list
-df["e_dis_avail_kwh"] = e_dis_avail_list
-df["reserve_deficit_p_kw"] = res_def_p_list
-df["reserve_deficit_e_kwh"] = res_def_e_list
-
-df["risk_event"] = risk_event_list
-df["risk_index"] = risk_index_list
-
-df.to_csv(OUT_CSV, index=False)
-print(f"Saved results: {OUT_CSV} ({len(df)} rows)")
-
-# Quiucklooks
-QUICKLOOK_DIR = SIM_DIR / "quicklooks"
-QUICKLOOK_DIR.mkdir(parents=True, exist_ok=True)
-
-# daily summaries
-dff = df.copy()
-dff = dff.set_index("timestamp").sort_index()
-
-daily = pd.DataFrame(index=dff.resample("D").mean().index)
-daily["load_mean_kw"] = dff["load_kw"].resample("D").mean()
-daily["pv_mean_kw"] = dff["pv_kw"].resample("D").mean()
-daily["net_mean_kw"] = dff["net_kw"].resample("D").mean()
-
-daily["soc_min"] = dff["soc"].resample("D").min()
-daily["soc_med"] = dff["soc"].resample("D").median()
-daily["soc_max"] = dff["soc"].resample("D").max()
-
-daily["unserved_max_kw"] = dff["unserved_kw"].resample("D").max()
-daily["risk_max"] = dff["risk_index"].resample("D").max()
-
-W = 7
-daily["load_mean_kw_roll7"] = daily["load_mean_kw"].rolling(W, min_periods=1).mean()
-daily["pv_mean_kw_roll7"] = daily["pv_mean_kw"].rolling(W, min_periods=1).mean()
-daily["net_mean_kw_roll7"] = daily["net_mean_kw"].rolling(W, min_periods=1).mean()
-
-daily["soc_med_roll7"] = daily["soc_med"].rolling(W, min_periods=1).median()
-daily["unserved_max_kw_roll7"] = daily["unserved_max_kw"].rolling(W, min_periods=1).mean()
-daily["risk_max_roll7"] = daily["risk_max"].rolling(W, min_periods=1).mean()
-
-plt.figure(figsize=(12, 4))
-plt.plot(daily.index, daily["load_mean_kw"], label="Daily mean load (kW)", alpha=0.6)
-plt.plot(daily.index, daily["load_mean_kw_roll7"], label="7d avg load", linestyle="--", linewidth=2.0)
-
-plt.plot(daily.index, daily["pv_mean_kw"], label="Daily mean pv (kW)", alpha=0.6)
-plt.plot(daily.index, daily["pv_mean_kw_roll7"], label="7d avg pv", linestyle="--", linewidth=2.0)
-
-plt.plot(daily.index, daily["net_mean_kw"], label="Daily mean net deficit (kW)", alpha=0.6)
-plt.plot(daily.index, daily["net_mean_kw_roll7"], label="7d avg net deficit", linestyle="--", linewidth=2.0)
-
-plt.legend()
-plt.title("Daily mean load / pv / net (full year)")
-plt.xticks(rotation=30)
-plt.tight_layout()
-plt.savefig(QUICKLOOK_DIR / "load_pv_net_full.png", dpi=200)
-plt.close()
-
-plt.figure(figsize=(12, 3))
-plt.fill_between(daily.index, daily["soc_min"], daily["soc_max"], alpha=0.20, label="Daily soc min-max")
-plt.plot(daily.index, daily["soc_med"], label="Daily soc median", alpha=0.65)
-plt.plot(daily.index, daily["soc_med_roll7"], label="7d median soc", linestyle="--", linewidth=2.0)
-
-plt.ylim(0, 1)
-plt.legend()
-plt.title("Daily battery soc band (full year)")
-plt.xticks(rotation=30)
-plt.tight_layout()
-plt.savefig(QUICKLOOK_DIR / "soc_full.png", dpi=200)
-plt.close()
-
-plt.figure(figsize=(12, 3))
-plt.plot(daily.index, daily["unserved_max_kw"], label="Daily max unserved (kW)", alpha=0.65)
-plt.plot(daily.index, daily["unserved_max_kw_roll7"], label="7d avg daily max", linestyle="--", linewidth=2.0)
-
-plt.ylabel("Daily max unserved (kW)")
-plt.legend()
-plt.title("Daily max unserved load (full year)")
-plt.xticks(rotation=30)
-plt.tight_layout()
-plt.savefig(QUICKLOOK_DIR / "unserved_full.png", dpi=200)
-plt.close()
-
-plt.figure(figsize=(12, 3))
-plt.plot(daily.index, daily["risk_max"], label="Daily max risk index", alpha=0.65)
-plt.plot(daily.index, daily["risk_max_roll7"], label="7d avg daily max", linestyle="--", linewidth=2.0)
-
-plt.ylabel("Daily max risk index")
-plt.legend()
-plt.title("Daily max risk index (full year)")
-plt.xticks(rotation=30)
-plt.tight_layout()
-plt.savefig(QUICKLOOK_DIR / "risk_index_full.png", dpi=200)
-plt.close()
-
-print(f"Saved quicklooks: {QUICKLOOK_DIR}")
-
-# Metrics
-total_unserved_kwh = float((df["unserved_kw"] * DT_H).sum())
-pct_unserved_steps = float(100.0 * (df["unserved_kw"] > 0).mean())
-max_unserved_kw = float(df["unserved_kw"].max())
-pct_risk_steps = float(100.0 * df["risk_event"].mean())
-max_risk_index = float(df["risk_index"].max())
-
-# Write metrics
-with open(METRICS_TXT, "w") as f:
-    f.write("=== Key Metrics ===\n")
-    f.write(f"PV_kWp: {PV_KWP}\n")
-    f.write(f"H_STEPS: {H_STEPS}\n")
-    f.write(f"DT_H: {DT_H}\n")
-    f.write(f"BESS_E_kWh: {E_KWH}\n")
-    f.write(f"BESS_Pmax_kW: {P_MAX_KW}\n")
-    f.write(f"SoC_window: [{SOC_MIN}, {SOC_MAX}]\n")
-    f.write(f"eta_ch: {ETA_CH}\n")
-    f.write(f"eta_dis: {ETA_DIS}\n")
-    f.write(f"Total unserved energy (kWh): {total_unserved_kwh:.2f}\n")
-    f.write(f"Timesteps with unserved load (%): {pct_unserved_steps:.2f}\n")
-    f.write(f"Max unserved power (kW): {max_unserved_kw:.2f}\n")
-    f.write(f"Timesteps flagged as risk events (%): {pct_risk_steps:.2f}\n")
-    f.write(f"Max risk index: {max_risk_index:.2f}\n")
-
-print(f"Saved metrics: {METRICS_TXT}")
+    print(f"Saved quicklooks: {out_dir}")
+
+def write_dod_histogram(deg: dict, out_csv=DOD_CSV):
+    hist = pd.DataFrame({
+        "dod_from": DOD_BINS[:-1],
+        "dod_to": DOD_BINS[1:],
+        "cycles": deg["dod_hist"],
+    })
+    hist.to_csv(out_csv, index=False)
+    print(f"Saved DoD histogram: {out_csv}")
+
+    if MAKE_PLOTS:
+        import matplotlib.pyplot as plt
+
+        plt.figure(figsize=(7, 4))
+        plt.bar(hist["dod_from"] * 100, hist["cycles"], width=100 * (DOD_BINS[1] - DOD_BINS[0]), align="edge")
+        plt.xlabel("Depth of discharge (% of capacity)")
+        plt.ylabel("Cycles (rainflow count)")
+        plt.title(f"Cycle depth histogram ({deg['efc_per_year']:.0f} equivalent full cycles / year)")
+        plt.tight_layout()
+        plt.savefig(out_csv.with_suffix(".png"), dpi=200)
+        plt.close()
+
+def write_metrics(metrics: dict):
+    with open(METRICS_TXT, "w") as f:
+        f.write("=== Key Metrics ===\n")
+        f.write(f"PV_kWp: {PV_KWP}\n")
+        f.write(f"H_STEPS: {H_STEPS}\n")
+        f.write(f"DT_H: {DT_H}\n")
+        f.write(f"BESS_E_kWh: {E_KWH}\n")
+        f.write(f"BESS_Pmax_kW: {P_MAX_KW}\n")
+        f.write(f"SoC_window: [{SOC_MIN}, {SOC_MAX}]\n")
+        f.write(f"eta_ch: {ETA_CH}\n")
+        f.write(f"eta_dis: {ETA_DIS}\n")
+        f.write(f"Dispatch policy: {DISPATCH_POLICY}\n")
+        f.write(f"Total unserved energy (kWh): {metrics['total_unserved_kwh']:.2f}\n")
+        f.write(f"Timesteps with unserved load (%): {metrics['pct_unserved_steps']:.2f}\n")
+        f.write(f"Max unserved power (kW): {metrics['max_unserved_kw']:.2f}\n")
+        f.write(f"Timesteps flagged as risk events (%): {metrics['pct_risk_steps']:.2f}\n")
+        f.write(f"Max risk index: {metrics['max_risk_index']:.2f}\n")
+        if "efc_per_year" in metrics:
+            f.write(f"Equivalent full cycles per year: {metrics['efc_per_year']:.1f}\n")
+            f.write(f"Cycle-life damage per year (%): {100.0 * metrics['damage_per_year']:.2f}\n")
+            f.write(f"Estimated cycle life (years): {metrics['life_years']:.1f}\n")
+
+    print(f"Saved metrics: {METRICS_TXT}")
 
 def plot_window(df_in, start, end, tag):
-    start_ts = pd.Timestamp(start)
-    end_ts   = pd.Timestamp(end)
-    w = df_in[(df_in["timestamp"] >= start_ts) & (df_in["timestamp"] < end_ts)].copy()
+    import matplotlib.pyplot as plt
+
+    w = window(df_in, start, end)
 
     if w.empty:
         print(f"Empty window: {tag} ({start} -> {end})")
@@ -259,9 +201,9 @@ def plot_window(df_in, start, end, tag):
 
     # Load + PV + Net
     plt.figure(figsize=(10, 4))
-    plt.plot(w["timestamp"], w["load_kw"], label="Load (kW)")
-    plt.plot(w["timestamp"], w["pv_kw"], label="PV (kW)")
-    plt.plot(w["timestamp"], w["net_kw"], label="Net deficit (kW)")
+    plot_series(plt.gca(), w["timestamp"], w["load_kw"], label="Load (kW)")
+    plot_series(plt.gca(), w["timestamp"], w["pv_kw"], label="PV (kW)")
+    plot_series(plt.gca(), w["timestamp"], w["net_kw"], label="Net deficit (kW)")
     plt.legend()
     plt.xticks(rotation=30)
     plt.tight_layout()
@@ -270,7 +212,7 @@ def plot_window(df_in, start, end, tag):
 
     # SoC
     plt.figure(figsize=(10, 3))
-    plt.plot(w["timestamp"], w["soc"], label="SoC")
+    plot_series(plt.gca(), w["timestamp"], w["soc"], label="SoC")
     plt.ylim(0, 1)
     plt.legend()
     plt.xticks(rotation=30)
@@ -280,7 +222,7 @@ def plot_window(df_in, start, end, tag):
 
     # Unserved
     plt.figure(figsize=(10, 3))
-    plt.plot(w["timestamp"], w["unserved_kw"])
+    plot_series(plt.gca(), w["timestamp"], w["unserved_kw"])
     plt.ylabel("Unserved (kW)")
     plt.xticks(rotation=30)
     plt.tight_layout()
@@ -289,7 +231,7 @@ def plot_window(df_in, start, end, tag):
 
     # Risk index
     plt.figure(figsize=(10, 3))
-    plt.plot(w["timestamp"], w["risk_index"])
+    plot_series(plt.gca(), w["timestamp"], w["risk_index"])
     plt.ylabel("Risk index")
     plt.xticks(rotation=30)
     plt.tight_layout()
@@ -298,7 +240,86 @@ def plot_window(df_in, start, end, tag):
 
     print(f"Saved window plots to {SIM_DIR} for {tag}")
 
-for s, e, tag in WINDOWS:
-    plot_window(df, s, e, tag)
-
-print("Simulation completed successfully")
\ No newline at end of file
+def main():
+    prof = StageProfiler("simulate_microgrid")
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    SIM_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Load + align data
+    with prof.phase("load"):
+        ts, load_kw, pv_kw, align_report = load_inputs()
+    ALIGN_TXT.write_text(format_report(align_report), encoding="utf-8")
+    print(f"Aligned inputs: {align_report['aligned_steps']} steps "
+          f"(filled load={align_report['load_filled']}, pv={align_report['pv_filled']}, "
+          f"duplicated load={align_report['load_duplicated']}, pv={align_report['pv_duplicated']}, "
+          f"dropped steps={align_report['dropped_steps']}) -> {ALIGN_TXT}")
+
+    # Simulation main
+    reg = None
+    if ASSETS_CSV is not None:
+        from scripts.pipeline.assets import AssetRegistry, asset_summary, simulate_assets
+
+        reg = AssetRegistry.from_csv(ASSETS_CSV)
+        if DISPATCH_POLICY != "reactive":
+            raise ValueError("ASSETS_CSV sites are dispatched reactively; set DISPATCH_POLICY = 'reactive'")
+        print(f"Asset registry: {len(reg.battery)} batteries, {len(reg.genset)} gensets, "
+              f"{len(reg.pv)} PV arrays ({ASSET_ALLOCATION} allocation) from {ASSETS_CSV}")
+
+    with prof.phase("simulate"):
+        if reg is None:
+            res = simulate(load_kw, pv_kw, checkpoint=CHECKPOINT_NPZ if SIM_CHECKPOINT else None)
+        else:
+            res = simulate_assets(load_kw, pv_kw, reg)
+        st = res.get("dispatch_stats", {})
+        if "lp_solves" in st:
+            print(f"Look-ahead dispatch: {st['lp_solves']} LP solves, {st['greedy_steps']} greedy steps, "
+                  f"{st['empty_steps']} empty-battery steps, {st['lp_failures']} failed solves")
+        elif st.get("steps"):
+            print(f"Reactive dispatch: {st['fast_forward_steps']} of {st['steps']} steps "
+                  f"({100.0 * st['fast_forward_steps'] / st['steps']:.1f}%) fast-forwarded at a SoC limit")
+        # metrics from the float64 arrays; afterwards only the (possibly compact) frame is kept
+        metrics = compute_metrics(res)
+        deg = degradation_metrics(res["soc"], DT_H)
+        metrics.update({k: deg[k] for k in ("efc_per_year", "damage_per_year", "life_years")})
+        assets = asset_summary(res, reg) if reg is not None else None
+        df = build_results_frame(ts, load_kw, pv_kw, res)
+        del res
+
+    with prof.phase("write"):
+        df.to_csv(OUT_CSV, index=False)
+        print(f"Saved results: {OUT_CSV} ({len(df)} rows{', compact float32' if COMPACT_RESULTS else ''})")
+        write_metrics(metrics)
+        write_dod_histogram(deg)
+        # the input fingerprint in the scenario id covers the load / pv files and the asset table
+        params = scenario_params()
+        if reg is not None:
+            assets.to_csv(ASSETS_OUT_CSV, index=False)
+            print(f"Saved asset summary: {ASSETS_OUT_CSV}")
+        row = make_row(params, metrics, "pipeline", steps=len(df))
+        upsert([row])
+        print(f"Saved scenario {row['scenario_id']} to summary store: {SUMMARY_STORE}")
+        if WRITE_RESULTS_DATASET:
+            from scripts.pipeline.results_dataset import add_scenarios, write_partitions
+
+            write_partitions(df, params["site"], row["scenario_id"])
+            add_scenarios([row])
+            print(f"Saved results to dataset: {RESULTS_DATASET} (site={params['site']}/scenario={row['scenario_id']})")
+
+    with prof.phase("summarize"):
+        cube = build_cube(df)
+        write_cube(cube)
+        print(f"Saved summary cube: {CUBE_PARQUET} ({len(cube)} rows)")
+
+    if MAKE_PLOTS:
+        with prof.phase("plot"):
+            write_quicklooks(df, cube=cube)
+            for s, e, tag in WINDOWS:
+                plot_window(df, s, e, tag)
+    else:
+        print("plots disabled (MAKE_PLOTS) - skipped quicklooks and window plots")
+
+    prof.save()
+    print("Simulation completed successfully")
+
+if __name__ == "__main__":
+    main()
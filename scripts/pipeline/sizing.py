@@ -0,0 +1,207 @@
+# BESS sizing: smallest-cost (E, P) pair that meets an unserved-energy / risk target
+import numpy as np
+import pandas as pd
+
+from config import (
+    DT_MIN, H_HOURS,
+    COST_PER_KWH, COST_PER_KW, PROJECT_YEARS,
+    SIZING_TARGET_METRIC, SIZING_TARGET, SIZING_OBJECTIVE,
+)
+from scripts.pipeline.degradation import degradation_batch
+from scripts.pipeline.sim_core import compute_metrics_batch, simulate_batch
+
+OBJECTIVES = {"capex": "cost", "lifecycle": "lifecycle_cost"}
+
+# scenarios per simulate_batch call (memory ~ 12 x steps x batch x 8 bytes)
+MAX_BATCH = 64
+
+def evaluate_sizes(load_kw, pv_kw, e_kwh, p_max_kw, dt_min=DT_MIN, max_batch=MAX_BATCH, degradation=False) -> dict:
+    """
+    Metrics of many (E, P) candidates, simulated max_batch at a time -> {metric: array}.
+    degradation=True adds the rainflow metrics (efc_per_year, damage_per_year, life_years).
+    """
+    e_kwh, p_max_kw = np.broadcast_arrays(np.atleast_1d(np.asarray(e_kwh, dtype=float)),
+                                          np.atleast_1d(np.asarray(p_max_kw, dtype=float)))
+    dt_h = dt_min / 60.0
+    h_steps = max(1, int(round(H_HOURS * 60.0 / dt_min)))
+
+    parts = []
+    for a in range(0, len(e_kwh), max_batch):
+        res = simulate_batch(load_kw, pv_kw, e_kwh[a:a + max_batch], p_max_kw[a:a + max_batch],
+                             dt_h=dt_h, h_steps=h_steps)
+        m = compute_metrics_batch(res, dt_h)
+        if degradation:
+            deg = degradation_batch(res["soc"], dt_h)
+            m.update({k: deg[k] for k in ("efc_per_year", "damage_per_year", "life_years")})
+        parts.append(m)
+        del res
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+def min_energy_frontier(load_kw, pv_kw, p_grid, e_max_kwh, target=SIZING_TARGET, metric=SIZING_TARGET_METRIC,
+                        e_min_kwh=0.0, tol_kwh=5.0, per_iter=4, dt_min=DT_MIN, max_batch=MAX_BATCH):
+    """
+    Smallest E meeting `metric <= target` for every P in p_grid.
+
+    Assumes the metric does not increase with E (at fixed P) or with P (at fixed E).
+    All P are searched together: each round evaluates `per_iter` energies inside every
+    open bracket in one batch (k-ary bisection, bracket shrinks by per_iter + 1), and
+    the brackets are tightened across P with the frontier monotonicity
+    E*(P) non-increasing in P.
+
+    lifecycle_cost is the cost at that minimum E; a larger E can have a lower one
+    (shallower cycles, fewer replacements), see lifecycle_frontier.
+
+    Returns (frontier DataFrame, number of simulated candidates).
+    """
+    p_grid = np.sort(np.asarray(p_grid, dtype=float))
+    n_p = len(p_grid)
+    n_eval = 0
+
+    # feasibility at the largest energy; infeasible P stay NaN
+    m = evaluate_sizes(load_kw, pv_kw, np.full(n_p, e_max_kwh), p_grid, dt_min, max_batch)
+    n_eval += n_p
+    feasible = m[metric] <= target
+    lo = np.full(n_p, float(e_min_kwh))    # largest E known to miss the target
+    hi = np.full(n_p, float(e_max_kwh))    # smallest E known to meet it
+
+    while True:
+        # frontier monotonicity: E*(P) is non-increasing in P
+        hi[feasible] = np.minimum.accumulate(hi[feasible])
+        lo[feasible] = np.maximum.accumulate(lo[feasible][::-1])[::-1]
+
+        open_ = feasible & (hi - lo > tol_kwh)
+        if not open_.any():
+            break
+        idx = np.flatnonzero(open_)
+        frac = np.arange(1, per_iter + 1) / (per_iter + 1)
+        e_cand = lo[idx, None] + (hi[idx] - lo[idx])[:, None] * frac[None, :]
+        p_cand = np.repeat(p_grid[idx], per_iter).reshape(len(idx), per_iter)
+
+        m = evaluate_sizes(load_kw, pv_kw, e_cand.ravel(), p_cand.ravel(), dt_min, max_batch)
+        n_eval += e_cand.size
+        val = m[metric].reshape(len(idx), per_iter)
+        ok = val <= target
+
+        for r, j in enumerate(idx):
+            k_ok = np.flatnonzero(ok[r])
+            if len(k_ok):
+                k = k_ok[0]
+                hi[j] = e_cand[r, k]
+                if k > 0:
+                    lo[j] = e_cand[r, k - 1]
+            else:
+                lo[j] = e_cand[r, -1]
+
+    # brackets may have been narrowed by a neighbour: simulate the frontier itself once more
+    e_star = np.where(feasible, hi, np.nan)
+    frontier = pd.DataFrame({
+        "p_max_kw": p_grid,
+        "e_min_kwh": e_star,
+        "e_kwh": e_star,
+        "feasible": feasible,
+        "cost": COST_PER_KWH * e_star + COST_PER_KW * p_grid,
+    })
+    if feasible.any():
+        m = evaluate_sizes(load_kw, pv_kw, e_star[feasible], p_grid[feasible], dt_min, max_batch, degradation=True)
+        n_eval += int(feasible.sum())
+        for k, v in m.items():
+            frontier[k] = np.nan
+            frontier.loc[feasible, k] = v
+        frontier["lifecycle_cost"] = lifecycle_cost(frontier["cost"], frontier["life_years"])
+    else:
+        frontier["lifecycle_cost"] = np.nan
+    return frontier, n_eval
+
+def lifecycle_cost(cost, life_years):
+    # purchase cost incl. replacements when the cycle life is shorter than the project
+    return cost * np.maximum(1.0, PROJECT_YEARS / life_years)
+
+def lifecycle_frontier(load_kw, pv_kw, frontier: pd.DataFrame, e_max_kwh, tol_kwh=5.0, per_iter=4, dt_min=DT_MIN,
+                       max_batch=MAX_BATCH):
+    """
+    Lowest-lifecycle-cost E for every feasible P of a min_energy_frontier.
+
+    Every E >= e_min_kwh meets the target (metric non-increasing in E), but a larger
+    battery cycles shallower and may need fewer replacements. All P are searched together
+    on [e_min_kwh, e_max_kwh]: each round evaluates `per_iter` energies per P in one batch
+    and narrows to the neighbours of the cheapest point, down to tol_kwh. A grid search,
+    so a second cost minimum narrower than the first round's spacing can be missed.
+
+    Returns (DataFrame with the frontier's columns at the chosen E = e_kwh, number of simulated candidates).
+    """
+    f = frontier[frontier["feasible"]].reset_index(drop=True)
+    n_eval = 0
+    if f.empty:
+        return f.copy(), n_eval
+    p = f["p_max_kw"].to_numpy()
+    lo = f["e_min_kwh"].to_numpy(dtype=float, copy=True)
+    hi = np.full(len(f), float(e_max_kwh))
+    # best point so far per P, starting from the frontier itself
+    best_e = lo.copy()
+    best_cost = f["lifecycle_cost"].to_numpy(dtype=float, copy=True)
+    best_m = {k: f[k].to_numpy(dtype=float, copy=True) for k in f.columns if k not in ("p_max_kw", "e_min_kwh", "e_kwh",
+                                                                           "feasible", "cost", "lifecycle_cost")}
+    k = max(1, int(per_iter))
+    frac = np.arange(1, k + 1) / (k + 1)
+    while True:
+        open_ = hi - lo > tol_kwh
+        if not open_.any():
+            break
+        idx = np.flatnonzero(open_)
+        e_cand = lo[idx, None] + (hi[idx] - lo[idx])[:, None] * frac[None, :]
+        m = evaluate_sizes(load_kw, pv_kw, e_cand.ravel(), np.repeat(p[idx], k), dt_min, max_batch, degradation=True)
+        n_eval += e_cand.size
+        cost = lifecycle_cost(COST_PER_KWH * e_cand + COST_PER_KW * p[idx, None],
+                              m["life_years"].reshape(len(idx), k))
+        for r, j in enumerate(idx):
+            c = int(np.argmin(cost[r]))
+            if cost[r, c] < best_cost[j]:
+                best_e[j], best_cost[j] = e_cand[r, c], cost[r, c]
+                for key in best_m:
+                    best_m[key][j] = m[key][r * k + c]
+            # next bracket: the neighbours of the best point among lo, this round's energies and hi
+            pts = np.concatenate([[lo[j]], e_cand[r], [hi[j]]])
+            b = int(np.searchsorted(pts, best_e[j]))
+            above = b + 1 if pts[b] == best_e[j] else b
+            lo[j], hi[j] = pts[max(0, b - 1)], pts[min(len(pts) - 1, above)]
+
+    out = f.copy()
+    out["e_kwh"] = best_e
+    out["cost"] = COST_PER_KWH * best_e + COST_PER_KW * p
+    out["lifecycle_cost"] = best_cost
+    for key, v in best_m.items():
+        out[key] = v
+    return out, n_eval
+
+def best_size(frontier: pd.DataFrame, objective: str = SIZING_OBJECTIVE):
+    """
+    Cheapest feasible point by "capex" or "lifecycle" cost (row as dict, size = e_kwh / p_max_kw), or None.
+    For "lifecycle" pass the lifecycle_frontier, which searched E per P on that cost.
+    """
+    f = frontier[frontier["feasible"]]
+    if f.empty:
+        return None
+    return f.loc[f[OBJECTIVES[objective]].idxmin()].to_dict()
+
+def plot_frontier(frontier: pd.DataFrame, best, metric: str, target: float, out_png):
+    import matplotlib.pyplot as plt
+
+    f = frontier[frontier["feasible"]]
+    plt.figure(figsize=(8, 5))
+    plt.plot(f["p_max_kw"], f["e_min_kwh"], marker="o", label=f"min E with {metric} <= {target:g}")
+    if len(f):
+        plt.fill_between(f["p_max_kw"], f["e_min_kwh"], f["e_min_kwh"].max() * 1.1, alpha=0.15, label="feasible")
+    if best is not None:
+        plt.scatter([best["p_max_kw"]], [best["e_kwh"]], color="tab:red", zorder=3,
+                    label=f"min cost: E={best['e_kwh']:.0f} kWh, P={best['p_max_kw']:.0f} kW")
+    infeasible = frontier.loc[~frontier["feasible"], "p_max_kw"]
+    for p in infeasible:
+        plt.axvline(p, color="grey", alpha=0.3, linewidth=0.8)
+    plt.xlabel("BESS power limit (kW)")
+    plt.ylabel("BESS energy capacity (kWh)")
+    plt.title("BESS sizing feasibility frontier")
+    plt.grid(True, alpha=0.3)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(out_png, dpi=200)
+    plt.close()
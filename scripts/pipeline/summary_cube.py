@@ -0,0 +1,149 @@
+# Multi-resolution summary cube: daily / weekly / monthly / hour-of-day x month / season statistics in one table
+import numpy as np
+import pandas as pd
+
+from config import SIM_DIR, DT_H
+
+CUBE_PARQUET = SIM_DIR / "summary_cube.parquet"
+
+RESOLUTIONS = ("daily", "weekly", "monthly", "hour_month", "season")
+
+# period: start of the day / week / month; month + hour: hour_month; season: season
+KEY_COLUMNS = ("resolution", "period", "month", "hour", "season")
+
+# statistics kept per column; "outage" (unserved > 0) and "risk_event" are 0/1, so their
+# sum counts steps and their mean is the share of steps; unserved_kwh = unserved_kw * dt
+CUBE_STATS = {
+    "load_kw": ("mean",),
+    "pv_kw": ("mean",),
+    "net_kw": ("mean",),
+    "soc": ("mean", "min", "median", "max"),
+    "unserved_kw": ("mean", "median", "max"),
+    "unserved_kwh": ("sum",),
+    "risk_index": ("mean", "min", "median", "max"),
+    "risk_event": ("sum", "mean"),
+    "outage": ("sum", "mean"),
+}
+
+SEASONS = {12: "DJF", 1: "DJF", 2: "DJF", 3: "MAM", 4: "MAM", 5: "MAM",
+           6: "JJA", 7: "JJA", 8: "JJA", 9: "SON", 10: "SON", 11: "SON"}
+SEASON_ORDER = ("DJF", "MAM", "JJA", "SON")
+SEASON_CODE = np.array([-1] + [SEASON_ORDER.index(SEASONS[m]) for m in range(1, 13)])  # month -> season index
+
+def _values(df: pd.DataFrame, dt_h: float) -> pd.DataFrame:
+    unserved = df["unserved_kw"].to_numpy(dtype=float)
+    return pd.DataFrame({
+        "load_kw": df["load_kw"].to_numpy(dtype=float),
+        "pv_kw": df["pv_kw"].to_numpy(dtype=float),
+        "net_kw": df["net_kw"].to_numpy(dtype=float),
+        "soc": df["soc"].to_numpy(dtype=float),
+        "unserved_kw": unserved,
+        "unserved_kwh": unserved * dt_h,
+        "risk_index": df["risk_index"].to_numpy(dtype=float),
+        "risk_event": df["risk_event"].to_numpy().astype(float),
+        "outage": (unserved > 0.0).astype(float),
+    })
+
+def _keys(day: np.ndarray, hour: np.ndarray) -> dict:
+    # integer group keys of every resolution from the day number (days since 1970-01-01)
+    # and hour of a step or of a base group; integer keys group much faster than timestamps
+    month_idx = day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)  # months since 1970-01
+    month = month_idx % 12 + 1
+    return {
+        "daily": [day],
+        "weekly": [day - (day + 3) % 7],  # weeks start on Monday (1970-01-01 was a Thursday)
+        "monthly": [month_idx],
+        "hour_month": [month, hour],
+        "season": [SEASON_CODE[month]],
+    }
+
+def _period(res: str, key: np.ndarray) -> pd.DatetimeIndex:
+    unit = "M" if res == "monthly" else "D"
+    return pd.DatetimeIndex(key.astype(f"datetime64[{unit}]").astype("datetime64[ns]"))
+
+def build_cube(df: pd.DataFrame, dt_h: float = DT_H, resolutions=RESOLUTIONS) -> pd.DataFrame:
+    """
+    Results frame -> summary cube (one row per resolution and period).
+
+    One grouping pass over the steps by hour gives count / sum / min / max of every
+    column; all resolutions are rolled up from those partial rows (8760 per year). Only medians
+    cannot be rolled up, so the median columns get one group-by per resolution.
+    """
+    t = df["timestamp"].to_numpy().astype("datetime64[h]").astype(np.int64)  # hours since 1970-01-01
+    vals = _values(df, dt_h)
+    day, hour = t // 24, t % 24
+
+    g = vals.groupby(t, sort=True)
+    base_sum, base_min, base_max = g.sum(), g.min(), g.max()
+    base_sum["count"] = g.size()
+    base_t = base_sum.index.to_numpy()
+    base_keys = _keys(base_t // 24, base_t % 24)
+    step_keys = _keys(day, hour)
+    median_cols = [c for c, stats in CUBE_STATS.items() if "median" in stats]
+
+    frames = []
+    for res in resolutions:
+        keys = base_keys[res]
+        sums = base_sum.groupby(keys, sort=True).sum()
+        mins = base_min.groupby(keys, sort=True).min()
+        maxs = base_max.groupby(keys, sort=True).max()
+        med = vals[median_cols].groupby(step_keys[res], sort=True).median()
+        count = sums["count"].to_numpy()
+
+        cols = {"resolution": res}
+        idx = sums.index
+        if res in ("daily", "weekly", "monthly"):
+            cols["period"] = _period(res, idx.to_numpy())
+        elif res == "hour_month":
+            cols["month"] = idx.get_level_values(0).to_numpy().astype(np.int8)
+            cols["hour"] = idx.get_level_values(1).to_numpy().astype(np.int8)
+        else:
+            cols["season"] = np.asarray(SEASON_ORDER)[idx.to_numpy()]
+        cols["count"] = count
+        for col, stats in CUBE_STATS.items():
+            for stat in stats:
+                if stat == "sum":
+                    v = sums[col].to_numpy()
+                elif stat == "mean":
+                    v = sums[col].to_numpy() / count
+                elif stat == "min":
+                    v = mins[col].to_numpy()
+                elif stat == "max":
+                    v = maxs[col].to_numpy()
+                else:
+                    v = med[col].to_numpy()
+                cols[f"{col}_{stat}"] = v
+        frames.append(pd.DataFrame(cols))
+
+    cube = pd.concat(frames, ignore_index=True)
+    cube["resolution"] = pd.Categorical(cube["resolution"], categories=RESOLUTIONS)
+    cube["month"] = cube["month"].astype("Int8")
+    cube["hour"] = cube["hour"].astype("Int8")
+    cube["season"] = pd.Categorical(cube["season"], categories=SEASON_ORDER)
+    return cube[list(KEY_COLUMNS) + [c for c in cube.columns if c not in KEY_COLUMNS]]
+
+def write_cube(cube: pd.DataFrame, path=CUBE_PARQUET):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cube.to_parquet(path, index=False)
+    return path
+
+def read_cube(path=CUBE_PARQUET, resolution: str = None) -> pd.DataFrame:
+    """
+    Cube rows (of one resolution), without the key columns the resolution does not use
+    """
+    if resolution is not None and resolution not in RESOLUTIONS:
+        raise ValueError(f"unknown resolution {resolution!r} (expected one of {RESOLUTIONS})")
+    filters = [("resolution", "==", resolution)] if resolution else None
+    cube = pd.read_parquet(path, filters=filters)
+    if resolution is None:
+        return cube
+    used = {"hour_month": ("month", "hour"), "season": ("season",)}.get(resolution, ("period",))
+    unused = [c for c in KEY_COLUMNS[1:] if c not in used and c in cube.columns]
+    return cube.drop(columns=unused).reset_index(drop=True)
+
+def hour_month_grid(cube: pd.DataFrame, column: str = "risk_index_mean") -> pd.DataFrame:
+    """
+    hour (rows, 0-23) x month (columns, 1-12) table of one cube column
+    """
+    hm = cube[cube["resolution"] == "hour_month"] if "resolution" in cube.columns else cube
+    return hm.pivot(index="hour", columns="month", values=column).sort_index()
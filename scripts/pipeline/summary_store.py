@@ -0,0 +1,201 @@
+# Compact columnar summary store: one row of parameters + metrics per scenario (parquet)
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from config import (
+    SUMMARY_STORE,
+    LOAD_CSV, PV_CSV, ASSETS_CSV,
+    DT_MIN, H_STEPS, PV_KWP,
+    E_KWH, P_MAX_KW, SOC_MIN, SOC_MAX, SOC0, ETA_CH, ETA_DIS,
+    ALPHA, BETA, GAMMA,
+    DISPATCH_POLICY,
+)
+from scripts.pipeline.checkpoint import file_stamp
+from scripts.pipeline.inputs import processed_path
+
+# parameters that define a scenario (hashed into scenario_id)
+PARAM_KEYS = (
+    "site", "dt_min", "h_steps", "pv_kwp",
+    "e_kwh", "p_max_kw", "soc_min", "soc_max", "soc0", "eta_ch", "eta_dis",
+    "alpha", "beta", "gamma",
+    "policy", "inputs",
+)
+
+# keys added after the first release enter the hash only when they differ from
+# these values, so ids of existing stores stay valid
+HASH_DEFAULTS = {"policy": "reactive", "inputs": ""}
+
+# metrics from sim_core.compute_metrics
+METRIC_KEYS = (
+    "total_unserved_kwh", "pct_unserved_steps", "max_unserved_kw",
+    "pct_risk_steps", "max_risk_index",
+)
+
+# optional degradation metrics (degradation.py); NaN for rows written without them
+DEGRADATION_KEYS = ("efc_per_year", "damage_per_year", "life_years")
+
+_stamps = {}
+
+def input_fingerprint(*paths) -> str:
+    """
+    Short content hash of the input files of a run (None / missing files count as absent).
+    Part of the scenario id, so runs on other inputs with the same parameters get their own row.
+    """
+    stamps = []
+    for p in paths:
+        if p is None or not Path(p).exists():
+            stamps.append(None)
+            continue
+        p = Path(p).resolve()
+        st = p.stat()
+        memo = (str(p), st.st_size, st.st_mtime_ns)
+        if memo not in _stamps:
+            _stamps[memo] = file_stamp(p)
+        stamps.append(_stamps[memo])
+    key = json.dumps(stamps, separators=(",", ":"))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+def configured_inputs() -> str:
+    """
+    Fingerprint of the configured inputs: processed load / pv files and the asset table
+    """
+    return input_fingerprint(processed_path(LOAD_CSV), processed_path(PV_CSV), ASSETS_CSV)
+
+def scenario_params(**overrides) -> dict:
+    """
+    Scenario parameters = config values with `overrides` applied.
+    inputs: input_fingerprint() of the files the run reads (default: the configured inputs)
+    """
+    params = {
+        "site": "base",
+        "dt_min": DT_MIN, "h_steps": H_STEPS, "pv_kwp": PV_KWP,
+        "e_kwh": E_KWH, "p_max_kw": P_MAX_KW,
+        "soc_min": SOC_MIN, "soc_max": SOC_MAX, "soc0": SOC0,
+        "eta_ch": ETA_CH, "eta_dis": ETA_DIS,
+        "alpha": ALPHA, "beta": BETA, "gamma": GAMMA,
+        "policy": DISPATCH_POLICY,
+    }
+    if "inputs" not in overrides:
+        params["inputs"] = configured_inputs()
+    unknown = set(overrides) - set(PARAM_KEYS)
+    if unknown:
+        raise ValueError(f"unknown scenario parameters: {sorted(unknown)}")
+    params.update(overrides)
+
+    out = {}
+    for k in PARAM_KEYS:
+        v = params[k]
+        if k in ("site", "policy", "inputs"):
+            out[k] = str(v)
+        elif k == "h_steps":
+            out[k] = int(v)
+        else:
+            out[k] = float(v)
+    return out
+
+def scenario_id(params: dict) -> str:
+    """
+    Stable short hash of the scenario parameters (same parameters -> same id)
+    """
+    vals = [params[k] for k in PARAM_KEYS if k not in HASH_DEFAULTS or params[k] != HASH_DEFAULTS[k]]
+    key = json.dumps(vals, separators=(",", ":"))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+def make_row(params: dict, metrics: dict, source: str, steps: int = None, **extra) -> dict:
+    row = {"scenario_id": scenario_id(params), "source": source}
+    row.update(params)
+    for k in METRIC_KEYS:
+        row[k] = float(metrics[k])
+    for k in DEGRADATION_KEYS:
+        if k in metrics:
+            row[k] = float(metrics[k])
+    row["steps"] = int(steps) if steps is not None else -1
+    row.update(extra)
+    row["updated_utc"] = datetime.now(timezone.utc).replace(tzinfo=None)
+    return row
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    # metrics in float32, labels as categories; parameters stay float64 so they round-trip exactly
+    for k in METRIC_KEYS + DEGRADATION_KEYS:
+        if k in df.columns:
+            df[k] = df[k].astype("float32")
+    for k in ("source", "site", "policy"):
+        if k in df.columns:
+            df[k] = df[k].astype("category")
+    return df
+
+def read_store(path: Path = SUMMARY_STORE, columns=None) -> pd.DataFrame:
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame(columns=list(columns) if columns else ["scenario_id"])
+    return pd.read_parquet(path, columns=list(columns) if columns else None)
+
+@contextmanager
+def _locked(path: Path):
+    # exclusive lock on <store>.lock: concurrent writers wait instead of dropping each other's rows
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a+b") as f:
+        f.seek(0)
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def upsert(rows: list, path: Path = SUMMARY_STORE) -> pd.DataFrame:
+    """
+    Add scenario rows to the store; a scenario already present is replaced by the new row.
+    Read, merge and replace run under a file lock, so parallel runs never lose rows.
+    """
+    path = Path(path)
+    with _locked(path):
+        return _merge_write(pd.DataFrame(rows), path)
+
+def _merge_write(new: pd.DataFrame, path: Path) -> pd.DataFrame:
+    if path.exists():
+        old = pd.read_parquet(path)
+        for k in ("source", "site", "policy"):
+            if k in old.columns:
+                old[k] = old[k].astype(object)
+        new = pd.concat([old, new], ignore_index=True)
+        # rows written before a key existed get its default
+        for k, v in HASH_DEFAULTS.items():
+            if k in new.columns:
+                new[k] = new[k].fillna(v)
+    df = new.drop_duplicates(subset="scenario_id", keep="last").reset_index(drop=True)
+    df = _compact(df)
+
+    tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return df
+
+def lookup(sid: str, path: Path = SUMMARY_STORE):
+    """
+    Row of one scenario as a dict, or None
+    """
+    df = read_store(path)
+    if df.empty or "scenario_id" not in df.columns:
+        return None
+    hit = df[df["scenario_id"] == sid]
+    if hit.empty:
+        return None
+    return hit.iloc[-1].to_dict()
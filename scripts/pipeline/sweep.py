@@ -0,0 +1,99 @@
+# Parameter sweeps over the simulation core (time base, BESS energy / power)
+import itertools
+import time
+
+import pandas as pd
+
+from config import DT_MIN, H_HOURS, E_KWH, P_MAX_KW, ALIGN_FILL_POLICY, SUMMARY_STORE, DISPATCH_POLICY
+from scripts.pipeline.degradation import degradation_metrics
+from scripts.pipeline.resample import load_inputs
+from scripts.pipeline.sim_core import compute_metrics, simulate
+from scripts.pipeline.summary_store import make_row, scenario_id, scenario_params, upsert
+
+def sweep_points(dt_mins=(DT_MIN,), e_kwhs=(E_KWH,), p_max_kws=(P_MAX_KW,), policies=(DISPATCH_POLICY,)) -> list:
+    """
+    Full grid of sweep points. The forecast horizon is kept at H_HOURS, so
+    h_steps follows the time base.
+    """
+    points = []
+    for dt_min, e_kwh, p_max_kw, policy in itertools.product(dt_mins, e_kwhs, p_max_kws, policies):
+        points.append({
+            "dt_min": float(dt_min),
+            "h_steps": max(1, int(round(H_HOURS * 60.0 / dt_min))),
+            "e_kwh": float(e_kwh),
+            "p_max_kw": float(p_max_kw),
+            "policy": policy,
+        })
+    return points
+
+def point_key(point: dict) -> str:
+    # work unit key for checkpoints: the scenario id of the point
+    return scenario_id(scenario_params(**point))
+
+def run_point(point: dict, inputs: dict, dataset=None) -> dict:
+    dt_min = point["dt_min"]
+    t0 = time.perf_counter()
+    if dt_min not in inputs:
+        inputs[dt_min] = load_inputs(dt_min, ALIGN_FILL_POLICY)
+    ts, load_kw, pv_kw, _ = inputs[dt_min]
+    t_load = time.perf_counter() - t0
+
+    dt_h = dt_min / 60.0
+    t0 = time.perf_counter()
+    res = simulate(
+        load_kw, pv_kw,
+        dt_h=dt_h,
+        h_steps=point["h_steps"],
+        e_kwh=point["e_kwh"],
+        p_max_kw=point["p_max_kw"],
+        policy=point["policy"],
+    )
+    t_sim = time.perf_counter() - t0
+
+    metrics = compute_metrics(res, dt_h)
+    deg = degradation_metrics(res["soc"], dt_h)
+    metrics.update({k: deg[k] for k in ("efc_per_year", "damage_per_year", "life_years")})
+    row = make_row(scenario_params(**point), metrics, "sweep", steps=len(ts))
+    row["load_s"] = t_load
+    row["sim_s"] = t_sim
+    if dataset is not None:
+        from scripts.pipeline.results_dataset import write_partitions
+        from scripts.pipeline.simulate_microgrid import build_results_frame
+
+        write_partitions(build_results_frame(ts, load_kw, pv_kw, res), row["site"], row["scenario_id"], dataset)
+    return row
+
+def run_sweep(points: list, store=SUMMARY_STORE, checkpoint=None, dataset=None) -> pd.DataFrame:
+    """
+    Run every point; rows are also added to the summary store unless store is None.
+    dataset: results dataset folder that also gets every point's full time series.
+    checkpoint: RunCheckpoint keyed by point_key - every finished point is recorded at
+    once, and points it already holds (resumed run) are not simulated again.
+    """
+    inputs = {}
+    rows = []
+    skipped = 0
+    for k, point in enumerate(points, start=1):
+        if checkpoint is not None and checkpoint.is_done(point_key(point)):
+            skipped += 1
+            continue
+        row = run_point(point, inputs, dataset)
+        if checkpoint is not None:
+            checkpoint.add(point_key(point), row)
+        rows.append(row)
+        print(f"[{k}/{len(points)}] {row['policy']} dt={row['dt_min']:g}min E={row['e_kwh']:g}kWh P={row['p_max_kw']:g}kW "
+              f"-> unserved {row['total_unserved_kwh']:.1f} kWh, risk {row['pct_risk_steps']:.2f}% "
+              f"({row['steps']} steps, load {row['load_s']:.2f}s, sim {row['sim_s']:.2f}s)")
+    if checkpoint is not None:
+        if skipped:
+            print(f"resumed: {skipped} points taken from the checkpoint")
+        rows = checkpoint.rows().to_dict("records")
+    if store is not None and rows:
+        upsert(rows, store)
+        print(f"Saved {len(rows)} scenarios to summary store: {store}")
+    if dataset is not None and rows:
+        from scripts.pipeline.results_dataset import add_scenarios
+
+        add_scenarios(rows, dataset)
+        print(f"Saved {len(rows)} scenarios to results dataset: {dataset}")
+    return pd.DataFrame(rows)
@@ -0,0 +1,338 @@
+# Live telemetry service (asyncio): ingest load / PV measurements, update the risk state per step
+# and publish risk index + reserve-deficit warnings to subscribers
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from config import TELEMETRY_QUEUE_SIZE, TELEMETRY_BACKPRESSURE
+from scripts.pipeline.summary_store import scenario_params
+
+# fields of one measurement line on a socket: site,timestamp,load_kw,pv_kw
+LINE_FIELDS = ("site", "timestamp", "load_kw", "pv_kw")
+BACKPRESSURE_POLICIES = ("drop_oldest", "block")
+
+class SiteRiskState:
+    """
+    Per-site state of the reactive BESS + reserve check, advanced one measurement at a time.
+
+    Same arithmetic as sim_core.simulate with a full forecast horizon at every step
+    (offline runs shorten it over the last h_steps - 1 steps of the series).
+    """
+
+    __slots__ = ("site", "dt_h", "h_steps", "e_kwh", "p_max_kw", "soc_min", "soc_max", "eta_ch", "eta_dis",
+                 "alpha", "beta", "gamma", "soc", "last_ts", "warning", "steps")
+
+    def __init__(self, site: str, params: dict):
+        self.site = site
+        self.dt_h = params["dt_min"] / 60.0
+        self.h_steps = params["h_steps"]
+        for k in ("e_kwh", "p_max_kw", "soc_min", "soc_max", "eta_ch", "eta_dis", "alpha", "beta", "gamma"):
+            setattr(self, k, params[k])
+        self.soc = params["soc0"]
+        self.last_ts = None
+        self.warning = False
+        self.steps = 0
+
+    def step(self, ts: str, load_kw: float, pv_kw: float) -> dict:
+        dt_h = self.dt_h
+        e_kwh = self.e_kwh
+        net = load_kw - pv_kw
+        soc = self.soc
+        soc_pre = soc
+
+        e_avail_dis = max(0.0, (soc - self.soc_min) * e_kwh)
+        p_dis_feasible = min(self.p_max_kw, e_avail_dis / dt_h)
+
+        batt_p = 0.0
+        unserved = 0.0
+        if net > 0.0:
+            batt_p = min(net, p_dis_feasible)
+            soc -= (batt_p * dt_h) / (self.eta_dis * e_kwh)
+            unserved = max(0.0, net - batt_p)
+        elif net < 0.0:
+            e_avail_chg = max(0.0, (self.soc_max - soc) * e_kwh)
+            batt_p = -min(-net, min(self.p_max_kw, e_avail_chg / dt_h))
+            soc += (-batt_p * dt_h * self.eta_ch) / e_kwh
+        self.soc = min(self.soc_max, max(self.soc_min, soc))
+
+        p_req = max(net, 0.0)
+        e_req = p_req * self.h_steps * dt_h
+        res_def_p = max(0.0, p_req - p_dis_feasible)
+        res_def_e = max(0.0, e_req - e_avail_dis)
+        risk_index = self.alpha * unserved + self.beta * res_def_p + self.gamma * res_def_e
+
+        # early warning as in predictive_vs_reactive: any reserve deficit
+        warning = res_def_p > 0.0 or res_def_e > 0.0
+        event = None
+        if warning != self.warning:
+            event = "warning_on" if warning else "warning_off"
+            self.warning = warning
+        self.last_ts = ts
+        self.steps += 1
+
+        return {
+            "site": self.site,
+            "timestamp": ts,
+            "load_kw": load_kw,
+            "pv_kw": pv_kw,
+            "net_kw": net,
+            "soc_pre": soc_pre,
+            "soc": self.soc,
+            "batt_p_kw": batt_p,
+            "unserved_kw": unserved,
+            "p_req_kw": p_req,
+            "e_req_kwh": e_req,
+            "p_dis_feasible_kw": p_dis_feasible,
+            "e_dis_avail_kwh": e_avail_dis,
+            "reserve_deficit_p_kw": res_def_p,
+            "reserve_deficit_e_kwh": res_def_e,
+            "risk_index": risk_index,
+            "warning": warning,
+            "event": event,
+        }
+
+class Subscriber:
+    """
+    Bounded queue of update batches. When the consumer falls behind:
+    "drop_oldest" discards the oldest queued batch (counted in `dropped`),
+    "block" makes the publisher wait, which stalls ingestion and pushes back on the sources.
+    """
+
+    def __init__(self, maxsize=TELEMETRY_QUEUE_SIZE, policy=TELEMETRY_BACKPRESSURE, warnings_only=False):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"unknown backpressure policy {policy!r} (expected one of {BACKPRESSURE_POLICIES})")
+        self.queue = asyncio.Queue(maxsize)
+        self.policy = policy
+        self.warnings_only = warnings_only
+        self.delivered = 0
+        self.dropped = 0
+
+    async def put(self, updates: list):
+        if self.warnings_only:
+            updates = [u for u in updates if u["event"] is not None]
+            if not updates:
+                return
+        if self.policy == "block":
+            await self.queue.put(updates)
+            return
+        while self.queue.full():
+            self.dropped += len(self.queue.get_nowait())
+        self.queue.put_nowait(updates)
+
+    async def get(self) -> list:
+        updates = await self.queue.get()
+        self.delivered += len(updates)
+        return updates
+
+class Hub:
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe(self, maxsize=TELEMETRY_QUEUE_SIZE, policy=TELEMETRY_BACKPRESSURE, warnings_only=False) -> Subscriber:
+        sub = Subscriber(maxsize, policy, warnings_only)
+        self.subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        if sub in self.subscribers:
+            self.subscribers.remove(sub)
+
+    async def publish(self, updates: list):
+        for sub in list(self.subscribers):
+            await sub.put(updates)
+
+class TelemetryService:
+    """
+    Risk state of every site seen so far. Sites missing from `site_params` run with
+    the config.py scenario parameters. With a FlatForest (forest.py) every update also
+    gets the early-warning model probability, scored once per batch for all sites.
+    """
+
+    def __init__(self, site_params: dict = None, hub: Hub = None, forest=None):
+        self.site_params = site_params or {}
+        self.forest = forest
+        self.default_params = scenario_params()
+        self.hub = hub or Hub()
+        self.states = {}
+        self.stats = {"records": 0, "stale": 0, "bad_lines": 0}
+
+    def state(self, site: str) -> SiteRiskState:
+        st = self.states.get(site)
+        if st is None:
+            st = SiteRiskState(site, self.site_params.get(site, self.default_params))
+            self.states[site] = st
+        return st
+
+    def ingest(self, records) -> list:
+        """
+        Advance the sites by a batch of (site, timestamp, load_kw, pv_kw) -> updates.
+        Repeated or older timestamps of a site are skipped (ISO timestamps compare as strings).
+        """
+        updates = []
+        for site, ts, load_kw, pv_kw in records:
+            st = self.state(site)
+            if st.last_ts is not None and ts <= st.last_ts:
+                self.stats["stale"] += 1
+                continue
+            updates.append(st.step(ts, load_kw, pv_kw))
+        self.stats["records"] += len(updates)
+        if self.forest is not None and updates:
+            cols = self.forest.feature_names
+            proba = self.forest.predict_proba1([[u[c] for c in cols] for u in updates])
+            for u, p in zip(updates, proba.tolist()):
+                u["warning_proba"] = p
+        return updates
+
+    async def run_source(self, source):
+        """
+        Ingest every batch of an async source and publish the updates
+        """
+        async for batch in source:
+            if batch:
+                updates = self.ingest(batch)
+                if updates:
+                    await self.hub.publish(updates)
+
+    def parse_lines(self, lines) -> list:
+        out = []
+        for line in lines:
+            rec = parse_line(line)
+            if rec is None:
+                if line.strip():
+                    self.stats["bad_lines"] += 1
+                continue
+            out.append(rec)
+        return out
+
+def parse_line(line: str):
+    """
+    "site,timestamp,load_kw,pv_kw" -> tuple, or None for a malformed line
+    """
+    parts = line.strip().split(",")
+    if len(parts) != len(LINE_FIELDS):
+        return None
+    try:
+        return parts[0], parts[1], float(parts[2]), float(parts[3])
+    except ValueError:
+        return None
+
+# Sources: async generators of record batches
+
+async def tail_csv(path, service: TelemetryService, site: str = None, poll_s: float = 0.2, stop: asyncio.Event = None):
+    """
+    Follow a growing CSV (header with timestamp, load_kw, pv_kw and optionally site).
+    Only complete lines are read, so a half-written last line waits for the next poll.
+    """
+    path = Path(path)
+    site = site or path.stem
+    while not path.exists():
+        if stop is not None and stop.is_set():
+            return
+        await asyncio.sleep(poll_s)
+
+    with open(path, "r", encoding="utf-8") as f:
+        header = ""
+        while not header.endswith("\n"):
+            header += f.readline()
+            if not header.endswith("\n"):
+                await asyncio.sleep(poll_s)
+        cols = header.strip().split(",")
+        i_ts, i_load, i_pv = cols.index("timestamp"), cols.index("load_kw"), cols.index("pv_kw")
+        i_site = cols.index("site") if "site" in cols else None
+
+        buf = ""
+        while True:
+            chunk = f.read(1 << 16)
+            if not chunk:
+                if stop is not None and stop.is_set():
+                    return
+                await asyncio.sleep(poll_s)
+                continue
+            buf += chunk
+            lines = buf.split("\n")
+            buf = lines.pop()
+            batch = []
+            for line in lines:
+                parts = line.strip().split(",")
+                try:
+                    batch.append((parts[i_site] if i_site is not None else site, parts[i_ts],
+                                  float(parts[i_load]), float(parts[i_pv])))
+                except (IndexError, ValueError):
+                    if line.strip():
+                        service.stats["bad_lines"] += 1
+            yield batch
+
+async def stream_lines(reader: asyncio.StreamReader, service: TelemetryService, chunk: int = 1 << 16):
+    """
+    Measurement lines from a socket connection, one batch per read
+    """
+    buf = b""
+    while True:
+        data = await reader.read(chunk)
+        if not data:
+            break
+        buf += data
+        lines = buf.split(b"\n")
+        buf = lines.pop()
+        yield service.parse_lines(ln.decode("utf-8", "replace") for ln in lines)
+    if buf:
+        yield service.parse_lines([buf.decode("utf-8", "replace")])
+
+async def serve_ingest(service: TelemetryService, unix_path=None, host: str = None, port: int = None):
+    """
+    Accept measurement connections on a UNIX socket and/or a local TCP port -> list of servers
+    """
+    async def handle(reader, writer):
+        try:
+            await service.run_source(stream_lines(reader, service))
+        finally:
+            writer.close()
+
+    servers = []
+    if unix_path is not None:
+        Path(unix_path).unlink(missing_ok=True)
+        servers.append(await asyncio.start_unix_server(handle, path=str(unix_path)))
+    if port is not None:
+        servers.append(await asyncio.start_server(handle, host or "127.0.0.1", port))
+    return servers
+
+async def serve_subscribers(hub: Hub, host: str = "127.0.0.1", port: int = None, warnings_only: bool = False):
+    """
+    Publish updates as JSON lines to every client connecting to host:port. A slow client
+    only affects its own queue (TELEMETRY_BACKPRESSURE).
+    """
+    async def handle(reader, writer):
+        sub = hub.subscribe(warnings_only=warnings_only)
+        try:
+            while True:
+                updates = await sub.get()
+                writer.write("".join(json.dumps(u) + "\n" for u in updates).encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            hub.unsubscribe(sub)
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+async def log_warnings(sub: Subscriber, out_path=None):
+    """
+    Print warning transitions (and append them to a JSONL file)
+    """
+    f = open(out_path, "a", encoding="utf-8") if out_path else None
+    try:
+        while True:
+            for u in await sub.get():
+                if u["event"] is None:
+                    continue
+                print(f"{u['timestamp']} {u['site']}: {u['event']} (risk {u['risk_index']:.1f}, "
+                      f"reserve deficit {u['reserve_deficit_p_kw']:.1f} kW / {u['reserve_deficit_e_kwh']:.1f} kWh, "
+                      f"SoC {u['soc']:.2f})")
+                if f is not None:
+                    f.write(json.dumps(dict(u, received_unix=time.time())) + "\n")
+                    f.flush()
+    finally:
+        if f is not None:
+            f.close()
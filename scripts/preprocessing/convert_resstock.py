@@ -11,23 +11,38 @@ inp = ROOT / "data" / "raw" / "resstock_building.parquet"
 # processed output filename/path (===CHANGE THESE===)
 out = ROOT / "data" / "processed" / "load_15min.csv"
 
-out.parent.mkdir(parents=True, exist_ok=True)
-
-df = pd.read_parquet(inp)
-
-print("Columns:", list(df.columns))
-print(df.head())
-
-candidate_cols = [c for c in df.columns if "electric" in c.lower() and ("total" in c.lower() or "site" in c.lower())]
-print("Candidate cols:", candidate_cols)
-
-load_col = candidate_cols[0]
-
-if "timestamp" in df.columns:
-    ts = pd.to_datetime(df["timestamp"])
-else:
-    ts = pd.to_datetime(df.index)
-
-out_df = pd.DataFrame({"timestamp": ts, "load_kwh": df[load_col].astype(float)})
-out_df.to_csv(out, index=False)
-print("Wrote:", out)
\ No newline at end of file
+def read_raw(path: Path = inp) -> pd.DataFrame:
+    return pd.read_parquet(path)
+
+def convert_resstock(df: pd.DataFrame, verbose: bool = False) -> pd.DataFrame:
+    """
+    Raw ResStock frame -> [timestamp, load_kwh]
+    """
+    candidate_cols = [c for c in df.columns if "electric" in c.lower() and ("total" in c.lower() or "site" in c.lower())]
+    if verbose:
+        print("Columns:", list(df.columns))
+        print(df.head())
+        print("Candidate cols:", candidate_cols)
+    if not candidate_cols:
+        raise RuntimeError("no total/site electricity column found in ResStock data")
+
+    load_col = candidate_cols[0]
+
+    if "timestamp" in df.columns:
+        ts = pd.to_datetime(df["timestamp"])
+    else:
+        ts = pd.to_datetime(df.index)
+
+    return pd.DataFrame({
+        "timestamp": ts.to_numpy(),
+        "load_kwh": df[load_col].astype(float).to_numpy(),
+    })
+
+def main() -> None:
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out_df = convert_resstock(read_raw(), verbose=True)
+    out_df.to_csv(out, index=False)
+    print("Wrote:", out)
+
+if __name__ == "__main__":
+    main()
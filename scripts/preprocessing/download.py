@@ -0,0 +1,265 @@
+# Raw dataset downloads: bounded thread pool, HTTP range resume, sha256 checks, content-addressed cache, local mirrors
+# (standard library only - run_all.py downloads before the requirements are installed)
+import csv
+import hashlib
+import http.client
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from config import (
+    DOWNLOAD_CACHE_DIR, DOWNLOAD_MANIFEST, DOWNLOAD_MIRRORS,
+    DOWNLOAD_RETRIES, DOWNLOAD_TIMEOUT_S, DOWNLOAD_WORKERS,
+)
+
+BLOCK = 1 << 20
+USER_AGENT = "microgrid-case-study-downloader"
+
+_manifest_lock = threading.Lock()
+
+class DownloadError(RuntimeError):
+    pass
+
+class ChecksumError(DownloadError):
+    pass
+
+def sha256_file(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def object_path(sha256: str, cache_dir=DOWNLOAD_CACHE_DIR) -> Path:
+    # content-addressed: the file name is its checksum, so equal files are stored once
+    return Path(cache_dir) / "objects" / sha256[:2] / sha256
+
+def read_manifest(path=DOWNLOAD_MANIFEST) -> dict:
+    path = Path(path)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+def _record(path, name: str, entry: dict):
+    # checksums of downloaded files are pinned here; later runs verify against them
+    path = Path(path)
+    with _manifest_lock:
+        manifest = read_manifest(path)
+        manifest[name] = dict(manifest.get(name, {}), **entry)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+
+def read_download_list(path, dest_dir) -> list:
+    """
+    CSV with columns name, url and optionally sha256 -> download items saved as dest_dir/name
+    """
+    path = Path(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    if rows and not {"name", "url"} <= set(rows[0]):
+        raise ValueError(f"download list {path} needs columns name, url (optional: sha256)")
+    return [{"name": r["name"], "url": r["url"], "dest": Path(dest_dir) / r["name"], "sha256": r.get("sha256") or None}
+            for r in rows]
+
+def _sources(item: dict, mirrors) -> list:
+    # mirrors first (a local folder or an http(s) base URL with the files by name), then the original URL
+    out = []
+    for m in mirrors:
+        m = str(m)
+        if m.startswith(("http://", "https://")):
+            out.append(m.rstrip("/") + "/" + quote(item["name"]))
+        else:
+            out.append(Path(m) / item["name"])
+    out.append(item["url"])
+    return out
+
+def _part_path(source, cache_dir) -> Path:
+    # one partial file per source, so a resume never mixes bytes of two servers
+    key = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir) / "partial" / f"{key}.part"
+
+def _total_size(headers):
+    # full file size from "Content-Range: bytes a-b/total" (206) or "bytes */total" (416), None if not given
+    total = (headers.get("Content-Range") or "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+def _fetch_http(url: str, part: Path, timeout: float) -> tuple:
+    """
+    Download url into part, continuing an existing part with a range request.
+    Returns (bytes that were already there, complete): complete is False when the server
+    sent nothing to check the body length against (no Content-Length / Content-Range,
+    not chunked). A short body raises and keeps the part, so the next attempt resumes it.
+    """
+    have = part.stat().st_size if part.exists() else 0
+    headers = {"User-Agent": USER_AGENT}
+    if have:
+        headers["Range"] = f"bytes={have}-"
+    try:
+        resp = urlopen(Request(url, headers=headers), timeout=timeout)
+    except HTTPError as e:
+        if e.code == 416 and have:
+            # nothing left to fetch: the part is complete if it has the size the server reports
+            total = _total_size(e.headers)
+            if total is not None and total != have:
+                part.unlink()
+                raise DownloadError(f"partial file has {have} bytes, server reports {total} - starting over")
+            return have, total is not None
+        raise
+    with resp:
+        if have and resp.status != 206:
+            have = 0  # server ignored the range: the body is the whole file
+        length = resp.headers.get("Content-Length")
+        total = _total_size(resp.headers) if have else None
+        chunked = "chunked" in (resp.headers.get("Transfer-Encoding") or "").lower()
+        got = 0
+        with open(part, "ab" if have else "wb") as f:
+            try:
+                while block := resp.read(BLOCK):
+                    f.write(block)
+                    got += len(block)
+            except http.client.IncompleteRead as e:
+                # a chunked body that ends before its last chunk; keep what arrived for the resume
+                f.write(e.partial)
+                got += len(e.partial)
+                raise DownloadError(f"connection closed after {got} bytes") from None
+    if length is not None and got < int(length):
+        raise DownloadError(f"connection closed after {got} of {length} bytes")
+    if total is not None and have + got < total:
+        raise DownloadError(f"connection closed at byte {have + got} of {total}")
+    return have, length is not None or total is not None or chunked
+
+def _place(obj: Path, dest: Path):
+    # hard link from the cache (no second copy on disk); copy across file systems
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + f".tmp{os.getpid()}")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(obj, tmp)
+    except OSError:
+        shutil.copyfile(obj, tmp)
+    os.replace(tmp, dest)
+
+def fetch(item: dict, cache_dir=DOWNLOAD_CACHE_DIR, mirrors=DOWNLOAD_MIRRORS, timeout: float = DOWNLOAD_TIMEOUT_S,
+          retries: int = DOWNLOAD_RETRIES, manifest=DOWNLOAD_MANIFEST, force: bool = False) -> dict:
+    """
+    One download item {name, url, dest, sha256 (optional)} -> result dict.
+    The expected checksum is the item's or the one pinned in the manifest by an earlier download.
+    Order: existing dest file, cache object, mirrors, original URL; each source is tried
+    `retries` times (network errors back off and resume the partial file).
+    Only verified files get their checksum pinned: a download whose length the server gave
+    no way to check, or an existing file without a checksum that could not be fetched again,
+    is kept with status "unverified".
+    """
+    name, dest = item["name"], Path(item["dest"])
+    expected = item.get("sha256") or read_manifest(manifest).get(name, {}).get("sha256")
+    t0 = time.perf_counter()
+    result = {"name": name, "dest": str(dest), "source": None, "resumed_bytes": 0}
+
+    def done(status, sha, source=None):
+        verified = status != "unverified"
+        _record(manifest, name, {"url": item["url"], "sha256": sha if verified else None,
+                                 "bytes": dest.stat().st_size, "verified": verified})
+        return dict(result, status=status, sha256=sha, source=source, bytes=dest.stat().st_size,
+                    seconds=time.perf_counter() - t0)
+
+    keep_unverified = False
+    if not force:
+        if dest.exists():
+            sha = sha256_file(dest)
+            if sha == expected:
+                return done("present", sha)
+            if expected is None:
+                # e.g. left by an interrupted download: never pinned without a check
+                print(f"{name}: no checksum for {dest} - fetching again to verify it")
+                keep_unverified = True
+            else:
+                print(f"{name}: checksum of {dest} does not match - fetching again")
+        if expected is not None:
+            obj = object_path(expected, cache_dir)
+            if obj.exists() and sha256_file(obj) == expected:
+                _place(obj, dest)
+                return done("cached", expected, str(obj))
+
+    errors = []
+    for source in _sources(item, mirrors):
+        part = _part_path(source, cache_dir)
+        part.parent.mkdir(parents=True, exist_ok=True)
+        for attempt in range(max(1, retries)):
+            try:
+                complete = True
+                if isinstance(source, Path):
+                    shutil.copyfile(source, part)
+                else:
+                    result["resumed_bytes"], complete = _fetch_http(source, part, timeout)
+                sha = sha256_file(part)
+                if expected is not None and sha != expected:
+                    part.unlink()
+                    raise ChecksumError(f"sha256 {sha[:12]}... != expected {expected[:12]}...")
+                obj = object_path(sha, cache_dir)
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(part, obj)
+                _place(obj, dest)
+                if expected is None and not complete:
+                    print(f"{name}: server sent no length to check the download against - not pinning its checksum")
+                    return done("unverified", sha, str(source))
+                return done("downloaded", sha, str(source))
+            except (FileNotFoundError, ChecksumError) as e:
+                errors.append(f"{source}: {e}")
+                break
+            except HTTPError as e:
+                errors.append(f"{source}: HTTP {e.code}")
+                if e.code < 500:
+                    break
+            except (URLError, OSError, DownloadError) as e:
+                # timeouts, refused / reset connections, short bodies
+                errors.append(f"{source}: {getattr(e, 'reason', e)}")
+            if attempt + 1 < retries:
+                time.sleep(min(2.0 ** attempt, 10.0))
+    if keep_unverified and dest.exists():
+        print(f"{name}: could not fetch again ({errors[-1] if errors else 'no source'}) - keeping {dest} unverified")
+        return done("unverified", sha256_file(dest))
+    raise DownloadError(f"{name}: every source failed:\n  " + "\n  ".join(errors))
+
+def _fetch_safe(args):
+    item, kw = args
+    try:
+        return fetch(item, **kw)
+    except Exception as e:
+        return {"name": item["name"], "dest": str(item["dest"]), "status": "failed", "error": f"{type(e).__name__}: {e}"}
+
+def download_all(items: list, workers: int = DOWNLOAD_WORKERS, cache_dir=DOWNLOAD_CACHE_DIR, mirrors=DOWNLOAD_MIRRORS,
+                 timeout: float = DOWNLOAD_TIMEOUT_S, retries: int = DOWNLOAD_RETRIES, manifest=DOWNLOAD_MANIFEST,
+                 force: bool = False) -> list:
+    """
+    Fetch all items with at most `workers` downloads at a time -> one result dict per item
+    (in item order). Raises DownloadError after all items ran if any of them failed.
+    """
+    names = [it["name"] for it in items]
+    if len(set(names)) != len(names):
+        raise ValueError("download item names must be unique")
+    kw = dict(cache_dir=cache_dir, mirrors=list(mirrors), timeout=timeout, retries=retries, manifest=manifest, force=force)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items) or 1))) as pool:
+        results = list(pool.map(_fetch_safe, [(it, kw) for it in items]))
+
+    for r in results:
+        if r["status"] == "failed":
+            print(f"failed     {r['name']}: {r['error']}")
+        else:
+            resumed = f", resumed at {r['resumed_bytes']} bytes" if r["resumed_bytes"] else ""
+            src = f" from {r['source']}" if r["source"] else ""
+            print(f"{r['status']:<10} {r['name']} ({r['bytes'] / 1e6:.1f} MB, {r['seconds']:.1f}s{src}{resumed})")
+    n_bytes = sum(r.get("bytes", 0) for r in results if r["status"] in ("downloaded", "unverified") and r["source"])
+    print(f"downloads: {len(results)} files, {n_bytes / 1e6:.1f} MB fetched in {time.perf_counter() - t0:.1f}s")
+
+    failed = [r for r in results if r["status"] == "failed"]
+    if failed:
+        raise DownloadError(f"{len(failed)} of {len(results)} downloads failed: {', '.join(r['name'] for r in failed)}")
+    return results
@@ -11,14 +11,36 @@ inp = ROOT / "data" / "processed" / "load_15min.csv"
 # output file/path (===CHANGE THESE===)
 out = ROOT / "data" / "processed" / "load_15min_kw.csv"
 
-out.parent.mkdir(parents=True, exist_ok=True)
-
-df = pd.read_csv(inp)
-df["timestamp"] = pd.to_datetime(df["timestamp"])
-
-# interval duration in hours (===CHANGE THESE===)
-df["load_kw"] = df["load_kwh"] / 0.25
-
-df[["timestamp", "load_kw"]].to_csv(out, index=False)
-print("Wrote:", out)
-print(df[["timestamp", "load_kw"]].head())
\ No newline at end of file
+# interval duration in hours, None = infer from the timestamps (===CHANGE THESE===)
+INTERVAL_H = None
+
+def infer_interval_h(ts: pd.Series) -> float:
+    step = pd.to_datetime(ts).diff().median()
+    if pd.isna(step) or step <= pd.Timedelta(0):
+        raise RuntimeError("cannot infer load interval from timestamps - set INTERVAL_H")
+    return step / pd.Timedelta(hours=1)
+
+def to_power(df: pd.DataFrame, interval_h: float = INTERVAL_H) -> pd.DataFrame:
+    """
+    [timestamp, load_kwh] -> [timestamp, load_kw]
+    """
+    if interval_h is None:
+        interval_h = infer_interval_h(df["timestamp"])
+    return pd.DataFrame({
+        "timestamp": df["timestamp"].to_numpy(),
+        "load_kw": df["load_kwh"].to_numpy(dtype=float) / interval_h,
+    })
+
+def main() -> None:
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    df = pd.read_csv(inp)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+
+    out_df = to_power(df)
+    out_df.to_csv(out, index=False)
+    print("Wrote:", out)
+    print(out_df.head())
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 # This script analyses raw PVGIS hourly CSV export and converts it into 15-minute PV power (kW) (for operators: only change sections that are marked with ===CHANGE THESE===)
 
 import pandas as pd
-from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -12,49 +12,120 @@ INP = ROOT / "data" / "raw" / "pvgis_seriescalc_utqiagvik_2018.csv"
 # output file/path (===CHANGE THESE===)
 OUT = ROOT / "data" / "processed" / "pv_15min_kw.csv"
 
-OUT.parent.mkdir(parents=True, exist_ok=True)
+# PV source timestamp format (===CHANGE THESE===)
+TIME_FORMAT = "%Y%m%d:%H%M"
 
-with open(INP, "r", encoding="utf-8") as f:
-    lines = f.readlines()
+# 15min resampling interval (===CHANGE THESE===)
+RESAMPLE_RULE = "15min"
 
-start_idx = None
-for i, line in enumerate(lines):
-    if line.strip().lower().startswith("time,"):
-        start_idx = i
-        break
-if start_idx is None:
-    raise RuntimeError("Could not find PVGIS table header line starting with 'time,'")
+# PVGIS columns kept from the table (===CHANGE THESE===)
+PV_COLUMNS = ("time", "P")
 
-header = lines[start_idx].strip()
-data_lines = [header]
+def _is_data_row(s: str) -> bool:
+    return len(s) >= 13 and s[0:8].isdigit() and s[8] == ":" and s[9:13].isdigit()
 
-for line in lines[start_idx + 1:]:
-    s = line.strip()
-    if not s:
-        continue
-    if len(s) >= 13 and s[0:8].isdigit() and s[8] == ":" and s[9:13].isdigit():
-        data_lines.append(s)
-    else:
-        pass
+class _PvgisTableStream:
+    """
+    Read-only file-like view of the PVGIS table: header line + data rows, stops at the footer
+    """
 
-csv_text = "\n".join(data_lines)
-df = pd.read_csv(StringIO(csv_text))
+    def __init__(self, f):
+        self._f = f
+        self._done = False
+        self._header = None
+        for line in f:
+            if line.strip().lower().startswith("time,"):
+                self._header = line.strip() + "\n"
+                break
+        if self._header is None:
+            raise RuntimeError("Could not find PVGIS table header line starting with 'time,'")
 
-# PV source timestamp format (===CHANGE THESE===)
-df["timestamp"] = pd.to_datetime(df["time"], format="%Y%m%d:%H%M", errors="raise")
-df = df.sort_values("timestamp").set_index("timestamp")
+    def read(self, size: int = -1) -> str:
+        chunks = []
+        n = 0
+        if self._header is not None:
+            chunks.append(self._header)
+            n += len(self._header)
+            self._header = None
 
-P = df["P"].astype(float)
+        while not self._done and (size < 0 or n < size):
+            line = self._f.readline()
+            if not line:
+                self._done = True
+                break
+            s = line.strip()
+            if not s:
+                continue
+            if not _is_data_row(s):
+                # first non-data line after the table = footer
+                self._done = True
+                break
+            chunks.append(s + "\n")
+            n += len(s) + 1
+        return "".join(chunks)
 
-# values >5000 convert to kW (===CHANGE THESE===)
-if P.max() > 5000:
-    df["pv_kw_hourly"] = P / 1000.0
-else:
-    df["pv_kw_hourly"] = P
+    def __iter__(self):
+        while True:
+            chunk = self.read(1 << 16)
+            if not chunk:
+                return
+            yield from chunk.splitlines(keepends=True)
 
-# 15min resampling interval (===CHANGE THESE===)
-pv_15 = df[["pv_kw_hourly"]].resample("15min").interpolate("time")
-pv_15 = pv_15.rename(columns={"pv_kw_hourly": "pv_kw"}).reset_index()
+def read_pvgis(path: Path = INP, columns=PV_COLUMNS) -> pd.DataFrame:
+    """
+    Stream the PVGIS table of one export into typed columns (time parsed with TIME_FORMAT)
+    """
+    usecols = list(columns) if columns else None
+    dtype = {c: "float64" for c in (columns or ()) if c != "time"}
+    with open(path, "r", encoding="utf-8") as f:
+        df = pd.read_csv(
+            _PvgisTableStream(f),
+            usecols=usecols,
+            dtype=dtype or None,
+            parse_dates=["time"],
+            date_format=TIME_FORMAT,
+            engine="c",
+        )
+    if not pd.api.types.is_datetime64_any_dtype(df["time"]):
+        raise RuntimeError(f"PVGIS time column in {path} does not match TIME_FORMAT {TIME_FORMAT!r}")
+    return df
+
+def read_pvgis_batch(paths, columns=PV_COLUMNS, max_workers=None) -> dict:
+    """
+    Parse many PVGIS exports (sites x years) in parallel worker processes -> {path: DataFrame}
+    """
+    paths = [Path(p) for p in paths]
+    if len(paths) <= 1 or max_workers == 1:
+        return {p: read_pvgis(p, columns) for p in paths}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        frames = pool.map(read_pvgis, paths, [columns] * len(paths))
+        return dict(zip(paths, frames))
+
+def to_pv_kw(df: pd.DataFrame, rule: str = RESAMPLE_RULE) -> pd.DataFrame:
+    """
+    Raw PVGIS table -> [timestamp, pv_kw] resampled to `rule`
+    """
+    df = df.assign(timestamp=pd.to_datetime(df["time"], format=TIME_FORMAT, errors="raise"))
+    df = df.sort_values("timestamp").set_index("timestamp")
+
+    P = df["P"].astype(float)
+
+    # values >5000 convert to kW (===CHANGE THESE===)
+    if P.max() > 5000:
+        df["pv_kw_hourly"] = P / 1000.0
+    else:
+        df["pv_kw_hourly"] = P
+
+    pv_15 = df[["pv_kw_hourly"]].resample(rule).interpolate("time")
+    return pv_15.rename(columns={"pv_kw_hourly": "pv_kw"}).reset_index()
+
+def main() -> None:
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+
+    pv_15 = to_pv_kw(read_pvgis())
+    pv_15.to_csv(OUT, index=False)
+    print("Wrote:", OUT, "rows:", len(pv_15), "pv_kw max:", pv_15["pv_kw"].max())
 
-pv_15.to_csv(OUT, index=False)
-print("Wrote:", OUT, "rows:", len(pv_15), "pv_kw max:", pv_15["pv_kw"].max())
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -14,16 +14,29 @@ out = ROOT / "data" / "processed" / "load_15min_kw_scaled.csv"
 # target peak load in kW (===CHANGE THESE===)
 TARGET_PEAK_KW = 400
 
-out.parent.mkdir(parents=True, exist_ok=True)
-
-df = pd.read_csv(inp)
-peak = df["load_kw"].max()
-scale = TARGET_PEAK_KW / peak
-
-df["load_kw"] = df["load_kw"] * scale
-df.to_csv(out, index=False)
-
-print("Peak before:", peak)
-print("Scale factor:", scale)
-print("Peak after:", df["load_kw"].max())
-print("Wrote:", out)
\ No newline at end of file
+def scale_to_peak(df: pd.DataFrame, target_peak_kw: float = TARGET_PEAK_KW, verbose: bool = False) -> pd.DataFrame:
+    """
+    [timestamp, load_kw] -> same columns with load_kw scaled so max == target_peak_kw
+    """
+    peak = df["load_kw"].max()
+    scale = target_peak_kw / peak
+
+    out_df = df.copy()
+    out_df["load_kw"] = out_df["load_kw"] * scale
+
+    if verbose:
+        print("Peak before:", peak)
+        print("Scale factor:", scale)
+        print("Peak after:", out_df["load_kw"].max())
+    return out_df
+
+def main() -> None:
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    df = pd.read_csv(inp)
+    out_df = scale_to_peak(df, verbose=True)
+    out_df.to_csv(out, index=False)
+    print("Wrote:", out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Synthetic load / pv inputs with diurnal and seasonal shape, for offline runs and benchmarks
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# defaults (===CHANGE THESE===)
+START = "2018-01-01"
+LAT_DEG = 71.29          # Utqiagvik, gives polar night / midnight sun
+PEAK_LOAD_KW = 400.0
+PV_KWP = 300.0
+OUT_DIR = ROOT / "data" / "synthetic"
+
+def _time_grid(years: float, dt_min: float, start: str = START) -> pd.DatetimeIndex:
+    n = int(round(years * 365 * 24 * 60 / dt_min))
+    return pd.date_range(start, periods=n, freq=pd.Timedelta(minutes=dt_min))
+
+def _ar1(n: int, rho: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Unit-variance AR(1) noise
+    """
+    eps = rng.standard_normal(n) * np.sqrt(1.0 - rho * rho)
+    eps[0] = rng.standard_normal()
+    return lfilter([1.0], [1.0, -rho], eps)
+
+def _day_index(ts: pd.DatetimeIndex) -> np.ndarray:
+    return (ts.normalize() - ts[0].normalize()).days.to_numpy()
+
+def synthetic_load(ts: pd.DatetimeIndex, peak_kw: float = PEAK_LOAD_KW, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    hour = ts.hour.to_numpy() + ts.minute.to_numpy() / 60.0
+    doy = ts.dayofyear.to_numpy()
+
+    # morning + evening peaks, heating season (winter) higher
+    diurnal = (
+        0.55
+        + 0.25 * np.exp(-0.5 * ((hour - 8.0) / 1.5) ** 2)
+        + 0.40 * np.exp(-0.5 * ((hour - 19.0) / 2.0) ** 2)
+    )
+    seasonal = 1.0 + 0.35 * np.cos(2.0 * np.pi * (doy - 15) / 365.0)
+    weekend = np.where(ts.dayofweek.to_numpy() >= 5, 1.05, 1.0)
+
+    # day-to-day level (weather) + short-term fluctuation
+    days = _day_index(ts)
+    daily_level = np.clip(1.0 + 0.08 * rng.standard_normal(int(days.max()) + 1), 0.8, 1.2)[days]
+    noise = 1.0 + 0.06 * _ar1(len(ts), 0.9, rng)
+
+    load = np.maximum(diurnal * seasonal * weekend * daily_level * noise, 0.05)
+    return load / load.max() * peak_kw
+
+def synthetic_pv(ts: pd.DatetimeIndex, kwp: float = PV_KWP, lat_deg: float = LAT_DEG, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed + 10_000)
+    hour = ts.hour.to_numpy() + ts.minute.to_numpy() / 60.0
+    doy = ts.dayofyear.to_numpy()
+
+    # solar elevation from declination + hour angle (solar time)
+    lat = np.deg2rad(lat_deg)
+    decl = np.deg2rad(23.44) * np.sin(2.0 * np.pi * (284 + doy) / 365.0)
+    hra = np.deg2rad(15.0 * (hour - 12.0))
+    sin_elev = np.sin(lat) * np.sin(decl) + np.cos(lat) * np.cos(decl) * np.cos(hra)
+    clear = np.clip(sin_elev, 0.0, None) ** 1.15
+
+    # day-to-day cloudiness, smoothed within the day
+    days = _day_index(ts)
+    cloud_day = rng.beta(2.0, 1.3, size=int(days.max()) + 1)
+    cloud = cloud_day[days] * (1.0 + 0.15 * _ar1(len(ts), 0.95, rng))
+
+    return np.clip(kwp * 0.85 * clear * np.clip(cloud, 0.0, 1.0), 0.0, None)
+
+def generate_site(years: float = 1.0, dt_min: float = 15, site: int = 0, seed: int = 0,
+                  peak_kw: float = PEAK_LOAD_KW, kwp: float = PV_KWP, lat_deg: float = LAT_DEG) -> pd.DataFrame:
+    """
+    One synthetic site -> [timestamp, load_kw, pv_kw]
+    """
+    ts = _time_grid(years, dt_min)
+    s = seed + 7919 * site
+    scale = 1.0 + 0.25 * np.random.default_rng(s).uniform(-1.0, 1.0)
+    return pd.DataFrame({
+        "timestamp": ts,
+        "load_kw": synthetic_load(ts, peak_kw * scale, s),
+        "pv_kw": synthetic_pv(ts, kwp * scale, lat_deg, s),
+    })
+
+def write_site_inputs(df: pd.DataFrame, out_dir: Path, site_id: str, fmt: str = "csv"):
+    """
+    Write one site in the processed-input layout -> (load path, pv path)
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    load_path = out_dir / f"{site_id}_load_kw.{fmt}"
+    pv_path = out_dir / f"{site_id}_pv_kw.{fmt}"
+    for path, col in ((load_path, "load_kw"), (pv_path, "pv_kw")):
+        part = df[["timestamp", col]]
+        if fmt == "parquet":
+            part.to_parquet(path, index=False)
+        else:
+            part.to_csv(path, index=False)
+    return load_path, pv_path
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic load/pv inputs")
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--dt-min", type=float, default=15)
+    parser.add_argument("--sites", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    for site in range(args.sites):
+        df = generate_site(args.years, args.dt_min, site, args.seed)
+        load_path, pv_path = write_site_inputs(df, args.out, f"site{site:03d}", args.format)
+        print(f"Wrote: {load_path}, {pv_path} ({len(df)} rows)")
+
+if __name__ == "__main__":
+    main()